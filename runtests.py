@@ -74,6 +74,7 @@ def runtests():
     if args.bench:
         benchmarks = [
             'wagtail.admin.tests.benches',
+            'wagtail.core.tests.benches',
         ]
 
         argv = [sys.argv[0], 'test', '-v2'] + benchmarks + rest
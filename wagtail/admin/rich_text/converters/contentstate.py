@@ -2,6 +2,8 @@ import json
 import logging
 import re
 
+from threading import local
+
 from draftjs_exporter.defaults import render_children
 from draftjs_exporter.dom import DOM
 from draftjs_exporter.html import HTML as HTMLExporter
@@ -48,7 +50,10 @@ def entity_fallback(props):
 class ContentstateConverter():
     def __init__(self, features=None):
         self.features = features
-        self.html_to_contentstate_handler = HtmlToContentStateHandler(features)
+
+        # converters belong to widgets, which are shared between threads (for example, as part of
+        # a StreamField block definition), so each thread gets its own parser
+        self._local = local()
 
         exporter_config = {
             'block_map': {
@@ -79,12 +84,17 @@ class ContentstateConverter():
 
         self.exporter = HTMLExporter(exporter_config)
 
-    def from_database_format(self, html):
-        self.html_to_contentstate_handler.reset()
-        self.html_to_contentstate_handler.feed(html)
-        self.html_to_contentstate_handler.close()
+    @property
+    def html_to_contentstate_handler(self):
+        try:
+            return self._local.html_to_contentstate_handler
+        except AttributeError:
+            self._local.html_to_contentstate_handler = HtmlToContentStateHandler(self.features)
+            return self._local.html_to_contentstate_handler
 
-        return self.html_to_contentstate_handler.contentstate.as_json(indent=4, separators=(',', ': '))
+    def from_database_format(self, html):
+        # The JSON is not indented, so that it can be written by the json module's C encoder
+        return self.html_to_contentstate_handler.convert(html).as_json()
 
     def to_database_format(self, contentstate_json):
         return self.exporter.render(json.loads(contentstate_json))
@@ -11,7 +11,7 @@ class Block:
         self.type = typ
         self.depth = depth
         self.text = ""
-        self.key = ''.join(random.choice(ALPHANUM) for _ in range(5))
+        self.key = ''.join(random.choices(ALPHANUM, k=5))
         self.inline_style_ranges = []
         self.entity_ranges = []
 
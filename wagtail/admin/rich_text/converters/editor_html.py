@@ -3,7 +3,7 @@ from django.utils.html import escape
 
 from wagtail.core.models import Page
 from wagtail.core.rich_text import features as feature_registry
-from wagtail.core.rich_text.rewriters import EmbedRewriter, LinkRewriter, MultiRuleRewriter
+from wagtail.core.rich_text.rewriters import TagRewriter
 from wagtail.core.whitelist import Whitelister, allow_without_attributes
 
 
@@ -140,9 +140,7 @@ class EditorHTMLConverter:
             elif isinstance(rule, LinkTypeRule):
                 link_rules[rule.link_type] = rule.handler.expand_db_attributes
 
-        return MultiRuleRewriter([
-            LinkRewriter(link_rules), EmbedRewriter(embed_rules)
-        ])
+        return TagRewriter(link_rules, embed_rules)
 
     def from_database_format(self, html):
         return self.html_rewriter(html)
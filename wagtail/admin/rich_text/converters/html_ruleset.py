@@ -25,6 +25,10 @@ class HTMLRuleset():
         # where attr_check is a callable that takes an attr dict and returns True if they match
         self.element_rules = {}
 
+        # mapping of element name to the result for elements that only have element-only rules,
+        # which can be returned without checking attributes
+        self.unconditional_results = {}
+
         if rules:
             self.add_rules(rules)
 
@@ -43,6 +47,7 @@ class HTMLRuleset():
         rules.append((2, (lambda attrs: True), result))
         # sort list on priority
         rules.sort(key=lambda t: t[0])
+        self._update_unconditional_result(name)
 
     def _add_element_with_attr_rule(self, name, attr, result):
         # add a rule that matches any element with name `name` which has the attribute `attr`
@@ -51,6 +56,7 @@ class HTMLRuleset():
         rules.append((1, (lambda attrs: attr in attrs), result))
         # sort list on priority
         rules.sort(key=lambda t: t[0])
+        self._update_unconditional_result(name)
 
     def _add_element_with_attr_exact_rule(self, name, attr, value, result):
         # add a rule that matches any element with name `name` which has an
@@ -60,6 +66,15 @@ class HTMLRuleset():
         rules.append((1, (lambda attrs: attr in attrs and attrs[attr] == value), result))
         # sort list on priority
         rules.sort(key=lambda t: t[0])
+        self._update_unconditional_result(name)
+
+    def _update_unconditional_result(self, name):
+        precedence, attr_check, result = self.element_rules[name][0]
+        if precedence == 2:
+            # the highest priority rule is element-only, and so are any others
+            self.unconditional_results[name] = result
+        else:
+            self.unconditional_results.pop(name, None)
 
     def add_rule(self, selector, result):
         match = ELEMENT_SELECTOR.match(selector)
@@ -91,6 +106,11 @@ class HTMLRuleset():
         and return the corresponding result object. If no rule matches, return None.
         If multiple rules match, the one chosen is undetermined.
         """
+        try:
+            return self.unconditional_results[name]
+        except KeyError:
+            pass
+
         try:
             rules_to_test = self.element_rules[name]
         except KeyError:
@@ -1,6 +1,10 @@
 import re
 
+from collections import OrderedDict
 from html.parser import HTMLParser
+from threading import Lock
+
+from django.conf import settings
 
 from wagtail.admin.rich_text.converters.contentstate_models import (
     Block, ContentState, Entity, EntityRange, InlineStyleRange)
@@ -320,7 +324,7 @@ class HtmlToContentStateHandler(HTMLParser):
         # normalise whitespace sequences to a single space unless whitespace is contained in <pre> tag,
         # in which case, leave it alone
         # This is in line with https://www.w3.org/TR/html4/struct/text.html#h-9.1
-        content = re.sub(WHITESPACE_RE, ' ', content)
+        content = WHITESPACE_RE.sub(' ', content)
 
         if self.state.current_block is None:
             if content == ' ':
@@ -362,3 +366,97 @@ class HtmlToContentStateHandler(HTMLParser):
         if not self.state.has_preceding_nonatomic_block:
             add_paragraph_block(self.state, self.contentstate)
         super().close()
+
+    def convert(self, html):
+        """
+        Convert a complete HTML document to contentstate, and return the ContentState object.
+        This is equivalent to calling reset(), feed(html) and close(), except that the parsing
+        step is skipped for HTML that is in the parse cache.
+        """
+        self.reset()
+
+        events = get_parse_events(html)
+        if events is None:
+            self.feed(html)
+        else:
+            handlers = (self.handle_starttag, self.handle_endtag, self.handle_data)
+            for event_type, args in events:
+                handlers[event_type](*args)
+
+        self.close()
+        return self.contentstate
+
+
+STARTTAG = 0
+ENDTAG = 1
+DATA = 2
+
+
+class ParseEventRecorder(HTMLParser):
+    """
+    Records the handler calls that HTMLParser makes for an HTML document, as a list of
+    (event_type, args) tuples, so that they can be replayed on HtmlToContentStateHandler
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+
+    def reset(self):
+        self.events = []
+        super().reset()
+
+    def handle_starttag(self, name, attrs):
+        self.events.append((STARTTAG, (name, attrs)))
+
+    def handle_endtag(self, name):
+        self.events.append((ENDTAG, (name, )))
+
+    def handle_data(self, content):
+        self.events.append((DATA, (content, )))
+
+
+_parse_cache = OrderedDict()
+_parse_cache_lock = Lock()
+
+
+def get_parse_cache_size():
+    """
+    Return the maximum number of HTML documents to keep in the parse cache, as set by
+    WAGTAILADMIN_RICH_TEXT_PARSE_CACHE_SIZE. The cache is disabled if this is 0 (the default).
+    """
+    return getattr(settings, 'WAGTAILADMIN_RICH_TEXT_PARSE_CACHE_SIZE', 0)
+
+
+def get_parse_events(html):
+    """
+    Return the parse events for the HTML from the parse cache, parsing it and adding it to the
+    cache if necessary, or None if the parse cache is disabled.
+
+    Only the output of the HTML parser is cached, rather than the resulting contentstate, as
+    the data of entities such as page links and images is looked up from the database each time.
+    """
+    cache_size = get_parse_cache_size()
+    if not cache_size:
+        return None
+
+    with _parse_cache_lock:
+        events = _parse_cache.get(html)
+        if events is not None:
+            _parse_cache.move_to_end(html)
+            return events
+
+    recorder = ParseEventRecorder()
+    recorder.feed(html)
+    recorder.close()
+    events = recorder.events
+
+    with _parse_cache_lock:
+        _parse_cache[html] = events
+        while len(_parse_cache) > cache_size:
+            _parse_cache.popitem(last=False)
+
+    return events
+
+
+def clear_parse_cache():
+    with _parse_cache_lock:
+        _parse_cache.clear()
@@ -26,6 +26,7 @@ from wagtail.admin.navigation import get_explorable_root_page
 from wagtail.admin.search import admin_search_areas
 from wagtail.admin.staticfiles import versioned_static as versioned_static_func
 from wagtail.core import hooks
+from wagtail.core.ancestor_cache import get_ancestors_for_pages
 from wagtail.core.models import (
     Collection, CollectionViewRestriction, Locale, Page, PageLogEntry, PageViewRestriction,
     UserPagePermissionsProxy)
@@ -74,8 +75,12 @@ def explorer_breadcrumb(context, page, include_self=False):
     if not cca:
         return {'pages': Page.objects.none()}
 
+    pages = get_ancestors_for_pages([page])[page.pk]
+    if include_self:
+        pages.append(page.specific_deferred)
+
     return {
-        'pages': page.get_ancestors(inclusive=include_self).descendant_of(cca, inclusive=True).specific()
+        'pages': [breadcrumb_page for breadcrumb_page in pages if breadcrumb_page.path.startswith(cca.path)]
     }
 
 
@@ -1,10 +1,17 @@
 from __future__ import absolute_import, unicode_literals
 
-from django.test import TestCase
+import json
+
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
+from wagtail.admin.rich_text.converters.contentstate import ContentstateConverter
+from wagtail.admin.rich_text.converters.html_to_contentstate import (
+    HtmlToContentStateHandler, clear_parse_cache)
 from wagtail.core.models import Page, Site
+from wagtail.core.rich_text import RichText, features
+from wagtail.core.tests.benches import make_article_body
 from wagtail.tests.benchmark import Benchmark
 from wagtail.tests.testapp.models import SingleEventPage, StreamPage
 from wagtail.tests.utils import WagtailTestUtils
@@ -84,3 +91,67 @@ class BenchPageExplorerWithCustomURLPages(Benchmark, WagtailTestUtils, TestCase)
 
         # Check the URLs were rendered correctly
         self.assertContains(response, 'a href="http:///49/pointless-suffix/"')
+
+
+def convert_with_html_parser(converter, html):
+    """
+    Convert the HTML to contentstate with the HTML parser alone, as ContentstateConverter
+    did before it had a parse cache and a parser per thread
+    """
+    handler = HtmlToContentStateHandler(converter.features)
+    handler.reset()
+    handler.feed(html)
+    handler.close()
+    return handler.contentstate.as_json(indent=4, separators=(',', ': '))
+
+
+def normalise_contentstate(contentstate_json):
+    # Block keys are random, so they are left out of the comparison
+    contentstate = json.loads(contentstate_json)
+    for block in contentstate['blocks']:
+        del block['key']
+    return contentstate
+
+
+class BenchContentstateConversion(Benchmark, TestCase):
+    """
+    Converts the rich text of five pages, each with two long rich text blocks, to contentstate as
+    the page editor does when the pages are opened, and checks that the output is the same as
+    that of the HTML parser alone
+    """
+
+    def setUp(self):
+        self.root_page = Page.objects.get(id=1)
+
+        for i in range(5):
+            self.root_page.add_child(instance=StreamPage(
+                title="Page {}".format(i + 1),
+                slug=str(i + 1),
+                body=[('rich_text', RichText(make_article_body(i * 2 + j))) for j in range(2)],
+            ))
+
+        self.converter = ContentstateConverter(features.get_default_features())
+        self.sources = [
+            block.value.source for page in StreamPage.objects.all() for block in page.body
+        ]
+        self.expected_results = [
+            normalise_contentstate(convert_with_html_parser(self.converter, html)) for html in self.sources
+        ]
+        clear_parse_cache()
+
+    def tearDown(self):
+        clear_parse_cache()
+
+    def bench(self):
+        results = [self.converter.from_database_format(html) for html in self.sources]
+
+        for html, result, expected_result in zip(self.sources, results, self.expected_results):
+            self.assertEqual(normalise_contentstate(result), expected_result, "Output differs for %r" % html[:100])
+
+
+@override_settings(WAGTAILADMIN_RICH_TEXT_PARSE_CACHE_SIZE=1000)
+class BenchContentstateConversionWithParseCache(BenchContentstateConversion):
+    """
+    As BenchContentstateConversion, with the parse cache enabled, so that every run after the
+    first is served from the cache
+    """
@@ -1,10 +1,15 @@
 import json
 
+from threading import Thread
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
+from wagtail.admin.rich_text.converters import html_to_contentstate
 from wagtail.admin.rich_text.converters.contentstate import ContentstateConverter
+from wagtail.admin.rich_text.converters.html_to_contentstate import (
+    HtmlToContentStateHandler, clear_parse_cache)
+from wagtail.core.models import Page
 from wagtail.embeds.models import Embed
 
 
@@ -825,3 +830,89 @@ class TestHtmlToContentState(TestCase):
             ],
             'entityMap': {}
         })
+
+
+class TestHtmlToContentStateParseCache(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        clear_parse_cache()
+        self.converter = ContentstateConverter(features=['bold', 'link'])
+        self.html = '<p>an <b>important</b> <a linktype="page" id="3">internal</a> link</p>'
+
+    def tearDown(self):
+        clear_parse_cache()
+
+    def convert(self):
+        return json.loads(self.converter.from_database_format(self.html))
+
+    def test_disabled_by_default(self):
+        self.convert()
+        self.assertFalse(html_to_contentstate._parse_cache)
+
+    @override_settings(WAGTAILADMIN_RICH_TEXT_PARSE_CACHE_SIZE=10)
+    def test_cached_parse_gives_same_result(self):
+        result = self.convert()
+
+        with patch.object(html_to_contentstate.ParseEventRecorder, 'feed') as feed:
+            cached_result = self.convert()
+
+        feed.assert_not_called()
+        self.assertTrue(content_state_equal(result, cached_result), "%r does not match %r" % (result, cached_result))
+        self.assertEqual(cached_result['blocks'][0]['text'], 'an important internal link')
+
+    @override_settings(WAGTAILADMIN_RICH_TEXT_PARSE_CACHE_SIZE=10)
+    def test_entity_data_is_not_cached(self):
+        self.convert()
+
+        events_page = Page.objects.get(id=3)
+        events_page.slug = 'whats-on'
+        events_page.save_revision().publish()
+
+        self.assertEqual(self.convert()['entityMap']['0']['data']['url'], '/whats-on/')
+
+    @override_settings(WAGTAILADMIN_RICH_TEXT_PARSE_CACHE_SIZE=2)
+    def test_cache_size(self):
+        for text in ['one', 'two', 'three']:
+            self.converter.from_database_format('<p>%s</p>' % text)
+
+        # The least recently used HTML is dropped first
+        self.assertEqual(list(html_to_contentstate._parse_cache), ['<p>two</p>', '<p>three</p>'])
+
+    def test_same_result_as_html_parser(self):
+        converter = ContentstateConverter(features=[
+            'h2', 'bold', 'italic', 'ol', 'ul', 'hr', 'link', 'document-link', 'image', 'embed'
+        ])
+        html = (
+            '<h2>Heading &amp; more</h2><p>an <b>important</b> <a linktype="page" id="3">internal</a>'
+            ' <a href="http://example.com">external</a> and <a linktype="document" id="1">document</a>'
+            ' link<br/>after a break</p><ul><li>one</li><li><i>two</i></li></ul><hr/>'
+            '<embed embedtype="image" id="1" format="left" alt="an image"/>'
+            '<ol><li>three</li></ol>'
+        )
+
+        # The output of the HTML parser alone, as the converter gave before the parse cache
+        handler = HtmlToContentStateHandler(converter.features)
+        handler.reset()
+        handler.feed(html)
+        handler.close()
+        expected_result = json.loads(handler.contentstate.as_json())
+
+        result = json.loads(converter.from_database_format(html))
+        self.assertTrue(content_state_equal(result, expected_result), "%r does not match %r" % (result, expected_result))
+
+        with self.settings(WAGTAILADMIN_RICH_TEXT_PARSE_CACHE_SIZE=10):
+            for i in range(2):
+                result = json.loads(converter.from_database_format(html))
+                self.assertTrue(
+                    content_state_equal(result, expected_result), "%r does not match %r" % (result, expected_result)
+                )
+
+    def test_parser_per_thread(self):
+        handlers = []
+        thread = Thread(target=lambda: handlers.append(self.converter.html_to_contentstate_handler))
+        thread.start()
+        thread.join()
+
+        self.assertIs(self.converter.html_to_contentstate_handler, self.converter.html_to_contentstate_handler)
+        self.assertIsNot(handlers[0], self.converter.html_to_contentstate_handler)
@@ -59,7 +59,9 @@ class PageHtmlUrlField(Field):
 
     def to_representation(self, page):
         try:
-            return page.full_url
+            # Passing the request allows site root paths to be looked up once per request,
+            # rather than once for every page in a listing
+            return page.get_full_url(request=self.context.get('request'))
         except NoReverseMatch:
             return None
 
@@ -1,7 +1,13 @@
+from itertools import islice
+
 from django.apps import apps
 
-from wagtail.contrib.frontend_cache.utils import purge_page_from_cache
-from wagtail.core.signals import page_published, page_unpublished
+from wagtail.contrib.frontend_cache.utils import PurgeBatch, purge_page_from_cache
+from wagtail.core.signals import page_published, page_unpublished, post_page_subtree_move
+
+
+# The number of pages that are purged at a time after a subtree is moved
+PURGE_CHUNK_SIZE = 1000
 
 
 def page_published_signal_handler(instance, **kwargs):
@@ -12,6 +18,29 @@ def page_unpublished_signal_handler(instance, **kwargs):
     purge_page_from_cache(instance)
 
 
+def post_page_subtree_move_signal_handler(instance, url_path_before, url_path_after, **kwargs):
+    if url_path_before == url_path_after:
+        # The subtree has been reordered within the same section, so no URLs have changed
+        return
+
+    # Purge the old and new URLs of the moved page and all of its descendants, one chunk
+    # of pages at a time. The page may have moved again since, so old URLs are worked out
+    # from its current url_path rather than url_path_after
+    current_url_path = instance.url_path
+    pages = instance.get_descendants(inclusive=True).specific().iterator(chunk_size=PURGE_CHUNK_SIZE)
+    while True:
+        chunk = list(islice(pages, PURGE_CHUNK_SIZE))
+        if not chunk:
+            break
+
+        batch = PurgeBatch()
+        for page in chunk:
+            batch.add_page(page)
+            page.url_path = url_path_before + page.url_path[len(current_url_path):]
+            batch.add_page(page)
+        batch.purge()
+
+
 def register_signal_handlers():
     # Get list of models that are page types
     Page = apps.get_model('wagtailcore', 'Page')
@@ -21,3 +50,4 @@ def register_signal_handlers():
     for model in indexed_models:
         page_published.connect(page_published_signal_handler, sender=model)
         page_unpublished.connect(page_unpublished_signal_handler, sender=model)
+        post_page_subtree_move.connect(post_page_subtree_move_signal_handler, sender=model)
@@ -10,7 +10,7 @@ from django.test.utils import override_settings
 from wagtail.contrib.frontend_cache.backends import (
     BaseBackend, CloudflareBackend, CloudfrontBackend, HTTPBackend)
 from wagtail.contrib.frontend_cache.utils import get_backends
-from wagtail.core.models import Page
+from wagtail.core.models import Page, PageMoveUpdate
 from wagtail.tests.testapp.models import EventIndex
 
 from .utils import (
@@ -292,6 +292,28 @@ class TestCachePurgingSignals(TestCase):
         page.unpublish()
         self.assertEqual(PURGED_URLS, ['http://localhost/events/', 'http://localhost/events/past/'])
 
+    @override_settings(WAGTAIL_DEFER_PAGE_MOVE_UPDATES=True)
+    def test_purge_on_move(self):
+        page = EventIndex.objects.get(url_path='/home/events/')
+        page.move(Page.objects.get(url_path='/home/about-us/'), pos='last-child')
+        PageMoveUpdate.objects.get().process()
+
+        # The old and new URLs of the page and its descendants are purged
+        self.assertIn('http://localhost/events/', PURGED_URLS)
+        self.assertIn('http://localhost/about-us/events/', PURGED_URLS)
+        self.assertIn('http://localhost/events/past/', PURGED_URLS)
+        self.assertIn('http://localhost/about-us/events/past/', PURGED_URLS)
+        self.assertIn('http://localhost/events/christmas/', PURGED_URLS)
+        self.assertIn('http://localhost/about-us/events/christmas/', PURGED_URLS)
+
+    @override_settings(WAGTAIL_DEFER_PAGE_MOVE_UPDATES=True)
+    def test_no_purge_on_reorder(self):
+        page = EventIndex.objects.get(url_path='/home/events/')
+        page.move(Page.objects.get(url_path='/home/about-us/'), pos='left')
+        PageMoveUpdate.objects.get().process()
+
+        self.assertEqual(PURGED_URLS, [])
+
     def test_purge_with_unroutable_page(self):
         root = Page.objects.get(url_path='/')
         page = EventIndex(title='new top-level page')
@@ -172,6 +172,20 @@ class TestRoutablePage(TestCase):
             del RoutablePageTest.descriptor
 
 
+@override_settings(WAGTAIL_ROUTE_BY_URL_PATH=True)
+class TestRoutablePageWithRouteByUrlPath(TestRoutablePage):
+    # Runs all of the TestRoutablePage tests with single-query routing enabled, to check
+    # that requests are still handed over to RoutablePageMixin.route
+
+    def test_get_archive_by_year_view_for_nested_routable_page(self):
+        section = self.home_page.add_child(instance=Page(title="Section", slug="section"))
+        routable_page = section.add_child(instance=self.model(title="Nested routable page", live=True))
+
+        response = self.client.get(routable_page.url + 'archive/year/2014/')
+
+        self.assertContains(response, "ARCHIVE BY YEAR: 2014")
+
+
 class TestRoutablePageTemplateTag(TestCase):
     def setUp(self):
         self.home_page = Page.objects.get(id=2)
@@ -0,0 +1,127 @@
+from hashlib import md5
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import DEFAULT_DB_ALIAS
+
+from wagtail.core.utils import get_cache_version, get_optional_cache, reset_cache_versions
+
+
+GENERATION_CACHE_KEY = 'wagtail-ancestor-generation'
+
+# The page fields held for each ancestor. These are enough to render breadcrumbs
+# (including the page's admin display title) and to generate URLs
+ANCESTOR_FIELDS = ('id', 'title', 'draft_title', 'slug', 'url_path', 'content_type_id')
+
+
+def get_ancestor_cache():
+    return get_optional_cache('page_ancestors')
+
+
+def _make_cache_key(generation, path):
+    return 'wagtail-ancestor-{}-{}'.format(generation, md5(path.encode('utf-8')).hexdigest())
+
+
+def _get_ancestor_paths(page):
+    return [page.path[:page.steplen * depth] for depth in range(1, page.depth)]
+
+
+def _make_page(path, values):
+    """
+    Create a page of the specific class from the cached values for the page at the
+    given path. All other fields are deferred.
+    """
+    from wagtail.core.models import Page
+
+    values = dict(zip(ANCESTOR_FIELDS, values))
+    model = ContentType.objects.get_for_id(values['content_type_id']).model_class() or Page
+
+    values['path'] = path
+    values['depth'] = len(path) // Page.steplen
+
+    # Parent links all hold the primary key value
+    for field in model._meta.concrete_fields:
+        if field.attname not in values and field.remote_field and field.remote_field.parent_link:
+            values[field.attname] = values['id']
+
+    field_names = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+    return model.from_db(DEFAULT_DB_ALIAS, field_names, [values[field_name] for field_name in field_names])
+
+
+def get_ancestors_for_pages(pages, inclusive=False):
+    """
+    Return a dict mapping the ID of each of the given pages to a list of its ancestors,
+    starting at the root page and descending to the parent (or to the page itself, if
+    ``inclusive`` is true).
+
+    The ancestors of all pages are fetched in a single query, or from the 'page_ancestors'
+    cache if it is enabled. They are instances of their specific page class, with only
+    the ``id``, ``path``, ``depth``, ``title``, ``draft_title``, ``slug``, ``url_path`` and
+    ``content_type`` fields loaded.
+    """
+    from wagtail.core.models import Page
+
+    pages = list(pages)
+    paths = set()
+    for page in pages:
+        paths.update(_get_ancestor_paths(page))
+
+    cache = get_ancestor_cache()
+    values_by_path = {}
+
+    if cache is not None and paths:
+        generation = get_cache_version(cache, GENERATION_CACHE_KEY)
+        cache_keys = {_make_cache_key(generation, path): path for path in paths}
+        values_by_path = {
+            cache_keys[cache_key]: values
+            for cache_key, values in cache.get_many(list(cache_keys.keys())).items()
+        }
+
+    missing_paths = paths - values_by_path.keys()
+    if missing_paths:
+        fetched_values = {
+            values[0]: values[1:]
+            for values in Page.objects.filter(path__in=missing_paths).values_list('path', *ANCESTOR_FIELDS)
+        }
+        values_by_path.update(fetched_values)
+
+        if cache is not None and fetched_values:
+            cache.set_many({
+                _make_cache_key(generation, path): values
+                for path, values in fetched_values.items()
+            })
+
+    ancestors_by_path = {}
+    ancestors = {}
+    for page in pages:
+        ancestors[page.pk] = []
+        for path in _get_ancestor_paths(page):
+            if path not in values_by_path:
+                continue
+
+            if path not in ancestors_by_path:
+                ancestors_by_path[path] = _make_page(path, values_by_path[path])
+            ancestors[page.pk].append(ancestors_by_path[path])
+
+        if inclusive:
+            ancestors[page.pk].append(page)
+
+    return ancestors
+
+
+def invalidate_ancestor(path):
+    """
+    Remove the cached values of the page at the given path
+    """
+    cache = get_ancestor_cache()
+    if cache is not None:
+        cache.delete(_make_cache_key(get_cache_version(cache, GENERATION_CACHE_KEY), path))
+
+
+def clear_ancestor_cache():
+    """
+    Invalidate all cached ancestors. This is used when the paths or url_paths of many
+    pages may have changed at once, such as when a page is moved or renamed.
+    """
+    cache = get_ancestor_cache()
+    if cache is not None:
+        reset_cache_versions(cache, [GENERATION_CACHE_KEY])
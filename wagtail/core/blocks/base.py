@@ -10,6 +10,9 @@ from django.template.loader import render_to_string
 from django.utils.encoding import force_str
 from django.utils.safestring import mark_safe
 from django.utils.text import capfirst
+from django.utils.translation import get_language
+
+from . import render_cache
 
 
 __all__ = ['BaseBlock', 'Block', 'BoundBlock', 'DeclarativeSubBlocksMetaclass', 'BlockWidget', 'BlockField']
@@ -46,6 +49,8 @@ class Block(metaclass=BaseBlock):
         icon = "placeholder"
         classname = None
         group = ''
+        cache_render = False
+        cache_vary_on = []
 
     # Attributes of Meta which can legally be modified after the block has been instantiated.
     # Used to implement __eq__. label is not included here, despite it technically being mutable via
@@ -279,6 +284,16 @@ class Block(metaclass=BaseBlock):
         use a template (with the passed context, supplemented by the result of get_context) if a
         'template' property is specified on the block, and fall back on render_basic otherwise.
         """
+        if self.meta.cache_render:
+            return render_cache.render(self, value, context, self.render_uncached)
+
+        return self.render_uncached(value, context=context)
+
+    def render_uncached(self, value, context=None):
+        """
+        Render the value without consulting the block render cache. Called by render(); blocks that
+        customise their rendering should generally override render() or render_basic() instead.
+        """
         template = self.get_template(context=context)
         if not template:
             return self.render_basic(value, context=context)
@@ -290,6 +305,20 @@ class Block(metaclass=BaseBlock):
 
         return mark_safe(render_to_string(template, new_context))
 
+    def get_render_cache_vary_key(self, value, context=None):
+        """
+        Return a string identifying the parts of the template context that the rendering of 'value'
+        depends on, for use in the block render cache key when the 'cache_render' meta option is set.
+        By default, this consists of the active language and the values of the context variables
+        listed in the 'cache_vary_on' meta option (model instances are identified by primary key).
+        """
+        parts = [get_language() or '']
+        for name in self.meta.cache_vary_on:
+            var_value = (context or {}).get(name)
+            parts.append('%s=%s' % (name, getattr(var_value, 'pk', var_value)))
+
+        return '&'.join(parts)
+
     def get_api_representation(self, value, context=None):
         """
         Can be used to customise the API response and defaults to the value returned by get_prep_value.
@@ -104,19 +104,23 @@ class ListBlock(Block):
 
     def value_from_datadict(self, data, files, prefix):
         count = int(data['%s-count' % prefix])
+        child_block = self.child_block
         values_with_indexes = []
         for i in range(0, count):
-            if data['%s-%d-deleted' % (prefix, i)]:
+            child_prefix = '%s-%d' % (prefix, i)
+            if data[child_prefix + '-deleted']:
                 continue
             values_with_indexes.append(
                 (
-                    int(data['%s-%d-order' % (prefix, i)]),
-                    self.child_block.value_from_datadict(data, files, '%s-%d-value' % (prefix, i))
+                    int(data[child_prefix + '-order']),
+                    i,
+                    child_block.value_from_datadict(data, files, child_prefix + '-value')
                 )
             )
 
-        values_with_indexes.sort()
-        return [v for (i, v) in values_with_indexes]
+        # sort by order, falling back on the position in the form, without comparing the values themselves
+        values_with_indexes.sort(key=lambda item: item[:2])
+        return [v for (order, i, v) in values_with_indexes]
 
     def value_omitted_from_data(self, data, files, prefix):
         return ('%s-count' % prefix) not in data
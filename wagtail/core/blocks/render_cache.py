@@ -0,0 +1,108 @@
+import json
+
+from hashlib import md5
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.functional import Promise
+from django.utils.safestring import SafeData, mark_safe
+
+from wagtail.core.utils import get_cache_version, get_optional_cache, reset_cache_versions
+
+
+GENERATION_CACHE_KEY = 'wagtail-block-render-generation'
+
+
+def get_block_render_cache():
+    return get_optional_cache('rendered_blocks')
+
+
+def _describe(obj):
+    """
+    Return a representation of a block definition (or one of its constructor arguments)
+    that is the same in every process, for use in a cache key
+    """
+    from wagtail.core.blocks.base import Block
+
+    if isinstance(obj, Block):
+        path, args, kwargs = obj.deconstruct()
+        return [
+            type(obj).__module__, type(obj).__qualname__, obj.name,
+            getattr(obj.meta, 'template', None), _describe(args), _describe(kwargs),
+        ]
+    elif isinstance(obj, (list, tuple)):
+        return [_describe(item) for item in obj]
+    elif isinstance(obj, dict):
+        return [[key, _describe(value)] for key, value in sorted(obj.items())]
+    elif isinstance(obj, Promise):
+        return str(obj)
+    elif callable(obj):
+        return '%s.%s' % (getattr(obj, '__module__', ''), getattr(obj, '__qualname__', ''))
+    else:
+        return repr(obj)
+
+
+def get_definition_hash(block):
+    """
+    Return a hash of the block's definition, so that changing a block (or any of its child
+    blocks) makes the renderings cached for the old definition unreachable
+    """
+    try:
+        return block._render_cache_definition_hash
+    except AttributeError:
+        block._render_cache_definition_hash = md5(repr(_describe(block)).encode('utf-8')).hexdigest()
+        return block._render_cache_definition_hash
+
+
+def get_value_hash(block, value):
+    """
+    Return a hash of the block's value, or None if the value can't be serialised to JSON
+    """
+    try:
+        prep_value = json.dumps(block.get_prep_value(value), cls=DjangoJSONEncoder, sort_keys=True)
+    except (TypeError, ValueError):
+        return None
+
+    return md5(prep_value.encode('utf-8')).hexdigest()
+
+
+def render(block, value, context, render_func):
+    """
+    Return the rendering of the value from the block render cache, calling render_func
+    to render it on a cache miss. The cache key is derived from the block definition, the
+    block value and the block's context vary key, so cached renderings are never reused
+    after the content of a block changes, and all cached renderings are discarded when a
+    page is published or unpublished.
+    """
+    cache = get_block_render_cache()
+    if cache is None:
+        return render_func(value, context=context)
+
+    value_hash = get_value_hash(block, value)
+    if value_hash is None:
+        return render_func(value, context=context)
+
+    cache_key = 'wagtail-block-{}-{}'.format(
+        get_cache_version(cache, GENERATION_CACHE_KEY),
+        md5('{}-{}-{}'.format(
+            get_definition_hash(block), value_hash, block.get_render_cache_vary_key(value, context)
+        ).encode('utf-8')).hexdigest()
+    )
+
+    cached = cache.get(cache_key)
+    if cached is not None:
+        rendered, is_safe = cached
+        return mark_safe(rendered) if is_safe else rendered
+
+    rendered = render_func(value, context=context)
+    # render_basic may return a string that still needs escaping, so keep track of that
+    cache.set(cache_key, (str(rendered), isinstance(rendered, SafeData)))
+    return rendered
+
+
+def clear_block_render_cache():
+    """
+    Invalidate all cached block renderings
+    """
+    cache = get_block_render_cache()
+    if cache is not None:
+        reset_cache_versions(cache, [GENERATION_CACHE_KEY])
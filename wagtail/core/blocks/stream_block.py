@@ -64,6 +64,12 @@ class BaseStreamBlock(Block):
 
     def sorted_child_blocks(self):
         """Child blocks, sorted in to their groups."""
+        return self._sorted_child_blocks
+
+    @cached_property
+    def _sorted_child_blocks(self):
+        # Child blocks don't change once the block has been constructed, and this is needed
+        # for every member of the stream when rendering the form
         return sorted(self.child_blocks.values(),
                       key=lambda child_block: child_block.meta.group)
 
@@ -163,30 +169,32 @@ class BaseStreamBlock(Block):
 
     def value_from_datadict(self, data, files, prefix):
         count = int(data['%s-count' % prefix])
-        values_with_indexes = []
+        child_blocks = self.child_blocks
+        children_with_indexes = []
         for i in range(0, count):
-            if data['%s-%d-deleted' % (prefix, i)]:
+            child_prefix = '%s-%d' % (prefix, i)
+            if data[child_prefix + '-deleted']:
                 continue
-            block_type_name = data['%s-%d-type' % (prefix, i)]
             try:
-                child_block = self.child_blocks[block_type_name]
+                child_block = child_blocks[data[child_prefix + '-type']]
             except KeyError:
                 continue
 
-            values_with_indexes.append(
+            children_with_indexes.append(
                 (
-                    int(data['%s-%d-order' % (prefix, i)]),
-                    block_type_name,
-                    child_block.value_from_datadict(data, files, '%s-%d-value' % (prefix, i)),
-                    data.get('%s-%d-id' % (prefix, i)),
+                    int(data[child_prefix + '-order']),
+                    i,
+                    StreamValue.StreamChild(
+                        child_block,
+                        child_block.value_from_datadict(data, files, child_prefix + '-value'),
+                        id=data.get(child_prefix + '-id'),
+                    ),
                 )
             )
 
-        values_with_indexes.sort()
-        return StreamValue(self, [
-            (child_block_type_name, value, block_id)
-            for (index, child_block_type_name, value, block_id) in values_with_indexes
-        ])
+        # sort by order, falling back on the position in the form (StreamChild objects can't be compared)
+        children_with_indexes.sort(key=lambda item: item[:2])
+        return StreamValue(self, [child for (order, i, child) in children_with_indexes])
 
     def value_omitted_from_data(self, data, files, prefix):
         return ('%s-count' % prefix) not in data
@@ -202,7 +210,7 @@ class BaseStreamBlock(Block):
         for i, child in enumerate(value):  # child is a StreamChild instance
             try:
                 cleaned_data.append(
-                    (child.block.name, child.block.clean(child.value), child.id)
+                    StreamValue.StreamChild(child.block, child.block.clean(child.value), id=child.id)
                 )
             except ValidationError as e:
                 errors[i] = ErrorList([e])
@@ -502,7 +510,7 @@ class StreamValue(MutableSequence):
         def __repr__(self):
             return repr(list(self))
 
-    def __init__(self, stream_block, stream_data, is_lazy=False, raw_text=None):
+    def __init__(self, stream_block, stream_data, is_lazy=False, raw_text=None, loader=None):
         """
         Construct a StreamValue linked to the given StreamBlock,
         with child values given in stream_data.
@@ -521,8 +529,19 @@ class StreamValue(MutableSequence):
         migrated to a StreamField. In this situation we return a blank StreamValue
         with the raw text accessible under the `raw_text` attribute, so that migration
         code can be rewritten to convert it as desired.
+
+        Passing a loader (in which case stream_data is ignored) defers the construction of
+        the value until it is first accessed: loader is then called with no arguments, and
+        must return a StreamValue for the same stream_block, whose data is used as the data
+        of this one. This allows StreamField to avoid decoding JSON that is never used.
         """
         self.stream_block = stream_block  # the StreamBlock object that handles this value
+
+        if loader is not None:
+            self.is_lazy = True
+            self._loader = loader
+            return
+
         self.is_lazy = is_lazy
         self.raw_text = raw_text
 
@@ -539,6 +558,19 @@ class StreamValue(MutableSequence):
                 self._construct_stream_child(item) for item in stream_data
             ]
 
+    def __getattr__(self, name):
+        # Only called for attributes that haven't been set yet, which (for a value with a
+        # loader) are those holding the stream data
+        if name in ('_raw_data', '_bound_blocks', 'raw_text') and '_loader' in self.__dict__:
+            value = self.__dict__.pop('_loader')()
+            self.is_lazy = value.is_lazy
+            self.raw_text = value.raw_text
+            self._raw_data = value._raw_data
+            self._bound_blocks = value._bound_blocks
+            return getattr(self, name)
+
+        raise AttributeError("%r object has no attribute %r" % (type(self).__name__, name))
+
     def _construct_stream_child(self, item):
         """
         Create a StreamChild instance from a (type, value, id) or (type, value) tuple,
@@ -616,6 +648,35 @@ class StreamValue(MutableSequence):
                 child_block, value, id=self._raw_data[i].get('id')
             )
 
+    @classmethod
+    def bulk_prefetch_blocks(cls, stream_values):
+        """
+        Populate _bound_blocks of all the given StreamValues, calling bulk_to_python once for
+        each child block across all of the streams, rather than once per stream as accessing
+        each value would. This batches database lookups (such as for image or page chooser
+        blocks) into a single query for all streams of the same StreamBlock.
+        """
+        # map the id of each child block to the child block and a list of
+        # (stream value, index within the stream) pairs for the items of that block
+        items_by_block = OrderedDict()
+        for stream_value in stream_values:
+            for i, raw_item in enumerate(stream_value._raw_data):
+                if stream_value._bound_blocks[i] is not None:
+                    continue
+
+                child_block = stream_value.stream_block.child_blocks[raw_item['type']]
+                items_by_block.setdefault(id(child_block), (child_block, []))[1].append((stream_value, i))
+
+        for child_block, items in items_by_block.values():
+            converted_values = child_block.bulk_to_python(
+                [stream_value._raw_data[i]['value'] for stream_value, i in items]
+            )
+
+            for (stream_value, i), value in zip(items, converted_values):
+                stream_value._bound_blocks[i] = StreamValue.StreamChild(
+                    child_block, value, id=stream_value._raw_data[i].get('id')
+                )
+
     def get_prep_value(self):
         prep_value = []
 
@@ -0,0 +1,534 @@
+import json
+import logging
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from modelcluster.models import get_all_child_m2m_relations, get_all_child_relations
+
+from wagtail.core.ancestor_cache import invalidate_ancestor
+from wagtail.core.models import (
+    Page, PageLogEntry, PageRevision, TranslatableMixin, _copy_m2m_relations, _extract_field_data)
+from wagtail.core.signals import page_published
+from wagtail.search import index
+
+
+logger = logging.getLogger('wagtail.core')
+
+# The number of pages that are copied in each database transaction
+DEFAULT_CHUNK_SIZE = 500
+
+# Fields that are taken from the page itself rather than from its latest revision when
+# creating the new revision of a copied page (see Page.with_content_json)
+PRESERVED_REVISION_FIELDS = [
+    'pk', 'content_type', 'path', 'depth', 'numchild', 'draft_title', 'live', 'has_unpublished_changes',
+    'owner', 'locked', 'locked_by', 'locked_at', 'latest_revision_created_at', 'first_published_at',
+    'translation_key', 'locale', 'alias_of',
+]
+
+
+def _get_concrete_models(model):
+    """
+    Return the models that have a database table holding fields of the given page
+    model, starting with Page and ending with the model itself
+    """
+    model = model._meta.concrete_model
+    return list(reversed(model._meta.get_parent_list())) + [model]
+
+
+def _insert_rows(model, objs, fields, using):
+    """
+    Insert rows for the given objects into the table of the given model only (not the
+    tables of its parent models), using as few INSERT statements as possible
+    """
+    batch_size = max(connections[using].ops.bulk_batch_size(fields, objs), 1)
+    queryset = model._base_manager.using(using)
+    for i in range(0, len(objs), batch_size):
+        queryset._insert(objs[i:i + batch_size], fields=fields, using=using)
+
+
+class PageCopy:
+    """
+    A page being copied by BulkSubtreeCopier, with its unsaved copy
+    """
+    def __init__(self, source, target, exclude_fields, update_attrs):
+        self.source = source
+        self.target = target
+        self.exclude_fields = exclude_fields
+        self.update_attrs = update_attrs
+
+        # Maps (child_relation, old_pk) to the copy of each child object
+        self.child_object_map = {}
+
+        self.revisions = []
+        self.latest_revision = None
+        self.new_revision = None
+
+
+class BulkSubtreeCopier:
+    """
+    Copies the descendants of ``source`` to ``destination`` (usually a copy of ``source``
+    that has just been created with ``Page.copy()``), making a fixed number of queries
+    for each chunk of pages rather than many queries for every page.
+
+    The copies take the same positions in the tree relative to ``destination`` as the
+    original pages have relative to ``source``, so their paths are known in advance.
+    Pages are inserted with one INSERT statement per table, and their child objects,
+    revisions and log entries are created in bulk.
+
+    Chunks of pages are copied in tree order, each in its own transaction. If copying is
+    interrupted, it can be resumed by running a new copier with the same ``source`` and
+    ``destination``, which skips the pages that have already been copied.
+
+    Unlike ``Page.copy()``, this doesn't call the ``save()`` method of the copied pages,
+    and no ``pre_save`` or ``post_save`` signals are sent for them. The copies are added
+    to the search index, and ``page_published`` is sent for copies that are live.
+    """
+    def __init__(self, source, destination, user=None, copy_revisions=True, keep_live=True,
+                 process_child_object=None, log_action='wagtail.copy', reset_translation_key=True,
+                 chunk_size=DEFAULT_CHUNK_SIZE):
+        if destination.path.startswith(source.path):
+            raise Exception("You cannot copy a tree branch recursively into itself")
+
+        self.source = source
+        self.destination = destination
+        self.user = user
+        self.copy_revisions = copy_revisions
+        self.keep_live = keep_live
+        self.process_child_object = process_child_object
+        self.log_action = log_action
+        self.reset_translation_key = reset_translation_key
+        self.chunk_size = chunk_size
+        self.db = destination._state.db
+
+        # The ID, admin display title and url_path of pages by path, for the source and
+        # copied pages that may be the parents of the pages in the next chunk
+        self.page_info = {}
+
+    def get_destination_path(self, source_path):
+        return self.destination.path + source_path[len(self.source.path):]
+
+    def get_source_path(self, destination_path):
+        return self.source.path + destination_path[len(self.destination.path):]
+
+    def get_pages_to_copy(self):
+        """
+        Return a queryset of the source pages that haven't been copied yet, in tree order
+        """
+        pages = Page.objects.using(self.db).descendant_of(self.source).order_by('path')
+
+        last_copied_path = (
+            Page.objects.using(self.db)
+            .descendant_of(self.destination)
+            .order_by('-path')
+            .values_list('path', flat=True)
+            .first()
+        )
+        if last_copied_path is not None:
+            pages = pages.filter(path__gt=self.get_source_path(last_copied_path))
+
+        return pages
+
+    def run(self, progress_callback=None):
+        """
+        Copy all of the pages that haven't been copied yet. If given, ``progress_callback``
+        is called after each chunk with the number of pages that have been copied so far
+        and the total number of pages to copy.
+        """
+        total = Page.objects.using(self.db).descendant_of(self.source).count()
+        copied = total - self.get_pages_to_copy().count()
+
+        # The copies have the same tree structure as the original pages
+        Page.objects.using(self.db).filter(pk=self.destination.pk).update(numchild=self.source.numchild)
+        self.destination.numchild = self.source.numchild
+
+        while True:
+            pages = list(self.get_pages_to_copy()[:self.chunk_size].specific())
+            if not pages:
+                break
+
+            with transaction.atomic(using=self.db):
+                self.copy_pages(pages)
+
+            copied += len(pages)
+            if progress_callback is not None:
+                progress_callback(copied, total)
+
+    def copy_pages(self, pages):
+        """
+        Copy a list of specific pages, in tree order. The parents of the pages must either
+        be in the list or have been copied already.
+        """
+        now = timezone.now()
+        copies = [self.make_copy(page) for page in pages]
+
+        # Fetch the parents of the pages, and their copies, if they aren't in this chunk
+        source_paths = {page.path for page in pages}
+        parent_paths = {page.path[:-page.steplen] for page in pages} - source_paths
+        self.get_page_info(parent_paths)
+        self.get_page_info(self.get_destination_path(path) for path in parent_paths)
+
+        url_paths = {path: page_info[2] for path, page_info in self.page_info.items()}
+        for copy in copies:
+            parent_url_path = url_paths[copy.target.path[:-copy.target.steplen]]
+            copy.target.url_path = url_paths[copy.target.path] = parent_url_path + copy.target.slug + '/'
+
+        self.copy_child_objects(copies)
+
+        if self.copy_revisions:
+            self.fetch_revisions(copies)
+
+        # Set the fields that Page.copy() updates when saving the new revision of each page
+        for copy in copies:
+            if not copy.target.alias_of_id:
+                copy.target.latest_revision_created_at = now
+                copy.target.draft_title = self.get_latest_content(copy)['title']
+                if self.keep_live:
+                    copy.target.first_published_at = copy.target.last_published_at = now
+
+        self.insert_pages(copies)
+        self.save_child_objects(copies)
+        self.save_revisions(copies, now)
+
+        for copy in copies:
+            self.page_info[copy.source.path] = (copy.source.id, copy.source.get_admin_display_title(), copy.source.url_path)
+            self.page_info[copy.target.path] = (copy.target.id, copy.target.get_admin_display_title(), copy.target.url_path)
+
+        if self.log_action:
+            self.create_log_entries(copies, now)
+
+        index.insert_or_update_objects([copy.target for copy in copies])
+
+        for copy in copies:
+            # Copies may be created at the paths of deleted pages
+            invalidate_ancestor(copy.target.path)
+
+            logger.info("Page copied: \"%s\" id=%d from=%d", copy.target.title, copy.target.id, copy.source.id)
+
+            if copy.target.live and copy.new_revision:
+                page_published.send(
+                    sender=copy.target.specific_class, instance=copy.target,
+                    revision=copy.new_revision
+                )
+
+    def make_copy(self, page):
+        exclude_fields = page.default_exclude_fields_in_copy + page.exclude_fields_in_copy
+
+        if self.keep_live:
+            update_attrs = {}
+        else:
+            update_attrs = {
+                'live': False,
+                'has_unpublished_changes': True,
+                'live_revision': None,
+                'first_published_at': None,
+                'last_published_at': None
+            }
+
+        if self.user:
+            update_attrs['owner'] = self.user
+
+        # When we're not copying for translation, we should give the translation_key a new value
+        if self.reset_translation_key:
+            update_attrs['translation_key'] = uuid.uuid4()
+
+        data_dict = _extract_field_data(page, exclude_fields=exclude_fields)
+        target = page.__class__(**data_dict)
+
+        for field, value in update_attrs.items():
+            if field in data_dict:
+                setattr(target, field, value)
+
+        # Hold empty relations in memory, so that serialising the copy doesn't query them
+        for field in get_all_child_m2m_relations(target):
+            if field.name not in data_dict:
+                setattr(target, field.name, [])
+
+        target.path = self.get_destination_path(page.path)
+        target.depth = self.destination.depth + page.depth - self.source.depth
+        target.numchild = page.numchild
+
+        return PageCopy(page, target, exclude_fields, update_attrs)
+
+    def get_page_info(self, paths):
+        """
+        Fetch the ID, admin display title and url_path of the pages at the given paths,
+        if they aren't already known
+        """
+        missing_paths = set(paths) - self.page_info.keys()
+        if missing_paths:
+            for page in Page.objects.using(self.db).filter(path__in=missing_paths).specific(defer=True):
+                self.page_info[page.path] = (page.id, page.get_admin_display_title(), page.url_path)
+
+    def copy_child_objects(self, copies):
+        """
+        Copy the child objects (with a ParentalKey to the page) of all pages, with one query
+        for each child relation. The copies are held in memory until save_child_objects().
+        """
+        copies_by_relation = {}
+        for copy in copies:
+            for child_relation in get_all_child_relations(copy.source):
+                if child_relation.get_accessor_name() in copy.exclude_fields:
+                    # Hold the empty relation in memory, so that serialising the copy doesn't query it
+                    getattr(copy.target, child_relation.get_accessor_name()).set([])
+                else:
+                    copies_by_relation.setdefault(child_relation, []).append(copy)
+
+        for child_relation, relation_copies in copies_by_relation.items():
+            child_objects_by_page_id = {}
+            child_objects = (
+                child_relation.related_model._default_manager.using(self.db)
+                .filter(**{child_relation.field.name + '__in': [copy.source.pk for copy in relation_copies]})
+                .order_by('pk')
+            )
+            for child_object in child_objects:
+                child_objects_by_page_id.setdefault(getattr(child_object, child_relation.field.attname), []).append(child_object)
+
+            for copy in relation_copies:
+                child_objects = child_objects_by_page_id.get(copy.source.pk, [])
+                for child_object in child_objects:
+                    copy.child_object_map[(child_relation, child_object.pk)] = child_object
+                    child_object.pk = None
+
+                getattr(copy.target, child_relation.get_accessor_name()).set(child_objects)
+
+                for child_object in child_objects:
+                    if self.process_child_object:
+                        self.process_child_object(copy.source, copy.target, child_relation, child_object)
+
+                    # When we're not copying for translation, we should give the translation_key a new value for each child object as well
+                    if self.reset_translation_key and isinstance(child_object, TranslatableMixin):
+                        child_object.translation_key = uuid.uuid4()
+
+    def fetch_revisions(self, copies):
+        copies_by_page_id = {copy.source.pk: copy for copy in copies}
+        for revision in PageRevision.objects.using(self.db).filter(page_id__in=copies_by_page_id.keys()).order_by('id'):
+            copies_by_page_id[revision.page_id].revisions.append(revision)
+
+        for copy in copies:
+            if copy.revisions:
+                copy.latest_revision = max(copy.revisions, key=lambda revision: (revision.created_at, revision.id))
+
+    def get_latest_content(self, copy):
+        """
+        Return the content for the new revision of the copied page, as a dict. Like
+        Page.get_latest_revision_as_page(), this uses the content of the latest revision
+        if the page has unpublished changes, and the page's own content otherwise.
+        """
+        if copy.target.has_unpublished_changes and copy.latest_revision is not None:
+            content = self.remap_revision_content(copy, copy.latest_revision.content_json)
+
+            # Preserve the values that are meaningful to the page as a whole
+            page_content = copy.target.serializable_data()
+            for field_name in PRESERVED_REVISION_FIELDS:
+                content[field_name] = page_content[field_name]
+
+            parent_url_path = copy.target.url_path[:-len(copy.target.slug) - 1]
+            content['url_path'] = parent_url_path + content['slug'] + '/'
+            return content
+
+        return copy.target.serializable_data()
+
+    def remap_revision_content(self, copy, content_json):
+        """
+        Return the content of a revision of the source page as a dict, updated to refer to
+        the copied page and its child objects
+        """
+        revision_content = json.loads(content_json)
+        revision_content['pk'] = copy.target.pk
+
+        for child_relation in get_all_child_relations(copy.source):
+            accessor_name = child_relation.get_accessor_name()
+            try:
+                child_objects = revision_content[accessor_name]
+            except KeyError:
+                # KeyErrors are possible if the revision was created
+                # before this child relation was added to the database
+                continue
+
+            for child_object in child_objects:
+                child_object[child_relation.field.name] = copy.target.pk
+
+                # Remap primary key to copied versions
+                # If the primary key is not recognised (eg, the child object has been deleted from the database)
+                # set the primary key to None
+                copied_child_object = copy.child_object_map.get((child_relation, child_object['pk']))
+                child_object['pk'] = copied_child_object.pk if copied_child_object else None
+
+        return revision_content
+
+    def insert_pages(self, copies):
+        """
+        Insert the copied pages with one INSERT statement for each table, and set their IDs
+        """
+        targets = [copy.target for copy in copies]
+        page_fields = [field for field in Page._meta.local_concrete_fields if not field.primary_key]
+        _insert_rows(Page, targets, page_fields, self.db)
+
+        # Paths are unique, so they can be used to find the IDs of the new pages on databases
+        # that don't return them from a multi-row INSERT
+        page_ids = dict(
+            Page.objects.using(self.db)
+            .filter(path__in=[target.path for target in targets])
+            .values_list('path', 'id')
+        )
+
+        targets_by_model = {}
+        for target in targets:
+            target.id = page_ids[target.path]
+            for field in target._meta.concrete_fields:
+                if field.remote_field and field.remote_field.parent_link:
+                    setattr(target, field.attname, target.id)
+
+            targets_by_model.setdefault(target._meta.concrete_model, []).append(target)
+
+        for model, model_targets in targets_by_model.items():
+            for concrete_model in _get_concrete_models(model)[1:]:
+                _insert_rows(concrete_model, model_targets, concrete_model._meta.local_concrete_fields, self.db)
+
+        for target in targets:
+            target._state.adding = False
+            target._state.db = self.db
+
+    def save_child_objects(self, copies):
+        """
+        Save the copied child objects and many-to-many relations of the copied pages
+        """
+        child_objects_by_model = {}
+        m2m_rows_by_through_model = {}
+
+        for copy in copies:
+            for (child_relation, old_pk), child_object in copy.child_object_map.items():
+                setattr(child_object, child_relation.field.attname, copy.target.pk)
+                child_objects_by_model.setdefault(type(child_object), []).append(child_object)
+
+            for field in get_all_child_m2m_relations(copy.target):
+                through = field.remote_field.through
+                if not through._meta.auto_created:
+                    getattr(copy.target, field.name).commit()
+                    continue
+
+                source_attname = through._meta.get_field(field.m2m_field_name()).attname
+                target_attname = through._meta.get_field(field.m2m_reverse_field_name()).attname
+                m2m_rows_by_through_model.setdefault(through, []).extend(
+                    through(**{source_attname: copy.target.pk, target_attname: obj.pk})
+                    for obj in getattr(copy.target, field.name).all()
+                )
+
+            _copy_m2m_relations(copy.source, copy.target, exclude_fields=copy.exclude_fields, update_attrs=copy.update_attrs)
+
+        can_return_ids = connections[self.db].features.can_return_rows_from_bulk_insert
+        for model, child_objects in child_objects_by_model.items():
+            # The IDs of the new child objects are needed for the revisions of the copied
+            # pages, so they can only be inserted in bulk if the database returns them
+            if can_return_ids and not model._meta.parents:
+                model._default_manager.using(self.db).bulk_create(child_objects)
+            else:
+                for child_object in child_objects:
+                    child_object.save(using=self.db)
+
+        for through, rows in m2m_rows_by_through_model.items():
+            through._default_manager.using(self.db).bulk_create(rows)
+
+    def save_revisions(self, copies, now):
+        """
+        Copy the revisions of the source pages (if copy_revisions is set) and create a new
+        revision for each copied page, as Page.copy() does
+        """
+        revisions = []
+        for copy in copies:
+            for revision in copy.revisions:
+                revision.content_json = json.dumps(self.remap_revision_content(copy, revision.content_json))
+                revision.pk = None
+                revision.page_id = copy.target.pk
+                revision.submitted_for_moderation = False
+                revision.approved_go_live_at = None
+                revisions.append(revision)
+
+            # Alias pages don't have revisions
+            if not copy.target.alias_of_id:
+                content = self.get_latest_content(copy)
+                copy.new_revision = PageRevision(
+                    page_id=copy.target.pk,
+                    content_json=json.dumps(content, cls=DjangoJSONEncoder),
+                    user=self.user,
+                    created_at=now,
+                    expire_at=content.get('expire_at'),
+                )
+                revisions.append(copy.new_revision)
+
+        PageRevision.objects.using(self.db).bulk_create(revisions)
+
+        new_revisions = [copy.new_revision for copy in copies if copy.new_revision]
+        if new_revisions and new_revisions[0].pk is None:
+            # The new revisions were created after the copied revisions of each page, so they
+            # have the highest ID
+            revision_ids = dict(
+                PageRevision.objects.using(self.db)
+                .filter(page_id__in=[revision.page_id for revision in new_revisions])
+                .values_list('page_id')
+                .annotate(Max('id'))
+            )
+            for revision in new_revisions:
+                revision.pk = revision_ids[revision.page_id]
+
+        if self.keep_live and new_revisions:
+            for copy in copies:
+                if copy.new_revision:
+                    copy.target.live_revision = copy.new_revision
+
+            Page.objects.using(self.db).bulk_update(
+                [copy.target for copy in copies if copy.new_revision], ['live_revision']
+            )
+
+    def create_log_entries(self, copies, now):
+        user_id = self.user.pk if self.user else None
+
+        log_entries = []
+        for copy in copies:
+            target = copy.target
+            source_parent = self.page_info[copy.source.path[:-copy.source.steplen]]
+            destination_parent = self.page_info[target.path[:-target.steplen]]
+            label = target.get_admin_display_title()
+
+            log_entries.append(PageLogEntry(
+                page=target,
+                content_type_id=target.content_type_id,
+                label=label,
+                action='wagtail.create',
+                user_id=user_id or target.owner_id,
+                timestamp=now,
+                data_json=json.dumps(''),
+                content_changed=True,
+            ))
+            log_entries.append(PageLogEntry(
+                page=target,
+                content_type_id=target.content_type_id,
+                label=label,
+                action=self.log_action,
+                user_id=user_id,
+                timestamp=now,
+                data_json=json.dumps({
+                    'page': {'id': target.id, 'title': label},
+                    'source': {'id': source_parent[0], 'title': source_parent[1]},
+                    'destination': {'id': destination_parent[0], 'title': destination_parent[1]},
+                    'keep_live': target.live and self.keep_live,
+                }),
+            ))
+
+            if target.live and self.keep_live and copy.new_revision:
+                # Log the publish if the user chose to keep the copied page live
+                log_entries.append(PageLogEntry(
+                    page=target,
+                    content_type_id=target.content_type_id,
+                    label=label,
+                    action='wagtail.publish',
+                    user_id=user_id,
+                    timestamp=now,
+                    data_json=json.dumps(''),
+                    revision=copy.new_revision,
+                ))
+
+        PageLogEntry.objects.using(self.db).bulk_create(log_entries)
@@ -1,5 +1,10 @@
+import base64
 import json
+import zlib
 
+from functools import partial
+
+from django.conf import settings
 from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils.encoding import force_str
@@ -27,6 +32,59 @@ class RichTextField(models.TextField):
         return [get_text_for_indexing(source)]
 
 
+COMPRESSED_TEXT_PREFIX = 'zlib:'
+
+
+def compress_text(value):
+    """
+    Compress a string with zlib, returning a base64-encoded string with a prefix that allows
+    it to be told apart from uncompressed text
+    """
+    compressed = zlib.compress(value.encode('utf-8'))
+    return COMPRESSED_TEXT_PREFIX + base64.b64encode(compressed).decode('ascii')
+
+
+def decompress_text(value):
+    """
+    Reverse compress_text. Strings that weren't compressed are returned as they are
+    """
+    if not value.startswith(COMPRESSED_TEXT_PREFIX):
+        return value
+
+    compressed = base64.b64decode(value[len(COMPRESSED_TEXT_PREFIX):])
+    return zlib.decompress(compressed).decode('utf-8')
+
+
+class CompressedTextField(models.TextField):
+    """
+    A TextField that is stored compressed when the WAGTAIL_REVISION_COMPRESSION setting is
+    enabled. The value is always decompressed when read from the database, so compressed
+    and uncompressed rows can exist side by side.
+
+    Note that database lookups (such as `contains`) only match uncompressed rows.
+    """
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return decompress_text(value)
+
+    def get_db_prep_save(self, value, connection):
+        value = super().get_db_prep_save(value, connection)
+
+        if (
+            getattr(settings, 'WAGTAIL_REVISION_COMPRESSION', False)
+            and isinstance(value, str)
+            and not value.startswith(COMPRESSED_TEXT_PREFIX)
+        ):
+            compressed = compress_text(value)
+
+            # Short values may end up longer after compression
+            if len(compressed) < len(value):
+                return compressed
+
+        return value
+
+
 # https://github.com/django/django/blob/64200c14e0072ba0ffef86da46b2ea82fd1e019a/django/db/models/fields/subclassing.py#L31-L44
 class Creator:
     """
@@ -96,23 +154,9 @@ class StreamField(models.Field):
         elif isinstance(value, StreamValue):
             return value
         elif isinstance(value, str):
-            try:
-                unpacked_value = json.loads(value)
-            except ValueError:
-                # value is not valid JSON; most likely, this field was previously a
-                # rich text field before being migrated to StreamField, and the data
-                # was left intact in the migration. Return an empty stream instead
-                # (but keep the raw text available as an attribute, so that it can be
-                # used to migrate that data to StreamField)
-                return StreamValue(self.stream_block, [], raw_text=value)
-
-            if unpacked_value is None:
-                # we get here if value is the literal string 'null'. This should probably
-                # never happen if the rest of the (de)serialization code is working properly,
-                # but better to handle it just in case...
-                return StreamValue(self.stream_block, [])
-
-            return self.stream_block.to_python(unpacked_value)
+            # Values are often loaded without being used (for example, when listing pages),
+            # so only decode the JSON when the value is first accessed
+            return StreamValue(self.stream_block, None, loader=partial(self._json_to_python, value))
         else:
             # See if it looks like the standard non-smart representation of a
             # StreamField value: a list of (block_name, value) tuples
@@ -125,6 +169,25 @@ class StreamField(models.Field):
             # Test succeeded, so return as a StreamValue-ified version of that value
             return StreamValue(self.stream_block, value)
 
+    def _json_to_python(self, value):
+        try:
+            unpacked_value = json.loads(value)
+        except ValueError:
+            # value is not valid JSON; most likely, this field was previously a
+            # rich text field before being migrated to StreamField, and the data
+            # was left intact in the migration. Return an empty stream instead
+            # (but keep the raw text available as an attribute, so that it can be
+            # used to migrate that data to StreamField)
+            return StreamValue(self.stream_block, [], raw_text=value)
+
+        if unpacked_value is None:
+            # we get here if value is the literal string 'null'. This should probably
+            # never happen if the rest of the (de)serialization code is working properly,
+            # but better to handle it just in case...
+            return StreamValue(self.stream_block, [])
+
+        return self.stream_block.to_python(unpacked_value)
+
     def get_prep_value(self, value):
         if isinstance(value, StreamValue) and not(value) and value.raw_text is not None:
             # An empty StreamValue with a nonempty raw_text attribute should have that
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from wagtail.core.fields import COMPRESSED_TEXT_PREFIX, compress_text
+from wagtail.core.models import PageRevision
+
+
+class Command(BaseCommand):
+    help = "Compresses the content of existing page revisions, or decompresses it with --decompress"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--decompress', action='store_true', default=False,
+            help="Store the content of all page revisions uncompressed")
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help="The number of revisions to update in each query")
+
+    def handle(self, *args, **options):
+        decompress = options['decompress']
+
+        if decompress and getattr(settings, 'WAGTAIL_REVISION_COMPRESSION', False):
+            raise CommandError("WAGTAIL_REVISION_COMPRESSION must be disabled to decompress page revisions")
+
+        # Lookups on content_json compare against the raw stored value, so this finds the
+        # revisions that need converting without decompressing anything
+        revisions = PageRevision.objects.only('id', 'content_json').order_by('id')
+        if decompress:
+            revisions = revisions.filter(content_json__startswith=COMPRESSED_TEXT_PREFIX)
+        else:
+            revisions = revisions.exclude(content_json__startswith=COMPRESSED_TEXT_PREFIX)
+
+        converted_count = 0
+        last_id = 0
+        while True:
+            batch = list(revisions.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+
+            # Values are decompressed as they are loaded, so decompressing is just a matter
+            # of saving them again
+            if not decompress:
+                for revision in batch:
+                    revision.content_json = compress_text(revision.content_json)
+
+            PageRevision.objects.bulk_update(batch, ['content_json'])
+
+            converted_count += len(batch)
+            last_id = batch[-1].id
+            self.stdout.write("Converted %d revisions" % converted_count)
+
+        self.stdout.write(self.style.SUCCESS(
+            "%s %d revisions" % ("Decompressed" if decompress else "Compressed", converted_count)
+        ))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from wagtail.core.bulk_copy import DEFAULT_CHUNK_SIZE, BulkSubtreeCopier
+from wagtail.core.models import Page
+
+
+class Command(BaseCommand):
+    help = "Copies a page and all of its descendants to a new parent page, in chunks of pages"
+
+    def add_arguments(self, parser):
+        # Positional arguments
+        parser.add_argument('from_id', type=int, help="The ID of the page to copy")
+        parser.add_argument('to_id', type=int, help="The ID of the page to copy it to")
+
+        parser.add_argument('--slug', help="The slug of the new page, if different to the original")
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help="The number of pages to copy in each database transaction")
+        parser.add_argument(
+            '--resume', action='store_true', default=False,
+            help="Resume an interrupted copy, where to_id is the ID of the partly-copied page")
+
+    def handle(self, *args, **options):
+        from_page = Page.objects.get(pk=options['from_id']).specific
+        to_page = Page.objects.get(pk=options['to_id'])
+
+        if options['resume']:
+            page_copy = to_page
+        else:
+            slug = options['slug'] or from_page.slug
+            if to_page.get_children().filter(slug=slug).exists():
+                raise CommandError('The page "%s" already has a child page with the slug "%s"' % (to_page.title, slug))
+            if to_page == from_page or to_page.is_descendant_of(from_page):
+                raise CommandError("You cannot copy a tree branch recursively into itself")
+
+            page_copy = from_page.copy(to=to_page, update_attrs={'slug': slug})
+            self.stdout.write('Copied "%s" to "%s" (id=%d)' % (from_page.title, to_page.title, page_copy.id))
+
+        def report_progress(copied, total):
+            self.stdout.write('Copied %d of %d descendant pages' % (copied, total))
+
+        BulkSubtreeCopier(
+            from_page, page_copy, chunk_size=options['chunk_size']
+        ).run(progress_callback=report_progress)
+
+        self.stdout.write('Done')
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from wagtail.core.models import PageMoveUpdate
+
+
+class Command(BaseCommand):
+    help = "Reindexes and purges the descendants of pages that have been moved, when WAGTAIL_DEFER_PAGE_MOVE_UPDATES is enabled"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dryrun', action='store_true', dest='dryrun', default=False,
+            help="Dry run -- don't change anything.")
+
+    def handle(self, *args, **options):
+        updates = PageMoveUpdate.objects.select_related('page')
+
+        if options['dryrun']:
+            self.stdout.write("Will do a dry run.")
+            if updates:
+                self.stdout.write("Moved pages to be updated:")
+                for update in updates:
+                    self.stdout.write("{0}\t{1}\t{2}".format(
+                        update.page_id, update.url_path_before, update.url_path_after
+                    ))
+            else:
+                self.stdout.write("No moved pages to be updated found.")
+            return
+
+        count = 0
+        for update in updates:
+            update.process()
+            count += 1
+
+        self.stdout.write("Updated %d moved pages." % count)
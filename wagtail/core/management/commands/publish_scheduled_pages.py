@@ -1,20 +1,31 @@
 import json
+import time
 
 from django.core.management.base import BaseCommand
-from django.utils import dateparse, timezone
+from django.db import close_old_connections
+from django.utils import timezone
 
 from wagtail.core.models import Page, PageRevision
 
 
-def revision_date_expired(r):
-    expiry_str = json.loads(r.content_json).get('expire_at')
-    if not expiry_str:
-        return False
-    expire_at = dateparse.parse_datetime(expiry_str)
-    if expire_at < timezone.now():
-        return True
-    else:
-        return False
+def iterate_in_batches(queryset, batch_size):
+    """
+    Yield the objects in the queryset, fetching batch_size objects at a time in order of
+    their primary keys. Objects are expected to be changed so that they drop out of the
+    queryset as they are processed, so each batch is fetched with a fresh query.
+    """
+    last_pk = None
+    while True:
+        batch_queryset = queryset.order_by('pk')
+        if last_pk is not None:
+            batch_queryset = batch_queryset.filter(pk__gt=last_pk)
+
+        batch = list(batch_queryset[:batch_size])
+        if not batch:
+            return
+
+        yield from batch
+        last_pk = batch[-1].pk
 
 
 class Command(BaseCommand):
@@ -22,6 +33,15 @@ class Command(BaseCommand):
         parser.add_argument(
             '--dryrun', action='store_true', dest='dryrun', default=False,
             help="Dry run -- don't change anything.")
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help="The number of pages to fetch from the database at a time")
+        parser.add_argument(
+            '--loop', action='store_true', default=False,
+            help="Keep running, checking for pages to publish or unpublish every --interval seconds")
+        parser.add_argument(
+            '--interval', type=float, default=10,
+            help="The number of seconds to wait between checks, with --loop")
 
     def handle(self, *args, **options):
         dryrun = False
@@ -29,10 +49,24 @@ class Command(BaseCommand):
             self.stdout.write("Will do a dry run.")
             dryrun = True
 
+        if not options['loop']:
+            self.publish_scheduled_pages(dryrun, options['batch_size'])
+            return
+
+        while True:
+            self.publish_scheduled_pages(dryrun, options['batch_size'])
+
+            # Don't hold on to a database connection that may have timed out
+            close_old_connections()
+            time.sleep(options['interval'])
+
+    def publish_scheduled_pages(self, dryrun, batch_size):
+        now = timezone.now()
+
         # 1. get all expired pages with live = True
         expired_pages = Page.objects.filter(
             live=True,
-            expire_at__lt=timezone.now()
+            expire_at__lt=now
         )
         if dryrun:
             if expired_pages:
@@ -49,17 +83,14 @@ class Command(BaseCommand):
                 self.stdout.write("No expired pages to be deactivated found.")
         else:
             # Unpublish the expired pages
-            # Cast to list to make sure the query is fully evaluated
-            # before unpublishing anything
-            for page in list(expired_pages):
+            for page in iterate_in_batches(expired_pages, batch_size):
                 page.unpublish(set_expired=True, log_action='wagtail.unpublish.scheduled')
 
         # 2. get all page revisions for moderation that have been expired
-        expired_revs = [
-            r for r in PageRevision.objects.filter(
-                submitted_for_moderation=True
-            ) if revision_date_expired(r)
-        ]
+        expired_revs = PageRevision.objects.filter(
+            submitted_for_moderation=True,
+            expire_at__lt=now
+        )
         if dryrun:
             self.stdout.write("---------------------------------")
             if expired_revs:
@@ -69,22 +100,18 @@ class Command(BaseCommand):
                 for er in expired_revs:
                     rev_data = json.loads(er.content_json)
                     self.stdout.write("{0}\t{1}\t{2}".format(
-                        dateparse.parse_datetime(
-                            rev_data.get('expire_at')
-                        ).strftime("%Y-%m-%d %H:%M"),
+                        er.expire_at.strftime("%Y-%m-%d %H:%M"),
                         rev_data.get('slug'),
                         rev_data.get('title')
                     ))
             else:
                 self.stdout.write("No expired revision to be dropped from moderation.")
         else:
-            for er in expired_revs:
-                er.submitted_for_moderation = False
-                er.save()
+            expired_revs.update(submitted_for_moderation=False)
 
         # 3. get all revisions that need to be published
         revs_for_publishing = PageRevision.objects.filter(
-            approved_go_live_at__lt=timezone.now()
+            approved_go_live_at__lt=now
         )
         if dryrun:
             self.stdout.write("---------------------------------")
@@ -102,7 +129,7 @@ class Command(BaseCommand):
             else:
                 self.stdout.write("No pages to go live.")
         else:
-            for rp in revs_for_publishing:
+            for rp in iterate_in_batches(revs_for_publishing.select_related('page', 'user'), batch_size):
                 # just run publish for the revision -- since the approved go
                 # live datetime is before now it will make the page live
                 rp.publish(user=rp.user, log_action='wagtail.publish.scheduled')
@@ -1,5 +1,7 @@
+import time
+
 from django.core.management.base import BaseCommand
-from django.db.models import Q
+from django.db.models import OuterRef, Q, Subquery
 from django.utils import timezone
 
 from wagtail.core.models import PageRevision
@@ -12,16 +14,34 @@ except ImportError:
     workflow_support = False
 
 
+DEFAULT_BATCH_SIZE = 1000
+
+
 class Command(BaseCommand):
     help = 'Delete page revisions which are not the latest revision for a page, published or scheduled to be published, or in moderation'
 
     def add_arguments(self, parser):
         parser.add_argument('--days', type=int, help="Only delete revisions older than this number of days")
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help="The number of revisions to delete in each query")
+        parser.add_argument(
+            '--max-runtime', type=int,
+            help="Stop deleting revisions after this number of seconds")
 
     def handle(self, *args, **options):
         days = options.get('days')
 
-        revisions_deleted = purge_revisions(days=days)
+        def report_progress(deleted_count):
+            if options['verbosity'] > 1:
+                self.stdout.write('Deleted %d revisions' % deleted_count)
+
+        revisions_deleted = purge_revisions(
+            days=days,
+            batch_size=options['batch_size'],
+            max_runtime=options['max_runtime'],
+            progress_callback=report_progress,
+        )
 
         if revisions_deleted:
             self.stdout.write(self.style.SUCCESS('Successfully deleted %s revisions' % revisions_deleted))
@@ -29,7 +49,7 @@ class Command(BaseCommand):
             self.stdout.write("No revisions deleted")
 
 
-def purge_revisions(days=None):
+def get_purgeable_revisions(days=None):
     # exclude revisions which have been submitted for moderation in the old system
     purgeable_revisions = PageRevision.objects.exclude(
         submitted_for_moderation=True
@@ -48,12 +68,35 @@ def purge_revisions(days=None):
         # only include revisions which were created before the cut off date
         purgeable_revisions = purgeable_revisions.filter(created_at__lt=purgeable_until)
 
+    # don't delete the latest revision for any page (matching PageRevision.is_latest_revision)
+    latest_revision = PageRevision.objects.filter(
+        page_id=OuterRef('page_id')
+    ).order_by('-created_at', '-id').values('id')[:1]
+
+    return purgeable_revisions.exclude(id=Subquery(latest_revision))
+
+
+def purge_revisions(days=None, batch_size=DEFAULT_BATCH_SIZE, max_runtime=None, progress_callback=None):
+    """
+    Delete purgeable revisions in batches of batch_size, stopping once max_runtime seconds
+    have passed (if given). progress_callback is called with the number of revisions
+    deleted so far after each batch. Returns the number of revisions deleted.
+    """
+    purgeable_revision_ids = get_purgeable_revisions(days=days).order_by('id').values_list('id', flat=True)
+    started_at = time.monotonic()
+
     deleted_revisions_count = 0
 
-    for revision in purgeable_revisions:
-        # don't delete the latest revision for any page
-        if not revision.is_latest_revision():
-            revision.delete()
-            deleted_revisions_count += 1
+    while max_runtime is None or time.monotonic() - started_at < max_runtime:
+        batch = list(purgeable_revision_ids[:batch_size])
+        if not batch:
+            break
+
+        # The content isn't needed to delete revisions, and can be very large
+        PageRevision.objects.filter(id__in=batch).defer('content_json').delete()
+        deleted_revisions_count += len(batch)
+
+        if progress_callback:
+            progress_callback(deleted_revisions_count)
 
     return deleted_revisions_count
@@ -1,7 +1,9 @@
 from django.core.management.base import BaseCommand
 from django.db import models
+from django.db.models import Q
 from modelcluster.models import get_all_child_relations
 
+from wagtail.core.fields import COMPRESSED_TEXT_PREFIX
 from wagtail.core.models import PageRevision, get_page_models
 
 
@@ -32,7 +34,14 @@ class Command(BaseCommand):
         from_text = options['from_text']
         to_text = options['to_text']
 
-        for revision in PageRevision.objects.filter(content_json__contains=from_text):
+        # Compressed revisions can't be searched by the database, so check those after decompressing them
+        revisions = PageRevision.objects.filter(
+            Q(content_json__contains=from_text) | Q(content_json__startswith=COMPRESSED_TEXT_PREFIX)
+        )
+        for revision in revisions.iterator():
+            if from_text not in revision.content_json:
+                continue
+
             revision.content_json = revision.content_json.replace(from_text, to_text)
             revision.save(update_fields=['content_json'])
 
@@ -0,0 +1,29 @@
+# Generated by Django 3.1.14 on 2021-03-01 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wagtailcore', '0061_change_promote_tab_helpt_text_and_verbose_names'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageMoveUpdate',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_path_before', models.TextField(verbose_name='URL path before move')),
+                ('url_path_after', models.TextField(verbose_name='URL path after move')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('page', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='wagtailcore.page', verbose_name='page')),
+            ],
+            options={
+                'verbose_name': 'page move update',
+                'verbose_name_plural': 'page move updates',
+                'ordering': ['created_at', 'id'],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.1.14 on 2021-03-02 10:12
+
+from django.db import migrations
+import wagtail.core.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wagtailcore', '0062_pagemoveupdate'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pagerevision',
+            name='content_json',
+            field=wagtail.core.fields.CompressedTextField(verbose_name='content JSON'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.1.14 on 2021-03-03 09:30
+
+import json
+
+from django.db import migrations, models
+from django.utils import dateparse
+
+
+def populate_revision_expire_at(apps, schema_editor):
+    PageRevision = apps.get_model('wagtailcore.PageRevision')
+
+    # Only revisions in moderation are checked for expiry, so there is no need to
+    # decode the content of every revision
+    for revision in PageRevision.objects.filter(submitted_for_moderation=True).iterator():
+        expire_at = json.loads(revision.content_json).get('expire_at')
+        if expire_at:
+            PageRevision.objects.filter(id=revision.id).update(expire_at=dateparse.parse_datetime(expire_at))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wagtailcore', '0063_compress_revision_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pagerevision',
+            name='expire_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True, verbose_name='expiry date/time'),
+        ),
+        migrations.AlterField(
+            model_name='page',
+            name='expire_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='expiry date/time'),
+        ),
+        migrations.RunPython(populate_revision_expire_at, migrations.RunPython.noop),
+    ]
@@ -4,7 +4,8 @@ import uuid
 
 from collections import namedtuple
 from io import StringIO
-from urllib.parse import urlparse
+from itertools import islice
+from urllib.parse import quote, urlparse
 
 from django import VERSION as DJANGO_VERSION
 from django import forms
@@ -32,6 +33,7 @@ from django.utils.cache import patch_cache_control
 from django.utils.encoding import force_str
 from django.utils.functional import cached_property
 from django.utils.html import format_html
+from django.utils.http import RFC3986_SUBDELIMS, escape_leading_slashes
 from django.utils.module_loading import import_string
 from django.utils.safestring import mark_safe
 from django.utils.text import capfirst, slugify
@@ -40,13 +42,18 @@ from modelcluster.fields import ParentalKey, ParentalManyToManyField
 from modelcluster.models import ClusterableModel, get_all_child_relations
 from treebeard.mp_tree import MP_Node
 
+from wagtail.core.ancestor_cache import clear_ancestor_cache, invalidate_ancestor
+from wagtail.core.fields import CompressedTextField
 from wagtail.core.forms import TaskStateCommentForm
 from wagtail.core.query import PageQuerySet, TreeQuerySet
+from wagtail.core.revision_cache import page_from_json
+from wagtail.core.rich_text.cache import clear_rich_text_cache
+from wagtail.core.route_cache import clear_route_cache
 from wagtail.core.signals import (
-    page_published, page_unpublished, post_page_move, pre_page_move, task_approved, task_cancelled,
-    task_rejected, task_submitted, workflow_approved, workflow_cancelled, workflow_rejected,
-    workflow_submitted)
-from wagtail.core.sites import get_site_for_hostname
+    page_published, page_unpublished, post_page_move, post_page_subtree_move, pre_page_move,
+    task_approved, task_cancelled, task_rejected, task_submitted, workflow_approved,
+    workflow_cancelled, workflow_rejected, workflow_submitted)
+from wagtail.core.sites import clear_site_index, get_site_for_hostname
 from wagtail.core.treebeard import TreebeardPathFixMixin
 from wagtail.core.url_routing import RouteResult
 from wagtail.core.utils import WAGTAIL_APPEND_SLASH, camelcase_to_underscore, resolve_model_string
@@ -193,6 +200,10 @@ class Site(models.Model):
 
     objects = SiteManager()
 
+    # A copy of the site root paths held in the memory of this process, along with the
+    # version number it was fetched with (see get_site_root_paths)
+    _local_site_root_paths = None
+
     class Meta:
         unique_together = ('hostname', 'port')
         verbose_name = _('site')
@@ -297,6 +308,15 @@ class Site(models.Model):
         - `root_url` - The scheme/domain name of the site (for example 'https://www.example.com/')
         - `language_code` - The language code of the site (for example 'en')
         """
+        # The site root paths are kept in the memory of each process, tagged with a version
+        # number held in the shared cache alongside them, so that they only need to be fetched
+        # from the shared cache (or rebuilt) when a site or site root page has changed.
+        version = cache.get('wagtail_site_root_paths_version')
+        if version is not None and Site._local_site_root_paths is not None:
+            local_version, local_result = Site._local_site_root_paths
+            if local_version == version:
+                return local_result
+
         result = cache.get('wagtail_site_root_paths')
 
         # Wagtail 2.11 changed the way site root paths were stored. This can cause an upgraded 2.11
@@ -304,20 +324,257 @@ class Site(models.Model):
         # versions of Wagtail. The line below checks if the any of the cached site urls is consistent
         # with an older version of Wagtail and invalidates the cache.
         if result is None or any(len(site_record) == 3 for site_record in result):
-            result = []
+            result = Site._build_site_root_paths()
+            version = uuid.uuid4().hex
+            cache.set_many({
+                'wagtail_site_root_paths': result,
+                'wagtail_site_root_paths_version': version,
+            }, 3600)
+        elif version is None:
+            version = uuid.uuid4().hex
+            cache.set('wagtail_site_root_paths_version', version, 3600)
+
+        Site._local_site_root_paths = (version, result)
+        return result
+
+    @staticmethod
+    def _build_site_root_paths():
+        sites = Site.objects.select_related('root_page', 'root_page__locale').order_by('-root_page__url_path', '-is_default_site', 'hostname')
 
-            for site in Site.objects.select_related('root_page', 'root_page__locale').order_by('-root_page__url_path', '-is_default_site', 'hostname'):
-                if getattr(settings, 'WAGTAIL_I18N_ENABLED', False):
-                    result.extend([
-                        SiteRootPath(site.id, root_page.url_path, site.root_url, root_page.locale.language_code)
-                        for root_page in site.root_page.get_translations(inclusive=True).select_related('locale')
-                    ])
-                else:
-                    result.append(SiteRootPath(site.id, site.root_page.url_path, site.root_url, site.root_page.locale.language_code))
+        if not getattr(settings, 'WAGTAIL_I18N_ENABLED', False):
+            return [
+                SiteRootPath(site.id, site.root_page.url_path, site.root_url, site.root_page.locale.language_code)
+                for site in sites
+            ]
 
-            cache.set('wagtail_site_root_paths', result, 3600)
+        # Fetch the translations of all site root pages in one query
+        sites = list(sites)
+        translations = {}
+        root_page_translations = Page.objects.filter(
+            translation_key__in={site.root_page.translation_key for site in sites}
+        ).select_related('locale').order_by('path')
+        for root_page in root_page_translations:
+            translations.setdefault(root_page.translation_key, []).append(root_page)
 
-        return result
+        return [
+            SiteRootPath(site.id, root_page.url_path, site.root_url, root_page.locale.language_code)
+            for site in sites
+            for root_page in translations.get(site.root_page.translation_key, [])
+        ]
+
+
+class _SiteRootPathTrieNode:
+    __slots__ = ('children', 'site_root_paths')
+
+    def __init__(self):
+        self.children = {}
+        self.site_root_paths = []
+
+
+class PageUrlGenerator:
+    """
+    Generates URLs for pages using the default rules of ``Page.get_url_parts``, sharing
+    the work that does not depend on the individual page. Site root paths are held in a
+    prefix trie so that each page's ``url_path`` is matched in a single walk, and the
+    ``wagtail_serve`` URL pattern is reversed once per language rather than once per page.
+
+    A generator for a given request can be obtained with ``PageUrlGenerator.for_request``,
+    and used to find the URLs of many pages at once (for example, to render a menu):
+
+    .. code-block:: python
+
+        urls = PageUrlGenerator.for_request(request).get_urls(pages)
+
+    Pages with a custom ``get_url_parts`` or ``get_url`` method are passed to that method.
+    """
+
+    def __init__(self, site_root_paths, current_site=None):
+        self.site_root_paths = site_root_paths
+        self.current_site = current_site
+        self.num_sites = len(set(root_path.site_id for root_path in site_root_paths))
+        self._serve_prefixes = {}
+
+        self._trie = _SiteRootPathTrieNode()
+        for position, site_root_path in enumerate(site_root_paths):
+            node = self._trie
+            for segment in site_root_path.root_path.split('/'):
+                if segment:
+                    node = node.children.setdefault(segment, _SiteRootPathTrieNode())
+            node.site_root_paths.append((position, site_root_path))
+
+    @classmethod
+    def for_request(cls, request=None, page=None):
+        """
+        Return a generator for the given request, which is cached on the request object
+        (or on ``page``, if no request is given).
+        """
+        cache_object = request if request else page
+        try:
+            return cache_object._wagtail_cached_url_generator
+        except AttributeError:
+            pass
+
+        if page is not None:
+            site_root_paths = page._get_site_root_paths(request)
+        elif request is not None:
+            try:
+                site_root_paths = request._wagtail_cached_site_root_paths
+            except AttributeError:
+                site_root_paths = request._wagtail_cached_site_root_paths = Site.get_site_root_paths()
+        else:
+            site_root_paths = Site.get_site_root_paths()
+
+        generator = cls(site_root_paths, current_site=Site.find_for_request(request))
+        if cache_object is not None:
+            cache_object._wagtail_cached_url_generator = generator
+        return generator
+
+    def get_possible_site_root_paths(self, url_path):
+        """
+        Return the site root paths that contain the given url_path, in the order of
+        ``Site.get_site_root_paths`` (most specific path first).
+        """
+        matches = list(self._trie.site_root_paths)
+        node = self._trie
+        for segment in url_path.split('/'):
+            if not segment:
+                continue
+            node = node.children.get(segment)
+            if node is None:
+                break
+            matches.extend(node.site_root_paths)
+
+        return [site_root_path for position, site_root_path in sorted(matches, key=lambda match: match[0])]
+
+    def get_serve_prefix(self, language_code=None):
+        """
+        Return the URL that the ``wagtail_serve`` view is mounted at (for the given
+        language, when internationalisation is enabled), or None if it is not routable.
+        """
+        try:
+            return self._serve_prefixes[language_code]
+        except KeyError:
+            pass
+
+        try:
+            if language_code:
+                with translation.override(language_code):
+                    prefix = reverse('wagtail_serve', args=('',))
+            else:
+                prefix = reverse('wagtail_serve', args=('',))
+        except NoReverseMatch:
+            prefix = None
+
+        self._serve_prefixes[language_code] = prefix
+        return prefix
+
+    def get_default_url_parts(self, page):
+        """
+        Implements the default behaviour of ``Page.get_url_parts``, ignoring any override of
+        that method on the page's class.
+        """
+        possible_sites = self.get_possible_site_root_paths(page.url_path)
+
+        if not possible_sites:
+            return None
+
+        site_id, root_path, root_url, language_code = possible_sites[0]
+
+        if self.current_site:
+            for site_id, root_path, root_url, language_code in possible_sites:
+                if site_id == self.current_site.pk:
+                    break
+            else:
+                site_id, root_path, root_url, language_code = possible_sites[0]
+
+        use_wagtail_i18n = getattr(settings, 'WAGTAIL_I18N_ENABLED', False)
+
+        if use_wagtail_i18n:
+            # If the active language code is a variant of the page's language, then
+            # use that instead
+            # This is used when LANGUAGES contain more languages than WAGTAIL_CONTENT_LANGUAGES
+            try:
+                if get_supported_content_language_variant(translation.get_language()) == language_code:
+                    language_code = translation.get_language()
+            except LookupError:
+                # active language code is not a recognised content language, so leave
+                # page's language code unchanged
+                pass
+
+        # The page may not be routable because wagtail_serve is not registered
+        # This may be the case if Wagtail is used headless
+        serve_prefix = self.get_serve_prefix(language_code if use_wagtail_i18n else None)
+        if serve_prefix is None:
+            return (site_id, None, None)
+
+        # Quote the path in the same way as Django's reverse() would
+        page_path = escape_leading_slashes(
+            serve_prefix + quote(page.url_path[len(root_path):], safe=RFC3986_SUBDELIMS + '/~:@')
+        )
+
+        # Remove the trailing slash from the URL reverse generates if
+        # WAGTAIL_APPEND_SLASH is False and we're not trying to serve
+        # the root path
+        if not WAGTAIL_APPEND_SLASH and page_path != '/':
+            page_path = page_path.rstrip('/')
+
+        return (site_id, root_url, page_path)
+
+    def get_url_parts(self, page, request=None):
+        if type(page).get_url_parts is not Page.get_url_parts:
+            return page.get_url_parts(request=request)
+
+        return self.get_default_url_parts(page)
+
+    def get_url(self, page, request=None):
+        """
+        Equivalent to ``page.get_url(request)``
+        """
+        if type(page).get_url is not Page.get_url:
+            return page.get_url(request=request)
+
+        url_parts = self.get_url_parts(page, request=request)
+
+        if url_parts is None or url_parts[1] is None and url_parts[2] is None:
+            # page is not routable
+            return
+
+        site_id, root_url, page_path = url_parts
+
+        if (self.current_site is not None and site_id == self.current_site.id) or self.num_sites == 1:
+            # the site matches OR we're only running a single site, so a local URL is sufficient
+            return page_path
+        else:
+            return root_url + page_path
+
+    def get_full_url(self, page, request=None):
+        """
+        Equivalent to ``page.get_full_url(request)``
+        """
+        if type(page).get_full_url is not Page.get_full_url:
+            return page.get_full_url(request=request)
+
+        url_parts = self.get_url_parts(page, request=request)
+
+        if url_parts is None or url_parts[1] is None and url_parts[2] is None:
+            # page is not routable
+            return
+
+        site_id, root_url, page_path = url_parts
+
+        return root_url + page_path
+
+    def get_urls(self, pages, request=None):
+        """
+        Return a list of URLs for the given pages, as returned by ``page.get_url(request)``
+        """
+        return [self.get_url(page, request=request) for page in pages]
+
+    def get_full_urls(self, pages, request=None):
+        """
+        Return a list of full URLs for the given pages, as returned by ``page.get_full_url(request)``
+        """
+        return [self.get_full_url(page, request=request) for page in pages]
 
 
 def pk(obj):
@@ -655,6 +912,9 @@ def set_locale_on_new_instance(sender, instance, **kwargs):
 
 PAGE_MODEL_CLASSES = []
 
+# The number of pages that are loaded and reindexed at a time after a subtree is moved
+MOVED_SUBTREE_CHUNK_SIZE = 1000
+
 
 def get_page_models():
     """
@@ -785,7 +1045,8 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
     expire_at = models.DateTimeField(
         verbose_name=_("expiry date/time"),
         blank=True,
-        null=True
+        null=True,
+        db_index=True
     )
     expired = models.BooleanField(verbose_name=_('expired'), default=False, editable=False)
 
@@ -908,6 +1169,15 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
 
         return self.url_path
 
+    def _get_parent_url_path(self):
+        """
+        Return the url_path of this page's parent, as found from the url_path of this page,
+        or None if this page is the root page or its url_path doesn't end with its slug
+        """
+        suffix = '/' + self.slug + '/'
+        if self.depth > 1 and self.url_path and self.url_path.endswith(suffix):
+            return self.url_path[:-len(suffix) + 1]
+
     @staticmethod
     def _slug_is_available(slug, parent_page, page=None):
         """
@@ -1031,14 +1301,19 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
 
         result = super().save(**kwargs)
 
+        # The page may have been renamed or published, or created at the path of a deleted page
+        invalidate_ancestor(self.path)
+
         if not is_new and update_descendant_url_paths:
             self._update_descendant_url_paths(old_url_path, new_url_path)
 
-        # Check if this is a root page of any sites and clear the 'wagtail_site_root_paths' key if so
+        # Check if this is a root page of any sites and clear the 'wagtail_site_root_paths' keys and
+        # the index of sites (which holds the root page's field values) if so
         # Note: New translations of existing site roots are considered site roots as well, so we must
         #       always check if this page is a site root, even if it's new.
         if self.is_site_root():
-            cache.delete('wagtail_site_root_paths')
+            cache.delete_many(['wagtail_site_root_paths', 'wagtail_site_root_paths_version'])
+            clear_site_index()
 
         # Log
         if is_new:
@@ -1168,6 +1443,32 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
                 )
             )
         )
+        clear_route_cache()
+        clear_ancestor_cache()
+        clear_rich_text_cache()
+        # The url_path of a site root page below this one may have changed
+        clear_site_index()
+
+    def _update_moved_subtree(self, old_url_path, new_url_path):
+        """
+        Reindex the descendants of this page after it has been moved (their path, depth
+        and url_path fields have all changed) and emit the post_page_subtree_move signal.
+        Descendants are indexed in chunks, with one request per page type to each search
+        backend, rather than being saved individually.
+        """
+        descendants = self.get_descendants().specific().iterator(chunk_size=MOVED_SUBTREE_CHUNK_SIZE)
+        while True:
+            chunk = list(islice(descendants, MOVED_SUBTREE_CHUNK_SIZE))
+            if not chunk:
+                break
+            index.insert_or_update_objects(chunk)
+
+        post_page_subtree_move.send(
+            sender=self.specific_class or self.__class__,
+            instance=self,
+            url_path_before=old_url_path,
+            url_path_after=new_url_path,
+        )
 
     def get_specific(self, deferred=False, copy_attrs=None):
         """
@@ -1316,6 +1617,9 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
         return localized
 
     def route(self, request, path_components):
+        if path_components and getattr(settings, 'WAGTAIL_ROUTE_BY_URL_PATH', False):
+            return self._route_by_url_path(request, path_components)
+
         if path_components:
             # request is for a child of this page
             child_slug = path_components[0]
@@ -1335,6 +1639,45 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
             else:
                 raise Http404
 
+    def _route_by_url_path(self, request, path_components):
+        """
+        Equivalent to the default behaviour of ``route``, but fetches all of the pages along
+        the requested path in a single query (matching on ``url_path`` within this page's
+        subtree) instead of one query per path component. Only the page that ends up handling
+        the request is fetched in its specific form.
+
+        Any page along the way whose class overrides ``route`` (such as a ``RoutablePageMixin``
+        page) is handed the remaining path components, exactly as the default routing would.
+        """
+        url_paths = []
+        url_path = self.url_path
+        for component in path_components:
+            url_path += component + '/'
+            url_paths.append(url_path)
+
+        pages_by_url_path = {
+            page.url_path: page
+            for page in Page.objects.filter(
+                path__startswith=self.path,
+                depth__gt=self.depth,
+                depth__lte=self.depth + len(path_components),
+                url_path__in=url_paths,
+            )
+        }
+
+        page = self
+        for depth, url_path in enumerate(url_paths, 1):
+            try:
+                page = pages_by_url_path[url_path]
+            except KeyError:
+                raise Http404
+
+            if (page.specific_class or Page).route is not Page.route:
+                # this page has its own routing logic, so let it handle the rest of the path
+                return page.specific.route(request, path_components[depth:])
+
+        return page.specific.route(request, [])
+
     def get_admin_display_title(self):
         """
         Return the title for this page as it should appear in the admin backend;
@@ -1375,6 +1718,7 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
             user=user,
             submitted_for_moderation=submitted_for_moderation,
             approved_go_live_at=approved_go_live_at,
+            expire_at=self.expire_at,
         )
 
         update_fields = []
@@ -1653,59 +1997,7 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
         when calling ``super``.
         """
 
-        possible_sites = [
-            (pk, path, url, language_code)
-            for pk, path, url, language_code in self._get_site_root_paths(request)
-            if self.url_path.startswith(path)
-        ]
-
-        if not possible_sites:
-            return None
-
-        site_id, root_path, root_url, language_code = possible_sites[0]
-
-        site = Site.find_for_request(request)
-        if site:
-            for site_id, root_path, root_url, language_code in possible_sites:
-                if site_id == site.pk:
-                    break
-            else:
-                site_id, root_path, root_url, language_code = possible_sites[0]
-
-        use_wagtail_i18n = getattr(settings, 'WAGTAIL_I18N_ENABLED', False)
-
-        if use_wagtail_i18n:
-            # If the active language code is a variant of the page's language, then
-            # use that instead
-            # This is used when LANGUAGES contain more languages than WAGTAIL_CONTENT_LANGUAGES
-            try:
-                if get_supported_content_language_variant(translation.get_language()) == language_code:
-                    language_code = translation.get_language()
-            except LookupError:
-                # active language code is not a recognised content language, so leave
-                # page's language code unchanged
-                pass
-
-        # The page may not be routable because wagtail_serve is not registered
-        # This may be the case if Wagtail is used headless
-        try:
-            if use_wagtail_i18n:
-                with translation.override(language_code):
-                    page_path = reverse(
-                        'wagtail_serve', args=(self.url_path[len(root_path):],))
-            else:
-                page_path = reverse(
-                    'wagtail_serve', args=(self.url_path[len(root_path):],))
-        except NoReverseMatch:
-            return (site_id, None, None)
-
-        # Remove the trailing slash from the URL reverse generates if
-        # WAGTAIL_APPEND_SLASH is False and we're not trying to serve
-        # the root path
-        if not WAGTAIL_APPEND_SLASH and page_path != '/':
-            page_path = page_path.rstrip('/')
-
-        return (site_id, root_url, page_path)
+        return PageUrlGenerator.for_request(request, page=self).get_default_url_parts(self)
 
     def get_full_url(self, request=None):
         """Return the full URL (including protocol / domain) to this page, or None if it is not routable"""
@@ -2009,6 +2301,11 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
             if old_url_path != new_url_path:
                 new_self._update_descendant_url_paths(old_url_path, new_url_path)
 
+        # The paths of this page and its descendants have changed, and treebeard may
+        # have renumbered the paths of its new siblings (which may be site root pages)
+        clear_ancestor_cache()
+        clear_site_index()
+
         # Emit post_page_move signal
         post_page_move.send(
             sender=self.specific_class or self.__class__,
@@ -2019,6 +2316,11 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
             url_path_after=new_url_path,
         )
 
+        # Queue the moved subtree to be reindexed and purged from the frontend cache by the
+        # process_page_move_updates command, rather than doing this work in the move request
+        if getattr(settings, 'WAGTAIL_DEFER_PAGE_MOVE_UPDATES', False):
+            PageMoveUpdate.objects.create(page=new_self, url_path_before=old_url_path, url_path_after=new_url_path)
+
         # Log
         PageLogEntry.objects.log_action(
             instance=self,
@@ -2038,11 +2340,14 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
         logger.info("Page moved: \"%s\" id=%d path=%s", self.title, self.id, new_url_path)
 
     def copy(self, recursive=False, to=None, update_attrs=None, copy_revisions=True, keep_live=True, user=None,
-             process_child_object=None, exclude_fields=None, log_action='wagtail.copy', reset_translation_key=True, _mpnode_attrs=None):
+             process_child_object=None, exclude_fields=None, log_action='wagtail.copy', reset_translation_key=True,
+             bulk=False, _mpnode_attrs=None):
         """
         Copies a given page
         :param log_action flag for logging the action. Pass None to skip logging.
             Can be passed an action string. Defaults to 'wagtail.copy'
+        :param bulk: when copying recursively, copy the descendant pages in bulk with
+            ``wagtail.core.bulk_copy.BulkSubtreeCopier`` instead of calling ``copy()`` on each one
         """
 
         if self._state.adding:
@@ -2188,7 +2493,20 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
         logger.info("Page copied: \"%s\" id=%d from=%d", page_copy.title, page_copy.id, self.id)
 
         # Copy child pages
-        if recursive:
+        if recursive and bulk:
+            from wagtail.core.bulk_copy import BulkSubtreeCopier
+
+            BulkSubtreeCopier(
+                self, page_copy,
+                user=user,
+                copy_revisions=copy_revisions,
+                keep_live=keep_live,
+                process_child_object=process_child_object,
+                log_action=log_action,
+                reset_translation_key=reset_translation_key,
+            ).run()
+
+        elif recursive:
             numchild = 0
 
             for child_page in self.get_children().specific():
@@ -2737,7 +3055,7 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
         * ``alias_of``
         """
 
-        obj = self.specific_class.from_json(content_json)
+        obj = page_from_json(self.specific_class, content_json)
 
         # These should definitely never change between revisions
         obj.id = self.id
@@ -2751,7 +3069,12 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
 
         # Update url_path to reflect potential slug changes, but maintining the page's
         # existing tree position
-        obj.set_url_path(self.get_parent())
+        parent_url_path = self._get_parent_url_path()
+        if parent_url_path is not None and type(obj).set_url_path is Page.set_url_path:
+            # Avoid a query for the parent page, which set_url_path only needs for its url_path
+            obj.url_path = parent_url_path + obj.slug + '/'
+        else:
+            obj.set_url_path(self.get_parent())
 
         # Ensure other values that are meaningful for the page as a whole (rather than
         # to a specific revision) are preserved
@@ -2844,13 +3167,22 @@ class PageRevision(models.Model):
         settings.AUTH_USER_MODEL, verbose_name=_('user'), null=True, blank=True,
         on_delete=models.SET_NULL
     )
-    content_json = models.TextField(verbose_name=_('content JSON'))
+    content_json = CompressedTextField(verbose_name=_('content JSON'))
     approved_go_live_at = models.DateTimeField(
         verbose_name=_('approved go live at'),
         null=True,
         blank=True,
         db_index=True
     )
+    # A copy of the page's expire_at value in content_json, so that expired revisions
+    # in moderation can be found without decoding the content of every revision
+    expire_at = models.DateTimeField(
+        verbose_name=_('expiry date/time'),
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True
+    )
 
     objects = models.Manager()
     submitted_revisions = SubmittedRevisionsManager()
@@ -3076,6 +3408,40 @@ class PageRevision(models.Model):
         verbose_name_plural = _('page revisions')
 
 
+class PageMoveUpdate(models.Model):
+    """
+    A moved page whose descendants have not yet been reindexed, recorded when
+    WAGTAIL_DEFER_PAGE_MOVE_UPDATES is enabled. These are processed by the
+    process_page_move_updates management command.
+    """
+    page = models.ForeignKey(
+        'wagtailcore.Page',
+        verbose_name=_('page'),
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    url_path_before = models.TextField(verbose_name=_('URL path before move'))
+    url_path_after = models.TextField(verbose_name=_('URL path after move'))
+    created_at = models.DateTimeField(verbose_name=_('created at'), auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        verbose_name = _('page move update')
+        verbose_name_plural = _('page move updates')
+
+    def __str__(self):
+        return "PageMoveUpdate %d: page %d moved from '%s' to '%s'" % (
+            self.pk, self.page_id, self.url_path_before, self.url_path_after
+        )
+
+    def process(self):
+        """
+        Carry out the deferred updates for the moved page, then delete this record
+        """
+        self.page._update_moved_subtree(self.url_path_before, self.url_path_after)
+        self.delete()
+
+
 PAGE_PERMISSION_TYPES = [
     ('add', _("Add"), _("Add/edit pages you own")),
     ('edit', _("Edit"), _("Edit any page")),
@@ -2,14 +2,17 @@ import posixpath
 import warnings
 
 from collections import defaultdict
+from itertools import islice
 
 from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import CharField, Q
+from django.db.models import CharField, Model, Q
+from django.db.models.constants import LOOKUP_SEP
 from django.db.models.functions import Length, Substr
-from django.db.models.query import BaseIterable
+from django.db.models.query import BaseIterable, ModelIterable
 from treebeard.mp_tree import MP_NodeQuerySet
 
+from wagtail.core.blocks import StreamValue
 from wagtail.search.queryset import SearchableQuerySetMixin
 
 
@@ -135,6 +138,49 @@ class TreeQuerySet(MP_NodeQuerySet):
 
 
 class PageQuerySet(SearchableQuerySetMixin, TreeQuerySet):
+    _prefetch_stream_fields = ()
+    _stream_blocks_prefetched = False
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._prefetch_stream_fields = self._prefetch_stream_fields
+        return clone
+
+    def _fetch_all(self):
+        super()._fetch_all()
+        if self._prefetch_stream_fields and not self._stream_blocks_prefetched:
+            self._prefetch_stream_blocks()
+
+    def _prefetch_stream_blocks(self):
+        stream_values = []
+        for page in self._result_cache:
+            if not isinstance(page, Model):
+                # Not a model instance; for example, a result of values()
+                continue
+
+            for field_name in self._prefetch_stream_fields:
+                # Read the value from the instance dict, so that deferred fields aren't fetched
+                value = page.__dict__.get(field_name)
+                if isinstance(value, StreamValue):
+                    stream_values.append(value)
+
+        StreamValue.bulk_prefetch_blocks(stream_values)
+        self._stream_blocks_prefetched = True
+
+    def prefetch_stream_blocks(self, *field_names):
+        """
+        When the pages are fetched, convert the blocks of the named StreamFields for all of the
+        pages at once, so that the database lookups needed by blocks such as ImageChooserBlock
+        or PageChooserBlock are made once for all pages, rather than once for each page.
+
+        Pages that don't have a StreamField with the given name are ignored, so this can be
+        combined with ``specific()`` on a queryset of mixed page types, for example
+        ``Page.objects.live().specific().prefetch_stream_blocks('body')``.
+        """
+        clone = self._chain()
+        clone._prefetch_stream_fields = self._prefetch_stream_fields + field_names
+        return clone
+
     def live_q(self):
         return Q(live=True)
 
@@ -344,7 +390,7 @@ class PageQuerySet(SearchableQuerySetMixin, TreeQuerySet):
         for page in self.live():
             page.unpublish()
 
-    def specific(self, defer=False):
+    def specific(self, defer=False, single_query=False):
         """
         This efficiently gets all the specific pages for the queryset, using
         the minimum number of queries.
@@ -353,9 +399,24 @@ class PageQuerySet(SearchableQuerySetMixin, TreeQuerySet):
         fields will be loaded and all specific fields will be deferred. It
         will still generate a query for each page type though (this may be
         improved to generate only a single query in a future release).
+
+        When the "single_query" keyword argument is set to True, the specific
+        pages are fetched in a single query that joins the tables of the page
+        types in the results (after a query to find which page types those
+        are), rather than one query for each page type. This is best suited to
+        small querysets containing many different page types, such as a page
+        of listing results. Combined with "defer", no tables are joined and the
+        specific fields are deferred.
+
+        When iterating over a large number of pages, use ``iterator()`` to
+        fetch the specific pages in chunks rather than all at once, for
+        example ``Page.objects.live().specific().iterator(chunk_size=2000)``.
+        Each chunk generates a query for each page type that it contains.
         """
         clone = self._clone()
-        if defer:
+        if single_query:
+            clone._iterable_class = DeferredJoinedSpecificIterable if defer else JoinedSpecificIterable
+        elif defer:
             clone._iterable_class = DeferredSpecificIterable
         else:
             clone._iterable_class = SpecificIterable
@@ -394,86 +455,276 @@ class PageQuerySet(SearchableQuerySetMixin, TreeQuerySet):
         return self.exclude(self.translation_of_q(page, inclusive))
 
 
-def specific_iterator(qs, defer=False):
+def specific_iterator(qs, defer=False, chunk_size=None):
     """
     This efficiently iterates all the specific pages in a queryset, using
     the minimum number of queries.
 
+    The base page rows are fetched first, and then the rows of each specific
+    page type's own tables, which are combined with the already loaded base
+    page values to create the specific pages.
+
+    If ``chunk_size`` is given, the queryset is processed in windows of that
+    many pages, so that only one window of pages is held in memory at a time
+    and the first pages are yielded before the rest have been fetched.
+
     This should be called from ``PageQuerySet.specific``
     """
-    from wagtail.core.models import Page
-
+    pages = qs._chain()
+    pages._iterable_class = ModelIterable
+
+    # The content type of every page is needed to find its specific class, so make sure that
+    # it isn't left out by only() or defer(), which would mean a query for each page
+    field_names, is_deferred = pages.query.deferred_loading
+    if is_deferred:
+        pages.query.deferred_loading = (frozenset(field_names) - {'content_type', 'content_type_id'}, True)
+    elif field_names:
+        pages.query.deferred_loading = (frozenset(field_names) | {'content_type'}, False)
+
+    if chunk_size is None:
+        yield from _get_specific_pages(qs, list(pages), defer)
+        return
+
+    pages = pages.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(pages, chunk_size))
+        if not chunk:
+            break
+        yield from _get_specific_pages(qs, chunk, defer)
+
+
+def _get_specific_pages(qs, pages, defer):
+    """
+    Yields the specific versions of a list of pages fetched from the queryset,
+    in the same order.
+    """
     annotation_aliases = qs.query.annotations.keys()
-    values = qs.values('pk', 'content_type', *annotation_aliases)
-
-    annotations_by_pk = defaultdict(list)
-    if annotation_aliases:
-        # Extract annotation results keyed by pk so we can reapply to fetched pages.
-        for data in values:
-            annotations_by_pk[data['pk']] = {k: v for k, v in data.items() if k in annotation_aliases}
-
-    pks_and_types = [[v['pk'], v['content_type']] for v in values]
-    pks_by_type = defaultdict(list)
-    for pk, content_type in pks_and_types:
-        pks_by_type[content_type].append(pk)
+    base_attnames = {field.attname for field in qs.model._meta.concrete_fields}
 
-    # Content types are cached by ID, so this will not run any queries.
-    content_types = {pk: ContentType.objects.get_for_id(pk)
-                     for _, pk in pks_and_types}
+    pages_by_type = defaultdict(list)
+    for page in pages:
+        pages_by_type[page.content_type_id].append(page)
 
     # Get the specific instances of all pages, one model class at a time.
-    pages_by_type = {}
-    missing_pks = []
+    specific_pages = {}
+    missing_pages = []
 
-    for content_type, pks in pks_by_type.items():
+    for content_type, pages_for_type in pages_by_type.items():
         # look up model class for this content type, falling back on the original
-        # model (i.e. Page) if the more specific one is missing
-        model = content_types[content_type].model_class() or qs.model
-        pages = model.objects.filter(pk__in=pks)
-
-        if defer:
-            # Defer all specific fields
-            fields = [field.attname for field in Page._meta.get_fields() if field.concrete]
-            pages = pages.only(*fields)
-
-        pages_for_type = {page.pk: page for page in pages}
-        pages_by_type[content_type] = pages_for_type
-        missing_pks.extend(
-            pk for pk in pks if pk not in pages_for_type
-        )
-
-    # Fetch generic pages to supplement missing items
-    if missing_pks:
-        generic_pages = Page.objects.filter(pk__in=missing_pks).select_related('content_type').in_bulk()
+        # model (i.e. Page) if the more specific one is missing.
+        # Content types are cached by ID, so this will not run any queries.
+        model = ContentType.objects.get_for_id(content_type).model_class() or qs.model
+
+        if all(isinstance(page, model) for page in pages_for_type):
+            # The pages are already instances of the specific class
+            continue
+
+        # Only fetch the fields that the specific class adds to the base pages,
+        # or just the primary keys (to check that the rows exist) if they are
+        # to be deferred. Parent links all hold the primary key value
+        fields = model._meta.concrete_fields
+        pk_attnames = {
+            field.attname for field in fields
+            if field.primary_key or (field.remote_field and field.remote_field.parent_link)
+        }
+        specific_attnames = [] if defer else [
+            field.attname for field in fields
+            if field.attname not in base_attnames and field.attname not in pk_attnames
+        ]
+        specific_values = {
+            values[0]: dict(zip(specific_attnames, values[1:]))
+            for values in model._base_manager.using(qs.db).filter(
+                pk__in=[page.pk for page in pages_for_type]
+            ).values_list('pk', *specific_attnames)
+        }
+
+        for page in pages_for_type:
+            if page.pk not in specific_values:
+                missing_pages.append(page)
+                continue
+
+            # Create the specific page from the base page values that have already
+            # been loaded, and the specific values
+            values = specific_values[page.pk]
+            field_names = []
+            field_values = []
+            for field in fields:
+                if field.attname in values:
+                    value = values[field.attname]
+                elif field.attname in pk_attnames:
+                    value = page.pk
+                elif field.attname in page.__dict__:
+                    value = page.__dict__[field.attname]
+                else:
+                    continue
+
+                field_names.append(field.attname)
+                field_values.append(value)
+
+            specific_page = model.from_db(qs.db, field_names, field_values)
+
+            # Reapply annotations
+            for annotation in annotation_aliases:
+                setattr(specific_page, annotation, getattr(page, annotation))
+
+            specific_pages[page.pk] = specific_page
+
+    # Supplement missing items with generic pages
+    if missing_pages:
         warnings.warn(
             "Specific versions of the following pages could not be found. "
             "This is most likely because a database migration has removed "
             "the relevant table or record since the page was created:\n{}".format([
-                {'id': p.id, 'title': p.title, 'type': p.content_type}
-                for p in generic_pages.values()
+                {'id': p.id, 'title': p.title, 'type': p.cached_content_type}
+                for p in missing_pages
             ]), category=RuntimeWarning
         )
-    else:
-        generic_pages = {}
 
     # Yield all pages in the order they occurred in the original query.
-    for pk, content_type in pks_and_types:
-        try:
-            page = pages_by_type[content_type][pk]
-        except KeyError:
-            page = generic_pages[pk]
-        if annotation_aliases:
-            # Reapply annotations before returning
-            for annotation, value in annotations_by_pk.get(page.pk, {}).items():
-                setattr(page, annotation, value)
-        yield page
-
-
-class SpecificIterable(BaseIterable):
+    for page in pages:
+        yield specific_pages.get(page.pk, page)
+
+
+# The most tables that joined_specific_iterator joins in a single query. Each page type
+# needs a join for every model between it and the queryset's model, and databases limit
+# the number of tables in a query (MySQL allows 61), so querysets that would need more
+# are fetched with specific_iterator instead.
+MAX_SPECIFIC_JOINS = 20
+
+
+def _get_specific_relations(base_model, models):
+    """
+    Returns a dict mapping each of the given concrete page models that inherits from
+    base_model to the chain of reverse parent link relations that lead to it from
+    base_model (for example, ``Page -> EventPage -> SingleEventPage``).
+    """
+    relations_by_model = {}
+
+    for model in models:
+        if model._meta.proxy or model is base_model or not issubclass(model, base_model):
+            continue
+
+        relations = []
+        child = model
+        while child is not base_model:
+            parent, parent_link = next(
+                (parent, parent_link) for parent, parent_link in child._meta.parents.items()
+                if issubclass(parent, base_model)
+            )
+            relations.insert(0, parent_link.remote_field)
+            child = parent
+
+        # Parent links without a reverse relation (related_name='+') cannot be joined
+        if not any(relation.is_hidden() for relation in relations):
+            relations_by_model[model] = relations
+
+    return relations_by_model
+
+
+def joined_specific_iterator(qs, defer=False, chunk_size=None):
+    """
+    An alternative to ``specific_iterator`` that fetches all the specific pages in
+    a queryset with a single query, by joining the tables of the page types that
+    appear in it, which are found with a query for their content types first. When
+    ``defer`` is True, no tables are joined and the specific pages are created from
+    the base page fields.
+
+    Querysets containing so many page types that they would need more than
+    ``MAX_SPECIFIC_JOINS`` tables to be joined are fetched with ``specific_iterator``.
+
+    This should be called from ``PageQuerySet.specific``
+    """
+    annotation_aliases = qs.query.annotations.keys()
+
+    if defer:
+        relations_by_model = {}
+    else:
+        if qs.query.is_sliced:
+            # A slice can't be combined with distinct(), and there are few enough pages in
+            # it to find the content types of each one
+            content_type_ids = {content_type_id for pk, content_type_id in qs.values_list('pk', 'content_type_id')}
+        else:
+            content_type_ids = qs.order_by().values_list('content_type_id', flat=True).distinct()
+
+        relations_by_model = _get_specific_relations(qs.model, {
+            ContentType.objects.get_for_id(content_type_id).model_class()
+            for content_type_id in content_type_ids
+        } - {None})
+
+        if len({relation for relations in relations_by_model.values() for relation in relations}) > MAX_SPECIFIC_JOINS:
+            yield from specific_iterator(qs, chunk_size=chunk_size)
+            return
+
+    pages = qs._chain()
+    pages._iterable_class = ModelIterable
+    if relations_by_model:
+        pages = pages.select_related(*(
+            LOOKUP_SEP.join(relation.field.related_query_name() for relation in relations)
+            for relations in relations_by_model.values()
+        ))
+
+    for page in (pages if chunk_size is None else pages.iterator(chunk_size=chunk_size)):
+        # look up model class for this content type, falling back on the original
+        # model (i.e. Page) if the more specific one is missing
+        model = ContentType.objects.get_for_id(page.content_type_id).model_class() or qs.model
+
+        if isinstance(page, model):
+            yield page
+            continue
+
+        if defer:
+            specific_page = page.get_specific(deferred=True, copy_attrs=annotation_aliases)
+        elif model in relations_by_model:
+            # Follow the joined rows down to the specific page
+            specific_page = page
+            for relation in relations_by_model[model]:
+                specific_page = relation.get_cached_value(specific_page, default=None)
+                if specific_page is None:
+                    break
+
+            if specific_page is None:
+                warnings.warn(
+                    "Specific versions of the following pages could not be found. "
+                    "This is most likely because a database migration has removed "
+                    "the relevant table or record since the page was created:\n{}".format([
+                        {'id': page.id, 'title': page.title, 'type': page.content_type}
+                    ]), category=RuntimeWarning
+                )
+                specific_page = page
+            else:
+                for annotation in annotation_aliases:
+                    setattr(specific_page, annotation, getattr(page, annotation))
+        else:
+            # The page type is not joined (for example, it is a proxy model), so fall
+            # back to fetching it separately
+            specific_page = page.get_specific(copy_attrs=annotation_aliases)
+
+        yield specific_page
+
+
+class BaseSpecificIterable(BaseIterable):
+    def __init__(self, queryset, chunked_fetch=False, chunk_size=None):
+        # Django only passes chunk_size when the queryset is iterated with QuerySet.iterator(),
+        # in which case the results are processed in chunks of that size. This doesn't depend
+        # on chunked_fetch, which is False when server-side cursors are disabled.
+        super().__init__(queryset, chunked_fetch=chunked_fetch, chunk_size=chunk_size)
+
+
+class SpecificIterable(BaseSpecificIterable):
+    def __iter__(self):
+        return specific_iterator(self.queryset, chunk_size=self.chunk_size)
+
+
+class DeferredSpecificIterable(BaseSpecificIterable):
+    def __iter__(self):
+        return specific_iterator(self.queryset, defer=True, chunk_size=self.chunk_size)
+
+
+class JoinedSpecificIterable(BaseSpecificIterable):
     def __iter__(self):
-        return specific_iterator(self.queryset)
+        return joined_specific_iterator(self.queryset, chunk_size=self.chunk_size)
 
 
-class DeferredSpecificIterable(BaseIterable):
+class DeferredJoinedSpecificIterable(BaseSpecificIterable):
     def __iter__(self):
-        return specific_iterator(self.queryset, defer=True)
+        return joined_specific_iterator(self.queryset, defer=True, chunk_size=self.chunk_size)
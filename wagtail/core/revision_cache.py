@@ -0,0 +1,84 @@
+import copy
+
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from modelcluster.models import get_all_child_relations
+
+from wagtail.core.fields import StreamField
+
+
+_cache = OrderedDict()
+_lock = Lock()
+
+
+def get_revision_cache_size():
+    """
+    Return the maximum number of page objects to keep in the revision cache, as set by
+    WAGTAIL_REVISION_CACHE_SIZE. The cache is disabled if this is 0 (the default).
+    """
+    return getattr(settings, 'WAGTAIL_REVISION_CACHE_SIZE', 0)
+
+
+def _get_shared_objects(page_class):
+    """
+    Return a dict of all StreamFields on the page class and its child models, and their block
+    definitions, keyed by id, for use as a deepcopy memo. Values of a StreamField refer to
+    these, and they should be shared rather than copied.
+    """
+    models = [page_class] + [relation.related_model for relation in get_all_child_relations(page_class)]
+
+    shared_objects = {}
+    for model in models:
+        for field in model._meta.get_fields():
+            if isinstance(field, StreamField):
+                # StreamField values that haven't been accessed yet also refer to the field
+                shared_objects[id(field)] = field
+                for block in field.stream_block.all_blocks():
+                    shared_objects[id(block)] = block
+
+    return shared_objects
+
+
+def _copy_page(page):
+    return copy.deepcopy(page, _get_shared_objects(type(page)))
+
+
+def page_from_json(page_class, content_json):
+    """
+    Equivalent to ``page_class.from_json(content_json)``, but reuses the page object built
+    for an earlier call with the same content, if it is still in the cache. Building a
+    page object involves fetching every object it refers to, so this saves several queries
+    when the same revision is viewed again.
+
+    The cache holds the most recently used objects in this process. Each call returns a
+    new copy of the cached object, so it can be modified freely.
+    """
+    cache_size = get_revision_cache_size()
+    if not cache_size:
+        return page_class.from_json(content_json)
+
+    # Keying on the content (rather than the revision ID) means that revisions that are
+    # changed after they are created, such as by the replace_text command, are never stale
+    key = (page_class, content_json)
+
+    with _lock:
+        page = _cache.get(key)
+        if page is not None:
+            _cache.move_to_end(key)
+
+    if page is None:
+        page = page_class.from_json(content_json)
+
+        with _lock:
+            _cache[key] = page
+            while len(_cache) > cache_size:
+                _cache.popitem(last=False)
+
+    return _copy_page(page)
+
+
+def clear_revision_cache():
+    with _lock:
+        _cache.clear()
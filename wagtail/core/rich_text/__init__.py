@@ -1,14 +1,15 @@
 import re
 
 from html import unescape
+from typing import List
 
 from django.db.models import Model
 from django.template.loader import render_to_string
-from django.utils.html import strip_tags
 from django.utils.safestring import mark_safe
 
+from wagtail.core.rich_text.cache import get_expanded_html
 from wagtail.core.rich_text.feature_registry import FeatureRegistry
-from wagtail.core.rich_text.rewriters import EmbedRewriter, LinkRewriter, MultiRuleRewriter
+from wagtail.core.rich_text.rewriters import TagRewriter
 
 
 features = FeatureRegistry()
@@ -25,30 +26,111 @@ def expand_db_html(html):
     """
     Expand database-representation HTML into proper HTML usable on front-end templates
     """
+    return get_expanded_html(html, _expand_db_html)
+
+
+def _expand_db_html(html):
     global FRONTEND_REWRITER
 
     if FRONTEND_REWRITER is None:
         embed_rules = features.get_embed_types()
         link_rules = features.get_link_types()
-        FRONTEND_REWRITER = MultiRuleRewriter([
-            LinkRewriter({linktype: handler.expand_db_attributes for linktype, handler in link_rules.items()}),
-            EmbedRewriter({embedtype: handler.expand_db_attributes for embedtype, handler in embed_rules.items()})
-        ])
+        FRONTEND_REWRITER = TagRewriter(
+            {linktype: handler.expand_db_attributes for linktype, handler in link_rules.items()},
+            {embedtype: handler.expand_db_attributes for embedtype, handler in embed_rules.items()},
+            bulk_link_rules={
+                linktype: handler.expand_db_attributes_many for linktype, handler in link_rules.items()
+                if _has_bulk_expansion(handler)
+            },
+            bulk_embed_rules={
+                embedtype: handler.expand_db_attributes_many for embedtype, handler in embed_rules.items()
+                if _has_bulk_expansion(handler)
+            },
+        )
 
     return FRONTEND_REWRITER(html)
 
 
+def _get_defining_class(cls, attr_name):
+    for klass in cls.__mro__:
+        if attr_name in klass.__dict__:
+            return klass
+
+
+def _has_bulk_expansion(handler):
+    """
+    Return True if the handler's expand_db_attributes_many can be used in place of calling
+    expand_db_attributes for each tag. This isn't the case for handlers that override
+    expand_db_attributes in a subclass of the class that defines expand_db_attributes_many
+    (such as a subclass of PageLinkHandler written before expand_db_attributes_many existed),
+    as their expand_db_attributes_many would ignore the override.
+    """
+    cls = handler if isinstance(handler, type) else type(handler)
+    bulk_class = _get_defining_class(cls, 'expand_db_attributes_many')
+    if bulk_class is None:
+        return False
+
+    return issubclass(bulk_class, _get_defining_class(cls, 'expand_db_attributes'))
+
+
+# Matches an HTML tag, a doctype / CDATA declaration or a processing instruction. Capturing the
+# tag name lets get_text_for_indexing insert a space after block elements. Quoted attribute
+# values may contain '>', but no part of a tag may contain '<', so that every attempted match
+# stops at the next '<' and the worst case stays linear in the length of the text
+FIND_TAG = re.compile(
+    r'''<(?:(/?)([a-z][a-z0-9]*)(?:[^<>"']|"[^"<]*"|'[^'<]*')*>|[!?][^<>]*>)''', re.IGNORECASE
+)
+
+# Elements that are followed by a space in text for indexing, by whether they are closing tags
+SEPARATED_TAGS = {
+    '/': {'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'blockquote'},
+    '': {'br', 'hr'},
+}
+
+
+def _replace_tag(match):
+    closing, tag_name = match.groups()
+    if tag_name is not None and tag_name.lower() in SEPARATED_TAGS[closing]:
+        return ' '
+    return ''
+
+
+def _remove_comments(html):
+    pieces = []
+    pos = 0
+    while True:
+        start = html.find('<!--', pos)
+        if start == -1:
+            break
+        pieces.append(html[pos:start])
+
+        end = html.find('-->', start + 4)
+        if end == -1:
+            # An unterminated comment runs to the end of the text
+            return ''.join(pieces)
+        pos = end + 3
+
+    pieces.append(html[pos:])
+    return ''.join(pieces)
+
+
 def get_text_for_indexing(richtext):
     """
     Return a plain text version of a rich text string, suitable for search indexing;
     like Django's strip_tags, but ensures that whitespace is left between block elements
     so that <p>hello</p><p>world</p> gives "hello world", not "helloworld".
+
+    This removes all tags in a single pass over the text, which (unlike strip_tags) takes
+    time proportional to the length of the text even for malformed HTML.
     """
-    # insert space after </p>, </h1> - </h6>, </li> and </blockquote> tags
-    richtext = re.sub(r'(</(p|h\d|li|blockquote)>)', r'\1 ', richtext, flags=re.IGNORECASE)
-    # also insert space after <br /> and <hr />
-    richtext = re.sub(r'(<(br|hr)\s*/>)', r'\1 ', richtext, flags=re.IGNORECASE)
-    return unescape(strip_tags(richtext).strip())
+    if '<!--' in richtext:
+        richtext = _remove_comments(richtext)
+
+    text = FIND_TAG.sub(_replace_tag, richtext)
+    if '&' in text:
+        text = unescape(text)
+
+    return text.strip()
 
 
 class RichText:
@@ -95,6 +177,22 @@ class EntityHandler:
         model = cls.get_model()
         return model._default_manager.get(id=attrs['id'])
 
+    @classmethod
+    def get_many(cls, attrs_list: List[dict]) -> List[Model]:
+        """
+        Returns the instances referred to by a list of attribute dicts, fetched in a
+        single query, with None in place of any that don't exist.
+        """
+        model = cls.get_model()
+        instance_ids = [attrs.get('id') for attrs in attrs_list]
+        instances_by_id = {
+            str(pk): instance
+            for pk, instance in model._default_manager.in_bulk(
+                [instance_id for instance_id in instance_ids if instance_id is not None]
+            ).items()
+        }
+        return [instances_by_id.get(str(instance_id)) for instance_id in instance_ids]
+
     @staticmethod
     def expand_db_attributes(attrs: dict) -> str:
         """
@@ -103,6 +201,16 @@ class EntityHandler:
         """
         raise NotImplementedError
 
+    @classmethod
+    def expand_db_attributes_many(cls, attrs_list: List[dict]) -> List[str]:
+        """
+        Given a list of attribute dicts from all the entity tags of this type in a piece of
+        rich text, returns the real HTML representation of each. The default implementation
+        calls expand_db_attributes for each tag in turn; subclasses may optimise this, e.g.
+        by fetching all the referenced objects at once with get_many.
+        """
+        return [cls.expand_db_attributes(attrs) for attrs in attrs_list]
+
 
 class LinkHandler(EntityHandler):
     pass
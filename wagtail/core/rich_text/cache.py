@@ -0,0 +1,94 @@
+from hashlib import md5
+
+from django.utils.translation import get_language
+
+from wagtail.core.rich_text.rewriters import FIND_A_OR_EMBED_TAG, extract_attrs
+from wagtail.core.utils import get_cache_versions, get_optional_cache, reset_cache_versions
+
+
+# Every cached rendering depends on this key, so that all of them can be invalidated at once
+GLOBAL_VERSION_CACHE_KEY = 'wagtail-richtext-version'
+
+
+def get_rich_text_cache():
+    return get_optional_cache('rich_text')
+
+
+def _make_reference_cache_key(entity_type, entity_id):
+    return 'wagtail-richtext-ref-{}-{}'.format(entity_type, entity_id)
+
+
+def get_references(html):
+    """
+    Return the cache keys of the objects referred to by the link and embed tags in the
+    database representation of rich text (e.g. <a linktype="page" id="1">), which hold
+    the current version of each object's rendering
+    """
+    references = set()
+    for match in FIND_A_OR_EMBED_TAG.finditer(html):
+        link_attr_string, embed_attr_string = match.groups()
+        attr_string = link_attr_string if link_attr_string is not None else embed_attr_string
+        if 'id=' not in attr_string:
+            continue
+
+        attrs = extract_attrs(attr_string)
+        entity_type = attrs.get('linktype') or attrs.get('embedtype')
+        if entity_type and 'id' in attrs:
+            references.add(_make_reference_cache_key(entity_type, attrs['id']))
+
+    return sorted(references)
+
+
+def get_expanded_html(html, expand):
+    """
+    Return the expanded HTML for the database representation of rich text from the rich
+    text cache, calling expand(html) to expand it on a cache miss.
+
+    Entries are keyed by the source HTML and the active language, and record the version
+    of every object that the HTML refers to at the time it was expanded. Entries are
+    discarded once any of those objects has been invalidated (with invalidate_references),
+    or once the cache timeout has passed.
+    """
+    cache = get_rich_text_cache()
+    if cache is None:
+        return expand(html)
+
+    cache_key = 'wagtail-richtext-{}'.format(
+        md5('{}-{}'.format(get_language(), html).encode('utf-8')).hexdigest()
+    )
+
+    entry = cache.get(cache_key)
+    if entry is not None:
+        expanded_html, versions = entry
+        if cache.get_many(list(versions)) == versions:
+            return expanded_html
+
+    # Find the versions before expanding, so that an invalidation that happens in the
+    # meantime isn't lost
+    versions = get_cache_versions(cache, [GLOBAL_VERSION_CACHE_KEY] + get_references(html))
+    expanded_html = expand(html)
+    cache.set(cache_key, (expanded_html, versions))
+
+    return expanded_html
+
+
+def invalidate_references(entity_type, entity_ids):
+    """
+    Invalidate the cached rich text that refers to any of the given objects, for example
+    invalidate_references('page', [page.id])
+    """
+    cache = get_rich_text_cache()
+    if cache is not None:
+        reset_cache_versions(cache, [
+            _make_reference_cache_key(entity_type, entity_id) for entity_id in entity_ids
+        ])
+
+
+def clear_rich_text_cache():
+    """
+    Invalidate all cached rich text. This is used when many URLs may have changed at once,
+    such as when a page is moved or renamed.
+    """
+    cache = get_rich_text_cache()
+    if cache is not None:
+        reset_cache_versions(cache, [GLOBAL_VERSION_CACHE_KEY])
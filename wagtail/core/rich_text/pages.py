@@ -1,6 +1,6 @@
 from django.utils.html import escape
 
-from wagtail.core.models import Page
+from wagtail.core.models import Locale, Page, PageUrlGenerator
 from wagtail.core.rich_text import LinkHandler
 
 
@@ -22,3 +22,53 @@ class PageLinkHandler(LinkHandler):
             return '<a href="%s">' % escape(page.localized.specific.url)
         except Page.DoesNotExist:
             return "<a>"
+
+    @classmethod
+    def get_many(cls, attrs_list):
+        # As get_instance, return the specific pages; these are fetched with one query per page type
+        page_ids = [attrs.get('id') for attrs in attrs_list]
+        pages_by_id = {
+            str(page.pk): page
+            for page in Page.objects.filter(id__in=[page_id for page_id in page_ids if page_id is not None]).specific()
+        }
+        return [pages_by_id.get(str(page_id)) for page_id in page_ids]
+
+    @classmethod
+    def get_localized_pages(cls, pages):
+        """
+        Returns page.localized.specific for each page in a list of specific pages, fetching
+        all the translations with a single query
+        """
+        try:
+            locale = Locale.get_active()
+        except (LookupError, Locale.DoesNotExist):
+            return pages
+
+        translation_keys = [page.translation_key for page in pages if page.locale_id != locale.id]
+        if not translation_keys:
+            return pages
+
+        translations = {
+            translation.translation_key: translation
+            for translation in Page.objects.filter(translation_key__in=translation_keys, locale=locale).specific()
+        }
+
+        localized_pages = []
+        for page in pages:
+            translation = translations.get(page.translation_key) if page.locale_id != locale.id else None
+            # Translations in draft are not used, as with Page.localized
+            localized_pages.append(translation if translation is not None and translation.live else page)
+
+        return localized_pages
+
+    @classmethod
+    def expand_db_attributes_many(cls, attrs_list):
+        pages = cls.get_many(attrs_list)
+        localized_pages = cls.get_localized_pages([page for page in pages if page is not None])
+        # Find the site root paths once for all the pages, rather than once per page
+        urls = iter(PageUrlGenerator.for_request().get_urls(localized_pages))
+
+        return [
+            '<a href="%s">' % escape(next(urls)) if page is not None else "<a>"
+            for page in pages
+        ]
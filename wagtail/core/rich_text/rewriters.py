@@ -4,9 +4,12 @@ Utility classes for rewriting elements of HTML-like strings
 
 import re
 
+from collections import defaultdict
+
 
 FIND_A_TAG = re.compile(r'<a(\b[^>]*)>')
 FIND_EMBED_TAG = re.compile(r'<embed(\b[^>]*)/>')
+FIND_A_OR_EMBED_TAG = re.compile(r'<(?:a(\b[^>]*)>|embed(\b[^>]*)/>)')
 FIND_ATTRS = re.compile(r'([\w-]+)\="([^"]*)"')
 
 
@@ -16,7 +19,8 @@ def extract_attrs(attr_string):
     """
     attributes = {}
     for name, val in FIND_ATTRS.findall(attr_string):
-        val = val.replace('&lt;', '<').replace('&gt;', '>').replace('&quot;', '"').replace('&amp;', '&')
+        if '&' in val:
+            val = val.replace('&lt;', '<').replace('&gt;', '>').replace('&quot;', '"').replace('&amp;', '&')
         attributes[name] = val
     return attributes
 
@@ -31,13 +35,31 @@ class EmbedRewriter:
         self.embed_rules = embed_rules
 
     def replace_tag(self, match):
-        attrs = extract_attrs(match.group(1))
-        try:
-            rule = self.embed_rules[attrs['embedtype']]
-        except KeyError:
+        return self.rewrite_tag(match.group(0), match.group(1))
+
+    def parse_tag(self, tag, attr_string):
+        """
+        Return an (embed_type, attrs) tuple for a tag to be rewritten by the rule for embed_type,
+        or (None, replacement) for a tag whose replacement doesn't come from a rule
+        """
+        if 'embedtype=' not in attr_string:
+            # no need to extract the attributes of a tag that can't have an embedtype
+            return None, ''
+
+        attrs = extract_attrs(attr_string)
+        embed_type = attrs.get('embedtype')
+        if embed_type not in self.embed_rules:
             # silently drop any tags with an unrecognised or missing embedtype attribute
-            return ''
-        return rule(attrs)
+            return None, ''
+
+        return embed_type, attrs
+
+    def rewrite_tag(self, tag, attr_string):
+        embed_type, attrs = self.parse_tag(tag, attr_string)
+        if embed_type is None:
+            return attrs
+
+        return self.embed_rules[embed_type](attrs)
 
     def __call__(self, html):
         return FIND_EMBED_TAG.sub(self.replace_tag, html)
@@ -51,9 +73,25 @@ class LinkRewriter:
     """
     def __init__(self, link_rules):
         self.link_rules = link_rules
+        # links without a linktype are only rewritten if there is a rule for the type
+        # detected from their href
+        self.rewrites_untyped_links = any(
+            link_type in link_rules for link_type in ['email', 'external', 'anchor']
+        )
 
     def replace_tag(self, match):
-        attrs = extract_attrs(match.group(1))
+        return self.rewrite_tag(match.group(0), match.group(1))
+
+    def parse_tag(self, tag, attr_string):
+        """
+        Return a (link_type, attrs) tuple for a tag to be rewritten by the rule for link_type,
+        or (None, replacement) for a tag whose replacement doesn't come from a rule
+        """
+        if 'linktype=' not in attr_string and not self.rewrites_untyped_links:
+            # return ordinary links unchanged, without extracting their attributes
+            return None, tag
+
+        attrs = extract_attrs(attr_string)
         try:
             link_type = attrs['linktype']
         except KeyError:
@@ -72,24 +110,105 @@ class LinkRewriter:
 
             if not link_type:
                 # otherwise return ordinary links without a linktype unchanged
-                return match.group(0)
+                return None, tag
 
-        try:
-            rule = self.link_rules[link_type]
-        except KeyError:
+        if link_type not in self.link_rules:
             if link_type in ['email', 'external', 'anchor']:
                 # If no rule is registered for supported types
                 # return ordinary links without a linktype unchanged
-                return match.group(0)
+                return None, tag
             # unrecognised link type
-            return '<a>'
+            return None, '<a>'
+
+        return link_type, attrs
+
+    def rewrite_tag(self, tag, attr_string):
+        link_type, attrs = self.parse_tag(tag, attr_string)
+        if link_type is None:
+            return attrs
 
-        return rule(attrs)
+        return self.link_rules[link_type](attrs)
 
     def __call__(self, html):
         return FIND_A_TAG.sub(self.replace_tag, html)
 
 
+class TagRewriter:
+    """
+    Rewrites both <a linktype="foo"> and <embed embedtype="foo" /> tags, as LinkRewriter and
+    EmbedRewriter do, but in a single pass over the HTML.
+
+    If bulk_link_rules or bulk_embed_rules are given, they map link / embed types to functions
+    that take a list of attribute dicts and return a list of HTML fragments. All tags of those
+    types are found before any are rewritten, and passed to the bulk rule together, so that
+    the objects they refer to can be fetched at once.
+    """
+    def __init__(self, link_rules, embed_rules, bulk_link_rules=None, bulk_embed_rules=None):
+        self.link_rewriter = LinkRewriter(link_rules)
+        self.embed_rewriter = EmbedRewriter(embed_rules)
+        self.rules = {
+            self.link_rewriter: link_rules,
+            self.embed_rewriter: embed_rules,
+        }
+        self.bulk_rules = {
+            self.link_rewriter: bulk_link_rules or {},
+            self.embed_rewriter: bulk_embed_rules or {},
+        }
+
+    def get_rewriter(self, match):
+        """
+        Return the rewriter for the matched tag, and the tag's attribute string
+        """
+        link_attr_string, embed_attr_string = match.groups()
+        if link_attr_string is not None:
+            return self.link_rewriter, link_attr_string
+        else:
+            return self.embed_rewriter, embed_attr_string
+
+    def replace_tag(self, match):
+        rewriter, attr_string = self.get_rewriter(match)
+        return rewriter.rewrite_tag(match.group(0), attr_string)
+
+    def __call__(self, html):
+        if not any(self.bulk_rules.values()):
+            return FIND_A_OR_EMBED_TAG.sub(self.replace_tag, html)
+
+        matches = list(FIND_A_OR_EMBED_TAG.finditer(html))
+        replacements = [None] * len(matches)
+
+        # the index and attributes of each tag to be rewritten, by rewriter and rule type
+        tags_by_rule = defaultdict(list)
+        for i, match in enumerate(matches):
+            rewriter, attr_string = self.get_rewriter(match)
+            rule_type, attrs = rewriter.parse_tag(match.group(0), attr_string)
+            if rule_type is None:
+                replacements[i] = attrs
+            else:
+                tags_by_rule[rewriter, rule_type].append((i, attrs))
+
+        for (rewriter, rule_type), tags in tags_by_rule.items():
+            attrs_list = [attrs for i, attrs in tags]
+            bulk_rule = self.bulk_rules[rewriter].get(rule_type)
+            if bulk_rule is not None:
+                rewritten_tags = bulk_rule(attrs_list)
+            else:
+                rule = self.rules[rewriter][rule_type]
+                rewritten_tags = [rule(attrs) for attrs in attrs_list]
+
+            for (i, attrs), replacement in zip(tags, rewritten_tags):
+                replacements[i] = replacement
+
+        result = []
+        position = 0
+        for match, replacement in zip(matches, replacements):
+            result.append(html[position:match.start()])
+            result.append(replacement)
+            position = match.end()
+        result.append(html[position:])
+
+        return ''.join(result)
+
+
 class MultiRuleRewriter:
     """Rewrites HTML by applying a sequence of rewriter functions"""
     def __init__(self, rewriters):
@@ -0,0 +1,118 @@
+from collections import namedtuple
+from hashlib import md5
+
+from django.contrib.contenttypes.models import ContentType
+from django.http import Http404
+
+from wagtail.core.url_routing import RouteResult
+from wagtail.core.utils import get_cache_version, get_optional_cache, reset_cache_versions
+
+
+GENERATION_CACHE_KEY = 'wagtail-route-generation'
+
+
+RouteCacheEntry = namedtuple('RouteCacheEntry', 'page_id content_type_id live has_view_restrictions')
+
+
+def get_route_cache():
+    return get_optional_cache('page_routes')
+
+
+def _make_cache_key(cache, url_path):
+    return 'wagtail-route-{}-{}'.format(
+        get_cache_version(cache, GENERATION_CACHE_KEY), md5(url_path.encode('utf-8')).hexdigest()
+    )
+
+
+def _get_url_path(root_page, path_components):
+    return root_page.url_path + ''.join(component + '/' for component in path_components)
+
+
+def _is_cacheable(root_page, page):
+    """
+    Only pages that were reached through Wagtail's default routing rules can be cached,
+    as any page along the way that overrides route() may depend on the request.
+    """
+    from wagtail.core.models import Page
+
+    if (page.specific_class or Page).route is not Page.route:
+        return False
+
+    content_type_ids = (
+        Page.objects.ancestor_of(page)
+        .filter(depth__gte=root_page.depth)
+        .values_list('content_type_id', flat=True)
+    )
+    for content_type_id in set(content_type_ids):
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if (model or Page).route is not Page.route:
+            return False
+
+    return True
+
+
+def route(request, root_page, path_components):
+    """
+    Equivalent to ``root_page.specific.route(request, path_components)``, but consults
+    the route cache first. On a cache hit, the page is fetched with a single primary key
+    lookup and the tree is not traversed at all.
+    """
+    cache = get_route_cache()
+    if cache is None:
+        return root_page.specific.route(request, path_components)
+
+    url_path = _get_url_path(root_page, path_components)
+    cache_key = _make_cache_key(cache, url_path)
+    entry = cache.get(cache_key)
+
+    if entry is not None:
+        if not entry.live:
+            raise Http404
+
+        model = ContentType.objects.get_for_id(entry.content_type_id).model_class()
+        if model is not None:
+            try:
+                page = model._default_manager.get(id=entry.page_id)
+            except model.DoesNotExist:
+                page = None
+
+            # Discard entries that have gone stale without being invalidated
+            if page is not None and page.url_path == url_path and page.live:
+                # Let the check_view_restrictions hook skip its queries for unrestricted pages
+                page._route_cache_has_view_restrictions = entry.has_view_restrictions
+                return RouteResult(page)
+
+        cache.delete(cache_key)
+
+    result = root_page.specific.route(request, path_components)
+
+    if isinstance(result, RouteResult) and not result.args and not result.kwargs:
+        page = result.page
+        if page.url_path == url_path and _is_cacheable(root_page, page):
+            cache.set(cache_key, RouteCacheEntry(
+                page.id,
+                page.content_type_id,
+                page.live,
+                page.get_view_restrictions().exists(),
+            ))
+
+    return result
+
+
+def invalidate_route(url_path):
+    """
+    Remove the cached route for the page with the given url_path
+    """
+    cache = get_route_cache()
+    if cache is not None:
+        cache.delete(_make_cache_key(cache, url_path))
+
+
+def clear_route_cache():
+    """
+    Invalidate all cached routes. This is used when many url_paths may have changed at
+    once, such as when a page is moved or renamed.
+    """
+    cache = get_route_cache()
+    if cache is not None:
+        reset_cache_versions(cache, [GENERATION_CACHE_KEY])
@@ -3,19 +3,30 @@ import logging
 from django.core.cache import cache
 from django.db.models.signals import post_delete, post_save, pre_delete
 
-from wagtail.core.models import Page, Site
+from wagtail.core.blocks.render_cache import clear_block_render_cache
+from wagtail.core.models import Page, PageViewRestriction, Site
+from wagtail.core.rich_text.cache import (
+    clear_rich_text_cache, get_rich_text_cache, invalidate_references)
+from wagtail.core.route_cache import clear_route_cache, invalidate_route
+from wagtail.core.signals import page_published, page_unpublished
+from wagtail.core.sites import clear_site_index
 
 
 logger = logging.getLogger('wagtail.core')
 
 
-# Clear the wagtail_site_root_paths from the cache whenever Site records are updated.
+# Clear the wagtail_site_root_paths from the cache and rebuild the index of sites by hostname
+# whenever Site records are updated.
 def post_save_site_signal_handler(instance, update_fields=None, **kwargs):
-    cache.delete('wagtail_site_root_paths')
+    cache.delete_many(['wagtail_site_root_paths', 'wagtail_site_root_paths_version'])
+    clear_site_index()
+    clear_rich_text_cache()
 
 
 def post_delete_site_signal_handler(instance, **kwargs):
-    cache.delete('wagtail_site_root_paths')
+    cache.delete_many(['wagtail_site_root_paths', 'wagtail_site_root_paths_version'])
+    clear_site_index()
+    clear_rich_text_cache()
 
 
 def pre_delete_page_unpublish(sender, instance, **kwargs):
@@ -29,9 +40,46 @@ def post_delete_page_log_deletion(sender, instance, **kwargs):
     logger.info("Page deleted: \"%s\" id=%d", instance.title, instance.id)
 
 
+def invalidate_rich_text_page_references(page):
+    # Links to a page are rendered as links to its translation in the active locale, if it
+    # has one, so the cached rich text that links to any of its translations is discarded
+    if get_rich_text_cache() is not None:
+        invalidate_references('page', page.get_translations(inclusive=True).values_list('id', flat=True))
+
+
+# Keep the route cache (if enabled) in sync with the live status and view restrictions of pages.
+# Cached block renderings are discarded too, as blocks may display other pages (such as through a
+# PageChooserBlock) that have changed, along with any cached rich text that links to the page
+def page_published_signal_handler(instance, **kwargs):
+    invalidate_route(instance.url_path)
+    clear_block_render_cache()
+    invalidate_rich_text_page_references(instance)
+
+
+def page_unpublished_signal_handler(instance, **kwargs):
+    invalidate_route(instance.url_path)
+    clear_block_render_cache()
+    invalidate_rich_text_page_references(instance)
+
+
+def post_delete_page_invalidate_route(sender, instance, **kwargs):
+    invalidate_route(instance.url_path)
+    invalidate_rich_text_page_references(instance)
+
+
+def page_view_restriction_changed_signal_handler(instance, **kwargs):
+    clear_route_cache()
+
+
 def register_signal_handlers():
     post_save.connect(post_save_site_signal_handler, sender=Site)
     post_delete.connect(post_delete_site_signal_handler, sender=Site)
 
     pre_delete.connect(pre_delete_page_unpublish, sender=Page)
     post_delete.connect(post_delete_page_log_deletion, sender=Page)
+
+    page_published.connect(page_published_signal_handler)
+    page_unpublished.connect(page_unpublished_signal_handler)
+    post_delete.connect(post_delete_page_invalidate_route, sender=Page)
+    post_save.connect(page_view_restriction_changed_signal_handler, sender=PageViewRestriction)
+    post_delete.connect(page_view_restriction_changed_signal_handler, sender=PageViewRestriction)
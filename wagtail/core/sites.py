@@ -1,5 +1,10 @@
+import time
+
 from django.apps import apps
-from django.db.models import Case, IntegerField, Q, When
+from django.conf import settings
+from django.core.cache import cache
+
+from wagtail.core.utils import get_cache_version, reset_cache_versions
 
 
 MATCH_HOSTNAME_PORT = 0
@@ -7,44 +12,135 @@ MATCH_HOSTNAME_DEFAULT = 1
 MATCH_DEFAULT = 2
 MATCH_HOSTNAME = 3
 
+SITES_VERSION_CACHE_KEY = 'wagtail_sites_version'
 
-def get_site_for_hostname(hostname, port):
-    """Return the wagtailcore.Site object for the given hostname and port."""
-    Site = apps.get_model('wagtailcore.Site')
 
-    sites = list(Site.objects.annotate(match=Case(
-        # annotate the results by best choice descending
+def _get_field_values(instance):
+    return tuple(getattr(instance, field.attname) for field in instance._meta.concrete_fields)
+
+
+class SiteRecord:
+    """
+    The field values of a Site record and its root page, as held in the SiteIndex
+    """
+    def __init__(self, site):
+        self.hostname = site.hostname
+        self.port = site.port
+        self.is_default_site = site.is_default_site
+        self.site_values = _get_field_values(site)
+        self.root_page_values = _get_field_values(site.root_page)
+
+    def get_match(self, hostname, port):
+        if self.hostname == hostname and self.port == port:
+            return MATCH_HOSTNAME_PORT
+        elif self.hostname == hostname and self.is_default_site:
+            return MATCH_HOSTNAME_DEFAULT
+        elif self.is_default_site:
+            return MATCH_DEFAULT
+        else:
+            return MATCH_HOSTNAME
+
+
+class SiteIndex:
+    """
+    An in-memory index of all Site records by hostname, used to resolve requests to sites
+    without querying the database.
+
+    Site and root page instances are recreated from the stored field values on every
+    lookup, so that attributes cached on a returned site are never shared between requests.
+    """
+    def __init__(self, sites):
+        self.db = sites.db
+        self.records_by_hostname = {}
+        self.default_record = None
+
+        for site in sites.select_related('root_page'):
+            record = SiteRecord(site)
+            self.records_by_hostname.setdefault(record.hostname, []).append(record)
+            if record.is_default_site:
+                self.default_record = record
+
+    def get_site(self, record):
+        Site = apps.get_model('wagtailcore.Site')
+        Page = apps.get_model('wagtailcore.Page')
+
+        site = Site.from_db(self.db, [field.attname for field in Site._meta.concrete_fields], record.site_values)
+        site.root_page = Page.from_db(self.db, [field.attname for field in Page._meta.concrete_fields], record.root_page_values)
+        return site
 
-        # put exact hostname+port match first
-        When(hostname=hostname, port=port, then=MATCH_HOSTNAME_PORT),
+    def get_site_for_hostname(self, hostname, port):
+        try:
+            port = int(port)
+        except (TypeError, ValueError):
+            port = None
 
-        # then put hostname+default (better than just hostname or just default)
-        When(hostname=hostname, is_default_site=True, then=MATCH_HOSTNAME_DEFAULT),
+        records = list(self.records_by_hostname.get(hostname, []))
+        if self.default_record is not None and self.default_record not in records:
+            records.append(self.default_record)
 
-        # then match default with different hostname. there is only ever
-        # one default, so order it above (possibly multiple) hostname
-        # matches so we can use sites[0] below to access it
-        When(is_default_site=True, then=MATCH_DEFAULT),
+        # order the candidates by best choice descending (this is a stable sort, so sites
+        # with an equal match keep their ordering by hostname)
+        matches = sorted(
+            ((record.get_match(hostname, port), record) for record in records),
+            key=lambda match: match[0]
+        )
 
-        # because of the filter below, if it's not default then its a hostname match
-        default=MATCH_HOSTNAME,
+        if matches:
+            best_match, record = matches[0]
 
-        output_field=IntegerField(),
-    )).filter(Q(hostname=hostname) | Q(is_default_site=True)).order_by(
-        'match'
-    ).select_related(
-        'root_page'
-    ))
+            # if theres a unique match or hostname (with port or default) match
+            if len(matches) == 1 or best_match in (MATCH_HOSTNAME_PORT, MATCH_HOSTNAME_DEFAULT):
+                return self.get_site(record)
 
-    if sites:
-        # if theres a unique match or hostname (with port or default) match
-        if len(sites) == 1 or sites[0].match in (MATCH_HOSTNAME_PORT, MATCH_HOSTNAME_DEFAULT):
-            return sites[0]
+            # if there is a default match with a different hostname, see if
+            # there are many hostname matches. if only 1 then use that instead
+            # otherwise we use the default
+            if best_match == MATCH_DEFAULT:
+                match, record = matches[len(matches) == 2]
+                return self.get_site(record)
 
-        # if there is a default match with a different hostname, see if
-        # there are many hostname matches. if only 1 then use that instead
-        # otherwise we use the default
-        if sites[0].match == MATCH_DEFAULT:
-            return sites[len(sites) == 2]
+        raise apps.get_model('wagtailcore.Site').DoesNotExist()
 
-    raise Site.DoesNotExist()
+
+_site_index = None
+_site_index_version = None
+_site_index_built_at = None
+
+
+def get_site_index():
+    """
+    Return the SiteIndex for the current process, rebuilding it if the Site records have
+    changed since it was built (as indicated by a version number held in the shared cache,
+    so that all processes are kept up to date), or if it is older than the
+    WAGTAIL_SITE_INDEX_MAX_AGE setting, for when the cache isn't shared between processes.
+    """
+    global _site_index, _site_index_version, _site_index_built_at
+
+    version = get_cache_version(cache, SITES_VERSION_CACHE_KEY)
+    now = time.monotonic()
+    max_age = getattr(settings, 'WAGTAIL_SITE_INDEX_MAX_AGE', 60)
+
+    if _site_index is None or version != _site_index_version or now - _site_index_built_at >= max_age:
+        Site = apps.get_model('wagtailcore.Site')
+        _site_index = SiteIndex(Site.objects.all())
+        _site_index_version = version
+        _site_index_built_at = now
+
+    return _site_index
+
+
+def clear_site_index():
+    """
+    Invalidate the SiteIndex of all processes. Called whenever a Site record or the root
+    page of a site is saved or deleted, and when pages are moved or their descendants'
+    url_paths are updated, as these may change the path or url_path of a root page.
+    """
+    global _site_index
+
+    _site_index = None
+    reset_cache_versions(cache, [SITES_VERSION_CACHE_KEY])
+
+
+def get_site_for_hostname(hostname, port):
+    """Return the wagtailcore.Site object for the given hostname and port."""
+    return get_site_index().get_site_for_hostname(hostname, port)
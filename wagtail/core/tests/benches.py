@@ -0,0 +1,111 @@
+from django.http import QueryDict
+from django.test import SimpleTestCase
+
+from wagtail.core import blocks
+from wagtail.core.rich_text import get_text_for_indexing
+from wagtail.tests.benchmark import Benchmark
+
+
+class LinkBlock(blocks.StructBlock):
+    title = blocks.CharBlock()
+    url = blocks.URLBlock(required=False)
+
+
+class SectionBlock(blocks.StructBlock):
+    heading = blocks.CharBlock()
+    body = blocks.TextBlock(required=False)
+    links = blocks.ListBlock(LinkBlock())
+
+
+class BodyBlock(blocks.StreamBlock):
+    heading = blocks.CharBlock()
+    paragraph = blocks.TextBlock()
+    section = SectionBlock()
+    number = blocks.IntegerBlock()
+
+
+class BenchStreamBlockWith1000Blocks(Benchmark, SimpleTestCase):
+    """
+    Submits a stream of 1000 blocks, including nested StructBlocks and ListBlocks, and benches
+    converting the form data to a value and validating it, as the page editor does when saving.
+    """
+
+    def setUp(self):
+        self.block = BodyBlock()
+
+        data = {'body-count': '1000'}
+        for i in range(1000):
+            prefix = 'body-%d' % i
+            block_type = ['heading', 'paragraph', 'section', 'number'][i % 4]
+            data.update({
+                prefix + '-deleted': '',
+                prefix + '-order': str(i),
+                prefix + '-type': block_type,
+                prefix + '-id': '',
+            })
+
+            if block_type == 'section':
+                data.update({
+                    prefix + '-value-heading': "Section %d" % i,
+                    prefix + '-value-body': "Body of section %d" % i,
+                    prefix + '-value-links-count': '3',
+                })
+                for j in range(3):
+                    link_prefix = '%s-value-links-%d' % (prefix, j)
+                    data.update({
+                        link_prefix + '-deleted': '',
+                        link_prefix + '-order': str(j),
+                        link_prefix + '-value-title': "Link %d" % j,
+                        link_prefix + '-value-url': 'http://example.com/%d/' % j,
+                    })
+            elif block_type == 'number':
+                data[prefix + '-value'] = str(i)
+            else:
+                data[prefix + '-value'] = "Text %d" % i
+
+        self.data = QueryDict(mutable=True)
+        self.data.update(data)
+
+    def bench(self):
+        value = self.block.clean(self.block.value_from_datadict(self.data, {}, 'body'))
+
+        self.assertEqual(len(value), 1000)
+        self.assertEqual(value[2].value['links'][2]['url'], 'http://example.com/2/')
+
+
+def make_article_body(i):
+    """
+    Return the database representation of a long rich text article, with the mix of
+    elements produced by the Draftail editor
+    """
+    paragraph = (
+        '<p>Paragraph {0} of article {1} discusses <b>wagtails</b> &amp; other <i>birds</i>, '
+        'with a <a linktype="page" id="{0}">link to a page</a>, a <a href="https://example.com/?a=1&amp;b={0}">'
+        'link to another site</a> and a <a linktype="document" id="{1}">document</a>.<br/>'
+        'It goes on for a while longer&nbsp;— as real articles do.</p>'
+    )
+
+    parts = []
+    for section in range(10):
+        parts.append('<h2>Section {}</h2>'.format(section))
+        parts.extend(paragraph.format(section * 5 + j, i) for j in range(5))
+        parts.append('<ul><li>First point</li><li>Second <a linktype="page" id="{}">point</a></li></ul>'.format(i))
+        parts.append('<embed embedtype="image" id="{}" format="fullwidth" alt="An image &quot;{}&quot;"/>'.format(section, i))
+        parts.append('<blockquote>A quotation</blockquote><hr/>')
+
+    return ''.join(parts)
+
+
+class BenchGetTextForIndexing(Benchmark, SimpleTestCase):
+    """
+    Extracts the text for search indexing from 100 long rich text articles, as update_index
+    does for each RichTextField and RichTextBlock
+    """
+
+    def setUp(self):
+        self.bodies = [make_article_body(i) for i in range(100)]
+
+    def bench(self):
+        texts = [get_text_for_indexing(body) for body in self.bodies]
+
+        self.assertTrue(texts[0].startswith('Section 0 Paragraph 0 of article 0 discusses wagtails & other birds'))
@@ -0,0 +1,143 @@
+from django.test import TestCase, override_settings
+
+from wagtail.core.ancestor_cache import get_ancestor_cache, get_ancestors_for_pages
+from wagtail.core.models import Page
+from wagtail.tests.testapp.models import EventIndex, EventPage, SimplePage
+
+
+class TestGetAncestorsForPages(TestCase):
+    fixtures = ['test.json']
+
+    def test_get_ancestors_for_pages(self):
+        christmas = Page.objects.get(url_path='/home/events/christmas/')
+        about_us = Page.objects.get(url_path='/home/about-us/')
+
+        with self.assertNumQueries(1):
+            ancestors = get_ancestors_for_pages([christmas, about_us])
+
+            self.assertEqual(
+                [page.url_path for page in ancestors[christmas.id]],
+                ['/', '/home/', '/home/events/']
+            )
+            self.assertEqual([page.url_path for page in ancestors[about_us.id]], ['/', '/home/'])
+
+            # Ancestors are instances of their specific class, with the fields
+            # needed for breadcrumbs loaded
+            events_index = ancestors[christmas.id][2]
+            self.assertIsInstance(events_index, EventIndex)
+            self.assertEqual(events_index.title, 'Events')
+            self.assertEqual(events_index.get_admin_display_title(), 'Events')
+            self.assertEqual(events_index.slug, 'events')
+            self.assertEqual(events_index.depth, 3)
+            self.assertFalse(events_index.is_root())
+            self.assertTrue(ancestors[christmas.id][0].is_root())
+
+            # Pages that share ancestors share the same instances
+            self.assertIs(ancestors[christmas.id][1], ancestors[about_us.id][1])
+
+        self.assertEqual(ancestors[christmas.id], list(christmas.get_ancestors().specific()))
+
+    def test_inclusive(self):
+        christmas = Page.objects.get(url_path='/home/events/christmas/')
+
+        ancestors = get_ancestors_for_pages([christmas], inclusive=True)
+
+        self.assertEqual(ancestors[christmas.id][:-1], list(christmas.get_ancestors().specific()))
+        self.assertIs(ancestors[christmas.id][-1], christmas)
+
+    def test_root_page(self):
+        root = Page.objects.get(depth=1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_ancestors_for_pages([root]), {root.id: []})
+
+    def test_ancestor_cache_disabled_by_default(self):
+        self.assertIsNone(get_ancestor_cache())
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+    'page_ancestors': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'wagtail-ancestor-cache-tests',
+    },
+})
+class TestAncestorCache(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        get_ancestor_cache().clear()
+
+    def get_ancestor_url_paths(self, url_path):
+        page = Page.objects.get(url_path=url_path)
+        return [ancestor.url_path for ancestor in get_ancestors_for_pages([page])[page.id]]
+
+    def test_ancestors_are_cached(self):
+        christmas = Page.objects.get(url_path='/home/events/christmas/')
+        ancestors = get_ancestors_for_pages([christmas])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_ancestors_for_pages([christmas]), ancestors)
+            self.assertIsInstance(get_ancestors_for_pages([christmas])[christmas.id][2], EventIndex)
+
+    def test_only_missing_ancestors_are_fetched(self):
+        self.get_ancestor_url_paths('/home/events/')
+
+        christmas = Page.objects.get(url_path='/home/events/christmas/')
+        with self.assertNumQueries(1):
+            get_ancestors_for_pages([christmas])
+
+    def test_rename_invalidates_ancestor(self):
+        self.get_ancestor_url_paths('/home/events/christmas/')
+
+        events_index = Page.objects.get(url_path='/home/events/')
+        events_index.title = 'What’s on'
+        events_index.save()
+
+        christmas = Page.objects.get(url_path='/home/events/christmas/')
+        self.assertEqual(get_ancestors_for_pages([christmas])[christmas.id][2].title, 'What’s on')
+
+    def test_slug_change_invalidates_ancestors(self):
+        self.get_ancestor_url_paths('/home/events/christmas/')
+
+        events_index = Page.objects.get(url_path='/home/events/')
+        events_index.slug = 'whats-on'
+        events_index.save()
+
+        self.assertEqual(
+            self.get_ancestor_url_paths('/home/whats-on/christmas/'),
+            ['/', '/home/', '/home/whats-on/']
+        )
+
+    def test_move_invalidates_ancestors(self):
+        self.get_ancestor_url_paths('/home/events/christmas/')
+        self.get_ancestor_url_paths('/home/about-us/')
+
+        # Move the events index under the about us page
+        events_index = Page.objects.get(url_path='/home/events/')
+        events_index.move(Page.objects.get(url_path='/home/about-us/'), pos='last-child')
+
+        self.assertEqual(
+            self.get_ancestor_url_paths('/home/about-us/events/christmas/'),
+            ['/', '/home/', '/home/about-us/', '/home/about-us/events/']
+        )
+
+    def test_new_page_at_reused_path_invalidates_ancestor(self):
+        homepage = Page.objects.get(url_path='/home/')
+        page = homepage.add_child(instance=SimplePage(title="Old section", slug="old-section", content="hello"))
+        child = page.add_child(instance=EventPage(title="Event", slug="event", location="The moon", audience='public', cost='Free', date_from='2021-01-01'))
+        self.get_ancestor_url_paths(child.url_path)
+
+        # Delete the section, then create a new one, which takes the same path
+        path = page.path
+        page.delete()
+        page = homepage.add_child(instance=SimplePage(title="New section", slug="new-section", content="hello"))
+        self.assertEqual(page.path, path)
+        child = page.add_child(instance=SimplePage(title="Child", slug="child", content="hello"))
+
+        self.assertEqual(
+            self.get_ancestor_url_paths(child.url_path),
+            ['/', '/home/', '/home/new-section/']
+        )
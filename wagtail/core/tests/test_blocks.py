@@ -6,18 +6,20 @@ import unittest
 
 from datetime import date, datetime
 from decimal import Decimal
+from unittest import mock
 
 # non-standard import name for gettext_lazy, to prevent strings from being picked up for translation
 from django import forms
 from django.core.exceptions import ValidationError
 from django.forms.utils import ErrorList
 from django.template.loader import render_to_string
-from django.test import SimpleTestCase, TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.utils.html import format_html
 from django.utils.safestring import SafeData, SafeText, mark_safe
 from django.utils.translation import gettext_lazy as __
 
 from wagtail.core import blocks
+from wagtail.core.blocks.render_cache import get_block_render_cache
 from wagtail.core.models import Page
 from wagtail.core.rich_text import RichText
 from wagtail.tests.testapp.blocks import LinkBlock as CustomLinkBlock
@@ -2308,6 +2310,22 @@ class TestListBlock(WagtailTestUtils, SimpleTestCase):
         block_value = block.value_from_datadict(post_data, {}, 'shoppinglist')
         self.assertEqual(block_value[2], "item 2")
 
+    def test_ordering_in_form_submission_with_duplicate_order(self):
+        block = blocks.ListBlock(blocks.StructBlock([('name', blocks.CharBlock())]))
+
+        # items with the same 'order' keep the order they appear in the form, and their
+        # values (which can't be compared) are not used for sorting
+        post_data = {'shoppinglist-count': '2'}
+        for i in range(0, 2):
+            post_data.update({
+                'shoppinglist-%d-deleted' % i: '',
+                'shoppinglist-%d-order' % i: '0',
+                'shoppinglist-%d-value-name' % i: "item %d" % i
+            })
+
+        block_value = block.value_from_datadict(post_data, {}, 'shoppinglist')
+        self.assertEqual([item['name'] for item in block_value], ["item 0", "item 1"])
+
     def test_can_specify_default(self):
         class ShoppingListBlock(blocks.StructBlock):
             shop = blocks.CharBlock()
@@ -4155,3 +4173,94 @@ class TestOverriddenGetTemplateBlockTag(TestCase):
         block = BlockUsingGetTemplateMethod(template='tests/blocks/this_shouldnt_be_used.html')
         template = block.get_template()
         self.assertEqual(template, block.my_new_template)
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+    'rendered_blocks': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'wagtail-block-render-cache-tests',
+    },
+})
+class TestBlockRenderCache(TestCase):
+    def setUp(self):
+        get_block_render_cache().clear()
+
+        self.heading_block = blocks.CharBlock(
+            template='tests/blocks/heading_block.html', cache_render=True, cache_vary_on=['language']
+        )
+
+    def render(self, value, block=None, language='fr'):
+        block = block or self.heading_block
+        with mock.patch.object(block, 'render_uncached', wraps=block.render_uncached) as render_uncached:
+            result = render_to_string('tests/blocks/include_block_test.html', {
+                'test_block': block.bind(value),
+                'language': language,
+            })
+
+        return result.strip(), render_uncached.call_count
+
+    def test_disabled_without_cache(self):
+        with override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+        }):
+            self.assertIsNone(get_block_render_cache())
+            self.render('bonjour')
+            self.assertEqual(self.render('bonjour')[1], 1)
+
+    def test_not_cached_by_default(self):
+        block = blocks.CharBlock(template='tests/blocks/heading_block.html')
+        self.render('bonjour', block=block)
+        self.assertEqual(self.render('bonjour', block=block)[1], 1)
+
+    def test_rendering_is_cached(self):
+        self.assertEqual(self.render('bonjour'), ('<body><h1 lang="fr">bonjour</h1></body>', 1))
+        self.assertEqual(self.render('bonjour'), ('<body><h1 lang="fr">bonjour</h1></body>', 0))
+
+    def test_cache_varies_on_value(self):
+        self.render('bonjour')
+        self.assertEqual(self.render('au revoir'), ('<body><h1 lang="fr">au revoir</h1></body>', 1))
+
+    def test_cache_varies_on_context(self):
+        self.render('bonjour')
+        self.assertEqual(self.render('bonjour', language='en'), ('<body><h1 lang="en">bonjour</h1></body>', 1))
+
+    def test_cache_varies_on_block_definition(self):
+        self.render('bonjour')
+        block = blocks.CharBlock(template='tests/blocks/heading_block.html', cache_render=True, max_length=10)
+        self.assertEqual(self.render('bonjour', block=block)[1], 1)
+
+    def test_unescaped_rendering(self):
+        # render_basic returns text that still needs to be escaped, and it must stay that way
+        block = blocks.CharBlock(cache_render=True)
+        for i in range(2):
+            result = block.render('<b>bonjour</b>')
+            self.assertEqual(result, '<b>bonjour</b>')
+            self.assertNotIsInstance(result, SafeData)
+
+    def test_stream_children_are_cached(self):
+        block = blocks.StreamBlock([
+            ('heading', self.heading_block),
+            ('paragraph', blocks.CharBlock()),
+        ])
+        stream_value = block.to_python([
+            {'type': 'heading', 'value': 'Bonjour'},
+            {'type': 'paragraph', 'value': 'monde'},
+        ])
+
+        result, render_count = self.render(stream_value, block=block)
+        self.assertIn('<h1 lang="fr">Bonjour</h1>', result)
+
+        with mock.patch.object(self.heading_block, 'render_uncached') as render_uncached:
+            self.assertEqual(self.render(stream_value, block=block)[0], result)
+
+        render_uncached.assert_not_called()
+
+    def test_cleared_when_page_is_published(self):
+        self.render('bonjour')
+
+        Page.objects.get(id=2).save_revision().publish()
+
+        self.assertEqual(self.render('bonjour')[1], 1)
@@ -0,0 +1,236 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import management
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from wagtail.core.bulk_copy import BulkSubtreeCopier
+from wagtail.core.models import Page, PageLogEntry
+from wagtail.tests.testapp.models import EventIndex, EventPage, SimplePage, SingleEventPage
+
+
+class TestBulkSubtreeCopier(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        self.events_index = EventIndex.objects.get(url_path='/home/events/')
+
+    def copy_events_index(self, **kwargs):
+        return self.events_index.copy(
+            recursive=True, bulk=True, update_attrs={'title': "New events index", 'slug': 'new-events-index'}, **kwargs
+        )
+
+    def assertTreeCopied(self, source, destination):
+        source_pages = list(source.get_descendants().specific())
+        copied_pages = list(Page.objects.get(id=destination.id).get_descendants().specific())
+
+        self.assertEqual(len(copied_pages), len(source_pages))
+        for source_page, copied_page in zip(source_pages, copied_pages):
+            self.assertIs(type(copied_page), type(source_page))
+            self.assertEqual(copied_page.title, source_page.title)
+            self.assertEqual(copied_page.depth - destination.depth, source_page.depth - source.depth)
+            self.assertEqual(copied_page.numchild, source_page.numchild)
+            self.assertEqual(
+                copied_page.url_path,
+                destination.url_path + source_page.url_path[len(source.url_path):]
+            )
+
+    def test_copy_recursively(self):
+        new_events_index = self.copy_events_index()
+
+        self.assertTreeCopied(self.events_index, new_events_index)
+
+        # The tree is still valid
+        self.assertEqual(Page.find_problems(), ([], [], [], [], []))
+
+        new_christmas_event = new_events_index.get_children().get(slug='christmas').specific
+        self.assertIsInstance(new_christmas_event, EventPage)
+        self.assertEqual(new_christmas_event.url_path, '/home/new-events-index/christmas/')
+        self.assertEqual(new_christmas_event.get_parent().id, new_events_index.id)
+
+        # Multi-table inheritance is preserved
+        new_saint_patrick_event = new_events_index.get_children().get(slug='saint-patrick').specific
+        self.assertIsInstance(new_saint_patrick_event, SingleEventPage)
+        self.assertEqual(
+            new_saint_patrick_event.excerpt,
+            SingleEventPage.objects.get(url_path='/home/events/saint-patrick/').excerpt
+        )
+
+    def test_copy_recursively_to_different_depth(self):
+        about_us = Page.objects.get(url_path='/home/about-us/')
+        new_events_index = self.events_index.copy(recursive=True, bulk=True, to=about_us)
+
+        self.assertEqual(new_events_index.depth, self.events_index.depth + 1)
+        self.assertTreeCopied(self.events_index, new_events_index)
+
+        # The tree is still valid
+        self.assertEqual(Page.find_problems(), ([], [], [], [], []))
+        self.assertEqual(
+            new_events_index.get_children().count(), self.events_index.get_children().count()
+        )
+        self.assertEqual(
+            new_events_index.get_children().get(slug='christmas').url_path, '/home/about-us/events/christmas/'
+        )
+
+    def test_copy_recursively_with_child_objects(self):
+        self.copy_events_index()
+
+        old_christmas_event = EventPage.objects.get(url_path='/home/events/christmas/')
+        new_christmas_event = EventPage.objects.get(url_path='/home/new-events-index/christmas/')
+
+        self.assertEqual(new_christmas_event.speakers.count(), 1)
+        self.assertNotEqual(new_christmas_event.speakers.get().id, old_christmas_event.speakers.get().id)
+        self.assertEqual(old_christmas_event.speakers.count(), 1)
+
+        # The copied revision refers to the copied page and child objects
+        revision_page = new_christmas_event.get_latest_revision().as_page_object()
+        self.assertEqual(revision_page.id, new_christmas_event.id)
+        self.assertEqual(revision_page.speakers.get().id, new_christmas_event.speakers.get().id)
+
+    def test_copy_recursively_with_revisions(self):
+        old_christmas_event = EventPage.objects.get(url_path='/home/events/christmas/')
+        old_christmas_event.title = "Christmas (draft)"
+        old_christmas_event.save_revision()
+
+        self.copy_events_index()
+
+        new_christmas_event = EventPage.objects.get(url_path='/home/new-events-index/christmas/')
+
+        # Copying creates a new revision, from the latest revision of the original page
+        self.assertEqual(new_christmas_event.revisions.count(), 2)
+        latest_revision = new_christmas_event.get_latest_revision()
+        self.assertEqual(new_christmas_event.latest_revision_created_at, latest_revision.created_at)
+        self.assertEqual(new_christmas_event.draft_title, "Christmas (draft)")
+        self.assertEqual(latest_revision.as_page_object().title, "Christmas (draft)")
+
+        # The copy is live, using the new revision
+        self.assertTrue(new_christmas_event.live)
+        self.assertEqual(new_christmas_event.live_revision, latest_revision)
+
+    def test_copy_recursively_without_keeping_live(self):
+        self.copy_events_index(keep_live=False)
+
+        new_christmas_event = EventPage.objects.get(url_path='/home/new-events-index/christmas/')
+        self.assertFalse(new_christmas_event.live)
+        self.assertTrue(new_christmas_event.has_unpublished_changes)
+        self.assertIsNone(new_christmas_event.live_revision)
+        self.assertIsNone(new_christmas_event.first_published_at)
+
+    def test_copy_recursively_creates_log_entries(self):
+        user = get_user_model().objects.get(email='eventmoderator@example.com')
+        self.copy_events_index(user=user)
+
+        new_christmas_event = EventPage.objects.get(url_path='/home/new-events-index/christmas/')
+        self.assertEqual(new_christmas_event.owner, user)
+
+        log_entries = PageLogEntry.objects.filter(page=new_christmas_event)
+        self.assertEqual(
+            sorted(log_entries.values_list('action', flat=True)),
+            ['wagtail.copy', 'wagtail.create', 'wagtail.publish']
+        )
+
+        copy_log_entry = log_entries.get(action='wagtail.copy')
+        self.assertEqual(copy_log_entry.user, user)
+        self.assertEqual(copy_log_entry.data['source']['id'], self.events_index.id)
+        self.assertEqual(copy_log_entry.data['destination']['title'], "New events index")
+
+    def test_query_count_doesnt_depend_on_number_of_pages(self):
+        homepage = Page.objects.get(url_path='/home/')
+
+        def count_queries(page_count):
+            section = homepage.add_child(instance=SimplePage(title="Section", slug="section-%d" % page_count, content="hello"))
+            for i in range(page_count):
+                page = section.add_child(instance=SimplePage(title="Page %d" % i, slug="page-%d" % i, content="hello"))
+                page.save_revision()
+
+            section = Page.objects.get(id=section.id)
+            destination = section.copy(update_attrs={'slug': 'section-%d-copy' % page_count})
+            with CaptureQueriesContext(connection) as context:
+                BulkSubtreeCopier(section, destination, keep_live=False).run()
+
+            self.assertEqual(destination.get_descendants().count(), page_count)
+            return len(context.captured_queries)
+
+        self.assertEqual(count_queries(20), count_queries(5))
+
+    def test_copy_in_chunks(self):
+        new_events_index = self.events_index.copy(update_attrs={'slug': 'new-events-index'})
+
+        progress = []
+        BulkSubtreeCopier(self.events_index, new_events_index, chunk_size=2).run(
+            progress_callback=lambda copied, total: progress.append((copied, total))
+        )
+
+        total = self.events_index.get_descendants().count()
+        self.assertEqual(progress[-1], (total, total))
+        self.assertEqual(progress[0], (2, total))
+        self.assertTreeCopied(self.events_index, new_events_index)
+
+    def test_resume_copy(self):
+        new_events_index = self.events_index.copy(update_attrs={'slug': 'new-events-index'})
+
+        class Interrupted(Exception):
+            pass
+
+        def interrupt(copied, total):
+            raise Interrupted
+
+        with self.assertRaises(Interrupted):
+            BulkSubtreeCopier(self.events_index, new_events_index, chunk_size=2).run(progress_callback=interrupt)
+
+        self.assertEqual(Page.objects.get(id=new_events_index.id).get_descendants().count(), 2)
+
+        # A new copier carries on where the last one stopped
+        progress = []
+        BulkSubtreeCopier(self.events_index, new_events_index, chunk_size=2).run(
+            progress_callback=lambda copied, total: progress.append(copied)
+        )
+        self.assertEqual(progress[0], 4)
+        self.assertTreeCopied(self.events_index, new_events_index)
+
+    def test_cannot_copy_into_itself(self):
+        with self.assertRaisesMessage(Exception, "You cannot copy a tree branch recursively into itself"):
+            BulkSubtreeCopier(self.events_index, self.events_index.get_children().first())
+
+
+class TestCopyPageSubtreeCommand(TestCase):
+    fixtures = ['test.json']
+
+    def run_command(self, *args, **options):
+        output = StringIO()
+        management.call_command('copy_page_subtree', *args, stdout=output, **options)
+        output.seek(0)
+        return output.read()
+
+    def test_copy_page_subtree(self):
+        events_index = Page.objects.get(url_path='/home/events/')
+        about_us = Page.objects.get(url_path='/home/about-us/')
+
+        output = self.run_command(events_index.id, about_us.id, chunk_size=3)
+
+        new_events_index = Page.objects.get(url_path='/home/about-us/events/')
+        self.assertEqual(new_events_index.get_descendants().count(), events_index.get_descendants().count())
+        self.assertIn('Copied 3 of', output)
+        self.assertIn('Done', output)
+
+    def test_copy_page_subtree_with_existing_slug(self):
+        events_index = Page.objects.get(url_path='/home/events/')
+
+        with self.assertRaisesMessage(management.CommandError, 'already has a child page with the slug "events"'):
+            self.run_command(events_index.id, events_index.get_parent().id)
+
+        self.run_command(events_index.id, events_index.get_parent().id, slug='events-copy')
+        self.assertTrue(Page.objects.filter(url_path='/home/events-copy/christmas/').exists())
+
+    def test_resume(self):
+        events_index = Page.objects.get(url_path='/home/events/')
+        new_events_index = events_index.copy(update_attrs={'slug': 'new-events-index'})
+
+        self.run_command(events_index.id, new_events_index.id, resume=True)
+
+        self.assertEqual(
+            Page.objects.get(id=new_events_index.id).get_descendants().count(),
+            events_index.get_descendants().count()
+        )
@@ -4,11 +4,13 @@ from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.core import management
-from django.db import models
-from django.test import TestCase
+from django.db import connection, models
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
-from wagtail.core.models import Collection, Page, PageLogEntry, PageRevision
+from wagtail.core.management.commands.purge_revisions import purge_revisions
+from wagtail.core.models import Collection, Page, PageLogEntry, PageMoveUpdate, PageRevision
 from wagtail.core.signals import page_published, page_unpublished
 from wagtail.tests.testapp.models import EventPage, SimplePage
 
@@ -149,6 +151,40 @@ class TestMovePagesCommand(TestCase):
             self.assertEqual(Page.objects.get(id=page_id).get_parent(), about_us)
 
 
+class TestProcessPageMoveUpdatesCommand(TestCase):
+    fixtures = ['test.json']
+
+    def run_command(self, **options):
+        output = StringIO()
+        management.call_command('process_page_move_updates', stdout=output, **options)
+        output.seek(0)
+        return output.read()
+
+    @override_settings(WAGTAIL_DEFER_PAGE_MOVE_UPDATES=True)
+    def test_process_page_move_updates(self):
+        events_index = Page.objects.get(url_path='/home/events/')
+        events_index.move(Page.objects.get(url_path='/home/about-us/'), pos='last-child')
+
+        with mock.patch('wagtail.search.index.insert_or_update_objects') as insert_or_update_objects:
+            output = self.run_command()
+
+        self.assertEqual(insert_or_update_objects.call_count, 1)
+        self.assertFalse(PageMoveUpdate.objects.exists())
+        self.assertIn("Updated 1 moved pages.", output)
+
+    @override_settings(WAGTAIL_DEFER_PAGE_MOVE_UPDATES=True)
+    def test_process_page_move_updates_dryrun(self):
+        events_index = Page.objects.get(url_path='/home/events/')
+        events_index.move(Page.objects.get(url_path='/home/about-us/'), pos='last-child')
+
+        with mock.patch('wagtail.search.index.insert_or_update_objects') as insert_or_update_objects:
+            output = self.run_command(dryrun=True)
+
+        insert_or_update_objects.assert_not_called()
+        self.assertTrue(PageMoveUpdate.objects.exists())
+        self.assertIn("/home/events/\t/home/about-us/events/", output)
+
+
 class TestSetUrlPathsCommand(TestCase):
 
     fixtures = ['test.json']
@@ -351,6 +387,65 @@ class TestPublishScheduledPagesCommand(TestCase):
         p = Page.objects.get(slug='hello-world')
         self.assertFalse(PageRevision.objects.filter(page=p, submitted_for_moderation=True).exists())
 
+    def test_revision_expire_at_is_stored(self):
+        expire_at = timezone.now() + timedelta(days=1)
+        page = SimplePage(title="Hello world!", slug="hello-world", content="hello", expire_at=expire_at)
+        self.root_page.add_child(instance=page)
+
+        revision = page.save_revision(submitted_for_moderation=True)
+
+        self.assertEqual(PageRevision.objects.get(id=revision.id).expire_at, expire_at)
+
+    def test_publish_in_batches(self):
+        pages = []
+        for i in range(5):
+            page = SimplePage(
+                title="Hello world %d" % i,
+                slug="hello-world-%d" % i,
+                content="hello",
+                live=False,
+                go_live_at=timezone.now() - timedelta(days=1),
+            )
+            self.root_page.add_child(instance=page)
+            page.save_revision(approved_go_live_at=timezone.now() - timedelta(days=1))
+            pages.append(page)
+
+        management.call_command('publish_scheduled_pages', batch_size=2)
+
+        self.assertEqual(Page.objects.filter(id__in=[page.id for page in pages], live=True).count(), 5)
+        self.assertFalse(PageRevision.objects.exclude(approved_go_live_at__isnull=True).exists())
+
+    def test_loop(self):
+        class Stop(Exception):
+            pass
+
+        page = SimplePage(
+            title="Hello world!",
+            slug="hello-world",
+            content="hello",
+            live=False,
+            go_live_at=timezone.now() - timedelta(days=1),
+        )
+        self.root_page.add_child(instance=page)
+
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            if len(sleeps) == 1:
+                # Schedule the page after the first check
+                page.save_revision(approved_go_live_at=timezone.now() - timedelta(days=1))
+            else:
+                raise Stop
+
+        with mock.patch('wagtail.core.management.commands.publish_scheduled_pages.time.sleep', side_effect=sleep):
+            with mock.patch('wagtail.core.management.commands.publish_scheduled_pages.close_old_connections'):
+                with self.assertRaises(Stop):
+                    management.call_command('publish_scheduled_pages', loop=True, interval=5)
+
+        self.assertEqual(sleeps, [5, 5])
+        self.assertTrue(Page.objects.get(id=page.id).live)
+
 
 class TestPurgeRevisionsCommand(TestCase):
     fixtures = ['test.json']
@@ -439,6 +534,41 @@ class TestPurgeRevisionsCommand(TestCase):
         # revision is now older than 30 days, so should be deleted
         self.assertNotIn(old_revision, PageRevision.objects.filter(page=self.page))
 
+    def test_purge_revisions_in_batches(self):
+        for i in range(5):
+            self.page.save_revision()
+        latest_revision = self.page.get_latest_revision()
+
+        output = StringIO()
+        management.call_command('purge_revisions', batch_size=2, verbosity=2, stdout=output)
+
+        self.assertEqual(list(PageRevision.objects.filter(page=self.page)), [latest_revision])
+        self.assertIn("Deleted 2 revisions", output.getvalue())
+        self.assertIn("Deleted 4 revisions", output.getvalue())
+        self.assertIn("Successfully deleted 4 revisions", output.getvalue())
+
+    def test_purge_revisions_query_count(self):
+        def count_queries(revision_count):
+            for i in range(revision_count):
+                self.page.save_revision()
+
+            with CaptureQueriesContext(connection) as context:
+                purge_revisions()
+
+            self.assertEqual(PageRevision.objects.filter(page=self.page).count(), 1)
+            return len(context.captured_queries)
+
+        self.assertEqual(count_queries(20), count_queries(5))
+
+    def test_purge_revisions_with_max_runtime(self):
+        for i in range(5):
+            self.page.save_revision()
+
+        with mock.patch('wagtail.core.management.commands.purge_revisions.time.monotonic', side_effect=[0, 0, 10]):
+            self.assertEqual(purge_revisions(batch_size=2, max_runtime=5), 2)
+
+        self.assertEqual(PageRevision.objects.filter(page=self.page).count(), 3)
+
 
 class TestCreateLogEntriesFromRevisionsCommand(TestCase):
     fixtures = ['test.json']
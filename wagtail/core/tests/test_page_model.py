@@ -2,6 +2,7 @@ import datetime
 import json
 import unittest
 
+from unittest import mock
 from unittest.mock import Mock
 
 import pytz
@@ -19,9 +20,9 @@ from django.utils import timezone, translation
 from freezegun import freeze_time
 
 from wagtail.core.models import (
-    Locale, Page, PageLogEntry, PageManager, ParentNotTranslatedError, Site, get_page_models,
-    get_translatable_models)
-from wagtail.core.signals import page_published
+    Locale, Page, PageLogEntry, PageManager, PageMoveUpdate, PageUrlGenerator,
+    ParentNotTranslatedError, Site, get_page_models, get_translatable_models)
+from wagtail.core.signals import page_published, post_page_subtree_move
 from wagtail.tests.testapp.models import (
     AbstractPage, Advert, AlwaysShowInMenusPage, BlogCategory, BlogCategoryBlogPage, BusinessChild,
     BusinessIndex, BusinessNowherePage, BusinessSubIndex, CustomManager, CustomManagerPage,
@@ -134,6 +135,7 @@ class TestValidation(TestCase):
 
 
 @override_settings(ALLOWED_HOSTS=['localhost', 'events.example.com', 'about.example.com', 'unknown.site.com'])
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
 class TestSiteRouting(TestCase):
     fixtures = ['test.json']
 
@@ -228,6 +230,129 @@ class TestSiteRouting(TestCase):
         with self.assertNumQueries(1):
             self.assertEqual(Site.find_for_request(request), self.alternate_port_events_site)
 
+    def test_sites_are_resolved_without_queries_once_indexed(self):
+        request = HttpRequest()
+        request.path = '/'
+        request.META['HTTP_HOST'] = self.events_site.hostname
+        request.META['SERVER_PORT'] = self.events_site.port
+        Site.find_for_request(request)
+
+        request = HttpRequest()
+        request.path = '/'
+        request.META['HTTP_HOST'] = self.about_site.hostname
+        request.META['SERVER_PORT'] = self.unrecognised_port
+        with self.assertNumQueries(0):
+            site = Site.find_for_request(request)
+            self.assertEqual(site, self.about_site)
+            self.assertEqual(site.root_page.url_path, '/home/about-us/')
+
+    def test_site_index_is_rebuilt_when_sites_change(self):
+        request = HttpRequest()
+        request.path = '/'
+        request.META['HTTP_HOST'] = self.unrecognised_hostname
+        request.META['SERVER_PORT'] = '80'
+        self.assertEqual(Site.find_for_request(request), self.default_site)
+
+        unrecognised_site = Site.objects.create(
+            hostname=self.unrecognised_hostname, root_page=Page.objects.get(url_path='/home/events/')
+        )
+
+        request = HttpRequest()
+        request.path = '/'
+        request.META['HTTP_HOST'] = self.unrecognised_hostname
+        request.META['SERVER_PORT'] = '80'
+        self.assertEqual(Site.find_for_request(request), unrecognised_site)
+
+        unrecognised_site.delete()
+
+        request = HttpRequest()
+        request.path = '/'
+        request.META['HTTP_HOST'] = self.unrecognised_hostname
+        request.META['SERVER_PORT'] = '80'
+        self.assertEqual(Site.find_for_request(request), self.default_site)
+
+    @override_settings(WAGTAIL_SITE_INDEX_MAX_AGE=60)
+    def test_site_index_is_rebuilt_when_too_old(self):
+        def find_site(hostname):
+            request = HttpRequest()
+            request.path = '/'
+            request.META['HTTP_HOST'] = hostname
+            request.META['SERVER_PORT'] = '80'
+            return Site.find_for_request(request)
+
+        with mock.patch('wagtail.core.sites.time.monotonic', return_value=1000):
+            self.assertEqual(find_site(self.unrecognised_hostname), self.default_site)
+
+        # Changed without signals, as by another process when the cache isn't shared
+        Site.objects.filter(id=self.about_site.id).update(hostname=self.unrecognised_hostname)
+
+        with mock.patch('wagtail.core.sites.time.monotonic', return_value=1059):
+            self.assertEqual(find_site(self.unrecognised_hostname), self.default_site)
+
+        with mock.patch('wagtail.core.sites.time.monotonic', return_value=1060):
+            self.assertEqual(find_site(self.unrecognised_hostname), self.about_site)
+
+    def test_site_index_is_rebuilt_when_root_page_changes(self):
+        request = HttpRequest()
+        request.path = '/'
+        request.META['HTTP_HOST'] = self.about_site.hostname
+        request.META['SERVER_PORT'] = self.about_site.port
+        Site.find_for_request(request)
+
+        about_page = Page.objects.get(url_path='/home/about-us/')
+        about_page.title = "About"
+        about_page.save()
+
+        request = HttpRequest()
+        request.path = '/'
+        request.META['HTTP_HOST'] = self.about_site.hostname
+        request.META['SERVER_PORT'] = self.about_site.port
+        self.assertEqual(Site.find_for_request(request).root_page.title, "About")
+
+    def get_about_site_root_page(self):
+        request = HttpRequest()
+        request.path = '/'
+        request.META['HTTP_HOST'] = self.about_site.hostname
+        request.META['SERVER_PORT'] = self.about_site.port
+        return Site.find_for_request(request).root_page
+
+    def test_site_index_is_rebuilt_when_root_page_path_is_renumbered(self):
+        self.get_about_site_root_page()
+
+        # Moving a page to the left of the site root page renumbers the site root page's path
+        homepage = Page.objects.get(url_path='/home/')
+        about_page = Page.objects.get(url_path='/home/about-us/')
+        new_page = homepage.add_child(instance=SimplePage(title="New page", slug='new-page', content="hello"))
+        new_page.move(about_page, pos='left')
+
+        about_page.refresh_from_db()
+        self.assertEqual(self.get_about_site_root_page().path, about_page.path)
+
+        response = self.client.get('/', HTTP_HOST=self.about_site.hostname)
+        self.assertEqual(response.status_code, 200)
+
+    def test_site_index_is_rebuilt_when_root_page_url_path_changes(self):
+        homepage = Page.objects.get(url_path='/home/')
+        section = homepage.add_child(instance=SimplePage(title="Section", slug='section', content="hello"))
+        section_page = section.add_child(instance=SimplePage(title="Page", slug='page', content="hello"))
+        site = self.about_site
+        site.root_page = section_page
+        site.save()
+
+        request = HttpRequest()
+        request.META['HTTP_HOST'] = site.hostname
+        request.META['SERVER_PORT'] = site.port
+        self.assertEqual(Site.find_for_request(request).root_page.url_path, '/home/section/page/')
+
+        # Renaming an ancestor of the site root page changes the site root page's url_path
+        section.slug = 'new-section'
+        section.save()
+
+        request = HttpRequest()
+        request.META['HTTP_HOST'] = site.hostname
+        request.META['SERVER_PORT'] = site.port
+        self.assertEqual(Site.find_for_request(request).root_page.url_path, '/home/new-section/page/')
+
 
 class TestRouting(TestCase):
     fixtures = ['test.json']
@@ -621,6 +746,133 @@ class TestRoutingWithI18N(TestRouting):
             self.assertEqual(christmas_page.get_url(request=request), '/en/events/christmas/')
 
 
+class TestPageUrlGenerator(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        # Clear the cache of site root paths, as it is not kept in sync when the database
+        # is rolled back between tests
+        from django.core.cache import cache
+        cache.delete_many(['wagtail_site_root_paths', 'wagtail_site_root_paths_version'])
+
+    def get_request(self, site):
+        request = HttpRequest()
+        request.META['HTTP_HOST'] = site.hostname
+        request.META['SERVER_PORT'] = site.port
+        return request
+
+    def test_get_urls(self):
+        pages = list(Page.objects.all().specific())
+        generator = PageUrlGenerator.for_request()
+
+        self.assertEqual(generator.get_urls(pages), [page.get_url() for page in pages])
+        self.assertEqual(generator.get_full_urls(pages), [page.get_full_url() for page in pages])
+
+    @override_settings(ALLOWED_HOSTS=['localhost', 'events.example.com'])
+    def test_get_urls_with_multiple_sites(self):
+        events_site = Site.objects.create(hostname='events.example.com', root_page=Page.objects.get(url_path='/home/events/'))
+        pages = list(Page.objects.all().specific())
+
+        for site in [Site.objects.get(is_default_site=True), events_site]:
+            request = self.get_request(site)
+            self.assertEqual(
+                PageUrlGenerator.for_request(request).get_urls(pages, request=request),
+                [page.get_url(request=self.get_request(site)) for page in pages]
+            )
+
+        christmas_page = Page.objects.get(url_path='/home/events/christmas/')
+        self.assertEqual(
+            PageUrlGenerator.for_request().get_url(christmas_page),
+            'http://events.example.com/christmas/'
+        )
+
+    def test_custom_get_url_parts_is_respected(self):
+        saint_patrick = SingleEventPage.objects.get(url_path='/home/events/saint-patrick/')
+
+        self.assertEqual(PageUrlGenerator.for_request().get_url(saint_patrick), '/events/saint-patrick/pointless-suffix/')
+
+    @override_settings(ALLOWED_HOSTS=['localhost', 'events.example.com'])
+    def test_most_specific_site_root_path_first(self):
+        events_site = Site.objects.create(hostname='events.example.com', root_page=Page.objects.get(url_path='/home/events/'))
+        default_site = Site.objects.get(is_default_site=True)
+        generator = PageUrlGenerator.for_request()
+
+        self.assertEqual(
+            [root_path.site_id for root_path in generator.get_possible_site_root_paths('/home/events/christmas/')],
+            [events_site.id, default_site.id]
+        )
+        self.assertEqual(
+            [root_path.site_id for root_path in generator.get_possible_site_root_paths('/home/about-us/')],
+            [default_site.id]
+        )
+        self.assertEqual(generator.get_possible_site_root_paths('/'), [])
+
+    @override_settings(ROOT_URLCONF='wagtail.tests.headless_urls')
+    def test_headless(self):
+        from django.urls import clear_url_caches
+        clear_url_caches()
+        self.addCleanup(clear_url_caches)
+
+        homepage = Page.objects.get(url_path='/home/')
+        default_site = Site.objects.get(is_default_site=True)
+
+        self.assertEqual(PageUrlGenerator.for_request().get_url_parts(homepage), (default_site.id, None, None))
+        self.assertIsNone(PageUrlGenerator.for_request().get_url(homepage))
+
+    def test_generator_is_cached_on_request(self):
+        request = self.get_request(Site.objects.get(is_default_site=True))
+        pages = list(Page.objects.all())
+
+        PageUrlGenerator.for_request(request)
+        with self.assertNumQueries(0):
+            PageUrlGenerator.for_request(request).get_urls(pages, request=request)
+            pages[1].get_url(request=request)
+
+
+@override_settings(WAGTAIL_ROUTE_BY_URL_PATH=True)
+class TestRoutingByUrlPath(TestRouting):
+    # This inherits from TestRouting so contains all the same test cases, run with
+    # single-query routing enabled
+
+    def test_request_routing_num_queries(self):
+        homepage = Page.objects.get(url_path='/home/')
+        parent = homepage
+        for slug in ['one', 'two', 'three']:
+            parent = parent.add_child(instance=SimplePage(title=slug, slug=slug, content="hello"))
+
+        request = HttpRequest()
+        request.path = '/one/two/three/'
+        # One query for all pages along the path, then one for the specific page
+        with self.assertNumQueries(2):
+            (found_page, args, kwargs) = homepage.route(request, ['one', 'two', 'three'])
+        self.assertEqual(found_page, parent)
+        self.assertIsInstance(found_page, SimplePage)
+
+    def test_request_routing_hands_over_to_custom_route(self):
+        homepage = Page.objects.get(url_path='/home/')
+
+        # EventIndex overrides route to serve pagination URLs directly
+        request = HttpRequest()
+        request.path = '/events/2/'
+        response = homepage.route(request, ['events', '2'])
+        self.assertEqual(response.context_data['page'], EventIndex.objects.get(url_path='/home/events/'))
+
+    def test_route_does_not_match_pages_outside_subtree(self):
+        events_page = Page.objects.get(url_path='/home/events/')
+
+        request = HttpRequest()
+        # /home/events/ is not a descendant of the events page
+        with self.assertRaises(Http404):
+            events_page.route(request, ['events'])
+
+    def test_route_to_partial_path_returns_404(self):
+        homepage = Page.objects.get(url_path='/home/')
+
+        request = HttpRequest()
+        with self.assertRaises(Http404):
+            homepage.route(request, ['quinquagesima', 'christmas'])
+
+
 class TestServeView(TestCase):
     fixtures = ['test.json']
 
@@ -629,7 +881,7 @@ class TestServeView(TestCase):
         # in sync by the Site.save logic, but this is bypassed when the database is
         # rolled back between tests using transactions.
         from django.core.cache import cache
-        cache.delete('wagtail_site_root_paths')
+        cache.delete_many(['wagtail_site_root_paths', 'wagtail_site_root_paths_version'])
 
         # also need to clear urlresolver caches before/after tests, because we override
         # ROOT_URLCONF in some tests here
@@ -795,6 +1047,86 @@ class TestMovePage(TestCase):
         self.assertEqual(christmas.depth, 5)
         self.assertEqual(christmas.url_path, '/home/about-us/events/christmas/')
 
+    def test_move_page_doesnt_update_descendants_by_default(self):
+        about_us_page = SimplePage.objects.get(url_path='/home/about-us/')
+        events_index = EventIndex.objects.get(url_path='/home/events/')
+        signal_handler = mock.Mock()
+        post_page_subtree_move.connect(signal_handler)
+
+        try:
+            with mock.patch('wagtail.search.index.insert_or_update_objects') as insert_or_update_objects:
+                events_index.move(about_us_page, pos='last-child')
+        finally:
+            post_page_subtree_move.disconnect(signal_handler)
+
+        insert_or_update_objects.assert_not_called()
+        signal_handler.assert_not_called()
+        self.assertFalse(PageMoveUpdate.objects.exists())
+
+    @override_settings(WAGTAIL_DEFER_PAGE_MOVE_UPDATES=True)
+    def test_move_page_update_reindexes_descendants(self):
+        about_us_page = SimplePage.objects.get(url_path='/home/about-us/')
+        events_index = EventIndex.objects.get(url_path='/home/events/')
+        descendant_ids = set(events_index.get_descendants().values_list('id', flat=True))
+        events_index.move(about_us_page, pos='last-child')
+
+        with mock.patch('wagtail.search.index.insert_or_update_objects') as insert_or_update_objects:
+            PageMoveUpdate.objects.get().process()
+
+        # descendants are reindexed in their specific form, with their new paths
+        indexed_pages = insert_or_update_objects.call_args[0][0]
+        self.assertEqual({page.id for page in indexed_pages}, descendant_ids)
+        christmas = next(page for page in indexed_pages if page.slug == 'christmas')
+        self.assertIsInstance(christmas, EventPage)
+        self.assertEqual(christmas.url_path, '/home/about-us/events/christmas/')
+        self.assertEqual(christmas.depth, 5)
+
+    @override_settings(WAGTAIL_DEFER_PAGE_MOVE_UPDATES=True)
+    def test_move_page_update_sends_subtree_move_signal(self):
+        about_us_page = SimplePage.objects.get(url_path='/home/about-us/')
+        events_index = EventIndex.objects.get(url_path='/home/events/')
+        events_index.move(about_us_page, pos='last-child')
+        signal_handler = mock.Mock()
+        post_page_subtree_move.connect(signal_handler)
+
+        try:
+            PageMoveUpdate.objects.get().process()
+        finally:
+            post_page_subtree_move.disconnect(signal_handler)
+
+        self.assertEqual(signal_handler.call_count, 1)
+        kwargs = signal_handler.call_args[1]
+        self.assertEqual(kwargs['sender'], EventIndex)
+        self.assertEqual(kwargs['instance'].id, events_index.id)
+        self.assertEqual(kwargs['url_path_before'], '/home/events/')
+        self.assertEqual(kwargs['url_path_after'], '/home/about-us/events/')
+
+    @override_settings(WAGTAIL_DEFER_PAGE_MOVE_UPDATES=True)
+    def test_move_page_with_deferred_updates(self):
+        about_us_page = SimplePage.objects.get(url_path='/home/about-us/')
+        events_index = EventIndex.objects.get(url_path='/home/events/')
+        descendant_ids = set(events_index.get_descendants().values_list('id', flat=True))
+
+        with mock.patch('wagtail.search.index.insert_or_update_objects') as insert_or_update_objects:
+            events_index.move(about_us_page, pos='last-child')
+
+        # paths are updated immediately, but reindexing the descendants is left for later
+        self.assertEqual(
+            Page.objects.get(slug='christmas').url_path, '/home/about-us/events/christmas/'
+        )
+        insert_or_update_objects.assert_not_called()
+
+        update = PageMoveUpdate.objects.get()
+        self.assertEqual(update.page_id, events_index.id)
+        self.assertEqual(update.url_path_before, '/home/events/')
+        self.assertEqual(update.url_path_after, '/home/about-us/events/')
+
+        with mock.patch('wagtail.search.index.insert_or_update_objects') as insert_or_update_objects:
+            update.process()
+
+        self.assertEqual({page.id for page in insert_or_update_objects.call_args[0][0]}, descendant_ids)
+        self.assertFalse(PageMoveUpdate.objects.exists())
+
 
 class TestPrevNextSiblings(TestCase):
     fixtures = ['test.json']
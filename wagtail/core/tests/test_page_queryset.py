@@ -1,13 +1,20 @@
+import json
+
 from unittest import mock
 
 from django.contrib.contenttypes.models import ContentType
+from django.db import connection
 from django.db.models import Count, Q
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from wagtail.core.models import Locale, Page, PageViewRestriction, Site
 from wagtail.core.signals import page_unpublished
+from wagtail.images.models import Image
+from wagtail.images.tests.utils import get_test_image_file
 from wagtail.search.query import MATCH_ALL
-from wagtail.tests.testapp.models import EventPage, SimplePage, SingleEventPage, StreamPage
+from wagtail.tests.testapp.models import (
+    EventIndex, EventPage, SimplePage, SingleEventPage, StreamPage)
 
 
 class TestPageQuerySet(TestCase):
@@ -628,6 +635,54 @@ class TestSpecificQuery(TestCase):
             with self.assertNumQueries(0):
                 self.assertIs(page, page.specific)
 
+    def test_specific_with_only(self):
+        root = Page.objects.get(url_path='/home/')
+        qs = root.get_descendants().only('id', 'title').specific()
+
+        with self.assertNumQueries(4):
+            # The content type is still fetched with the base pages, rather than
+            # one page at a time: one query to get the base pages, one query per
+            # page type: EventIndex, EventPage, SimplePage
+            pages = list(qs)
+
+        self.assertEqual([page.title for page in pages], [page.title for page in root.get_descendants()])
+        for page in pages:
+            self.assertIsInstance(page, page.content_type.model_class())
+
+    def test_specific_with_defer(self):
+        root = Page.objects.get(url_path='/home/')
+        qs = root.get_descendants().defer('content_type', 'search_description').specific()
+
+        with self.assertNumQueries(4):
+            pages = list(qs)
+
+        for page in pages:
+            self.assertIsInstance(page, page.content_type.model_class())
+
+    def test_specific_only_fetches_specific_fields(self):
+        root = Page.objects.get(url_path='/home/')
+
+        with CaptureQueriesContext(connection) as queries:
+            pages = list(root.get_descendants().specific())
+
+        # The base page fields are fetched by the first query only, and the
+        # queries for each page type only select from their own tables
+        self.assertEqual(len(queries), 4)
+        self.assertIn('"wagtailcore_page"."title"', queries[0]['sql'])
+        for query in queries[1:]:
+            self.assertNotIn('wagtailcore_page', query['sql'])
+
+        christmas = pages[1]
+        self.assertIsInstance(christmas, EventPage)
+        with self.assertNumQueries(0):
+            self.assertEqual(christmas.title, 'Christmas')
+            self.assertEqual(christmas.url_path, '/home/events/christmas/')
+            self.assertEqual(christmas.location, 'The North Pole')
+            self.assertEqual(christmas.page_ptr_id, christmas.id)
+        self.assertEqual(christmas.specific, christmas)
+        self.assertFalse(christmas._state.adding)
+        self.assertEqual(christmas._state.db, 'default')
+
     def test_filtering_before_specific(self):
         # This will get the other events, and then christmas
         # 'someone-elses-event' and the tentative event are unpublished.
@@ -667,12 +722,12 @@ class TestSpecificQuery(TestCase):
 
     def test_specific_query_with_annotations_performs_no_additional_queries(self):
 
-        with self.assertNumQueries(5):
+        with self.assertNumQueries(4):
             pages = list(Page.objects.live().specific())
 
             self.assertEqual(len(pages), 7)
 
-        with self.assertNumQueries(5):
+        with self.assertNumQueries(4):
             pages = list(Page.objects.live().specific().annotate(count=Count('pk')))
 
             self.assertEqual(len(pages), 7)
@@ -791,6 +846,254 @@ class TestSpecificQuery(TestCase):
             # <StreamPage: stream page>
             pages[-1].body
 
+    def test_specific_iterator(self):
+        root = Page.objects.get(url_path='/home/')
+        qs = root.get_descendants().specific()
+
+        with self.assertNumQueries(4):
+            # One query to get page type and ID, one query per page type:
+            # EventIndex, EventPage, SimplePage
+            pages = list(qs.iterator())
+
+        self.assertEqual(pages, list(qs))
+        for page in pages:
+            self.assertIsInstance(page, page.content_type.model_class())
+
+    def test_specific_iterator_with_chunk_size(self):
+        root = Page.objects.get(url_path='/home/')
+        qs = root.get_descendants().specific()
+
+        with self.assertNumQueries(3):
+            # One query to get page type and ID, then one query per page type in
+            # the first chunk: EventIndex, EventPage
+            iterator = qs.iterator(chunk_size=2)
+            first_page = next(iterator)
+
+        self.assertEqual(first_page, Page.objects.get(url_path='/home/events/').specific)
+
+        # The remaining chunks are fetched as the iterator is consumed:
+        # EventPage | SimplePage | EventPage
+        with self.assertNumQueries(3):
+            pages = [first_page] + list(iterator)
+
+        self.assertEqual(pages, list(qs))
+        for page in pages:
+            self.assertIsInstance(page, page.content_type.model_class())
+
+    def test_specific_iterator_with_chunk_size_and_server_side_cursors_disabled(self):
+        root = Page.objects.get(url_path='/home/')
+        qs = root.get_descendants().specific()
+
+        # QuerySet.iterator() reads this from the connection rather than from settings,
+        # so override_settings(DATABASES=...) wouldn't reach it
+        with mock.patch.dict(connection.settings_dict, {'DISABLE_SERVER_SIDE_CURSORS': True}):
+            with self.assertNumQueries(3):
+                # One query to get page type and ID, then one query per page type in
+                # the first chunk: EventIndex, EventPage
+                iterator = qs.iterator(chunk_size=2)
+                first_page = next(iterator)
+
+            with self.assertNumQueries(3):
+                pages = [first_page] + list(iterator)
+
+        self.assertEqual(pages, list(qs))
+
+    def test_deferred_specific_iterator_with_chunk_size(self):
+        root = Page.objects.get(url_path='/home/')
+        pages = list(root.get_descendants().specific(defer=True).iterator(chunk_size=3))
+
+        self.assertEqual(pages, list(root.get_descendants().specific()))
+
+        # The content fields should be deferred
+        with self.assertNumQueries(1):
+            # <EventPage: Christmas>
+            pages[1].body
+
+    def test_specific_iterator_with_annotation_and_chunk_size(self):
+        pages = Page.objects.live().first(), Page.objects.live().last()
+        for page in pages:
+            page.save_revision()
+
+        qs = Page.objects.live().specific().annotate(revision_count=Count('revisions'))
+        results = list(qs.iterator(chunk_size=2))
+
+        self.assertEqual(results, list(qs))
+        self.assertEqual(results[0].revision_count, 1)
+        self.assertEqual(results[-1].revision_count, 1)
+
+    def test_specific_single_query(self):
+        root = Page.objects.get(url_path='/home/')
+
+        with self.assertNumQueries(0):
+            # The query should be lazy.
+            qs = root.get_descendants().specific(single_query=True)
+
+        with self.assertNumQueries(2):
+            # One query finds the page types in the queryset, and their tables are joined
+            # in the other
+            pages = list(qs)
+
+        self.assertEqual(pages, list(root.get_descendants().specific()))
+
+        for page in pages:
+            self.assertIsInstance(page, page.content_type.model_class())
+
+            # The specific fields should be loaded, and the page should already be
+            # the specific type
+            with self.assertNumQueries(0):
+                self.assertIs(page, page.specific)
+                page.title
+
+        with self.assertNumQueries(0):
+            # <EventPage: Christmas>
+            self.assertEqual(pages[1].location, 'The North Pole')
+
+    def test_specific_single_query_with_filtering_and_annotation(self):
+        Page.objects.live().first().save_revision()
+
+        qs = (
+            Page.objects.live().order_by('-url_path')[:4]
+            .specific(single_query=True).annotate(revision_count=Count('revisions'))
+        )
+
+        with self.assertNumQueries(2):
+            pages = list(qs)
+
+        self.assertEqual(pages, [
+            Page.objects.get(url_path='/home/other/special-event/').specific,
+            Page.objects.get(url_path='/home/other/').specific,
+            Page.objects.get(url_path='/home/events/christmas/').specific,
+            Page.objects.get(url_path='/home/events/').specific,
+        ])
+        self.assertEqual([page.revision_count for page in pages], [0, 0, 0, 0])
+        self.assertEqual(
+            Page.objects.live().specific(single_query=True).annotate(revision_count=Count('revisions'))[0].revision_count,
+            1
+        )
+
+    def test_specific_single_query_gracefully_handles_missing_rows(self):
+        # Remove the specific row of an event, leaving the base page row in place
+        EventPage.objects.filter(url_path='/home/events/christmas/')._raw_delete('default')
+
+        with self.assertWarnsRegex(RuntimeWarning, "Specific versions of the following pages could not be found"):
+            pages = list(Page.objects.get(url_path='/home/events/').get_children().specific(single_query=True))
+
+        # The page with the missing row should be supplemented with a generic page
+        self.assertEqual(
+            [page.url_path for page in pages],
+            list(Page.objects.get(url_path='/home/events/').get_children().values_list('url_path', flat=True))
+        )
+        self.assertEqual(type(pages[0]), Page)
+        self.assertIsInstance(pages[1], EventPage)
+
+    def test_specific_single_query_only_joins_page_types_in_results(self):
+        root = Page.objects.get(url_path='/home/')
+
+        with CaptureQueriesContext(connection) as context:
+            pages = list(root.get_descendants().specific(single_query=True))
+
+        self.assertEqual(pages, list(root.get_descendants().specific()))
+        self.assertEqual({type(page) for page in pages}, {EventIndex, EventPage, SimplePage})
+
+        # Only the tables of those page types are joined
+        sql = context.captured_queries[-1]['sql']
+        for model in [EventIndex, EventPage, SimplePage]:
+            self.assertIn('"%s"' % model._meta.db_table, sql)
+        self.assertNotIn('"%s"' % SingleEventPage._meta.db_table, sql)
+        self.assertEqual(sql.count(' JOIN '), 3)
+
+    def test_specific_single_query_with_too_many_joins(self):
+        root = Page.objects.get(url_path='/home/')
+
+        with mock.patch('wagtail.core.query.MAX_SPECIFIC_JOINS', 1):
+            with CaptureQueriesContext(connection) as context:
+                pages = list(root.get_descendants().specific(single_query=True))
+
+        # Fetched with a query for each page type instead
+        self.assertEqual(pages, list(root.get_descendants().specific()))
+        self.assertFalse(any(' JOIN ' in query['sql'] for query in context.captured_queries))
+
+    def test_deferred_specific_single_query(self):
+        root = Page.objects.get(url_path='/home/')
+
+        with self.assertNumQueries(1):
+            pages = list(root.get_descendants().specific(defer=True, single_query=True))
+
+        self.assertEqual(pages, list(root.get_descendants().specific()))
+        for page in pages:
+            self.assertIsInstance(page, page.content_type.model_class())
+
+        # The content fields should be deferred
+        with self.assertNumQueries(1):
+            # <EventPage: Christmas>
+            pages[1].location
+
+    def test_specific_single_query_iterator_with_chunk_size(self):
+        root = Page.objects.get(url_path='/home/')
+        qs = root.get_descendants().specific(single_query=True)
+
+        self.assertEqual(list(qs.iterator(chunk_size=2)), list(qs))
+
+
+class TestPrefetchStreamBlocks(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        self.homepage = Page.objects.get(url_path='/home/')
+        self.images = [
+            Image.objects.create(title="Image %d" % i, file=get_test_image_file())
+            for i in range(3)
+        ]
+        for i, image in enumerate(self.images):
+            self.homepage.add_child(instance=StreamPage(
+                title="Stream page %d" % i,
+                slug="stream-page-%d" % i,
+                body=json.dumps([
+                    {'type': 'text', 'value': "Hello"},
+                    {'type': 'image', 'value': image.id},
+                    {'type': 'product', 'value': {'name': "Product %d" % i, 'price': "10"}},
+                ]),
+            ))
+
+    def test_prefetch_stream_blocks(self):
+        # One query for the pages, and one for the images of all pages
+        with self.assertNumQueries(2):
+            pages = list(StreamPage.objects.order_by('id').prefetch_stream_blocks('body'))
+
+        with self.assertNumQueries(0):
+            self.assertEqual([page.body[1].value for page in pages], self.images)
+            self.assertEqual(pages[2].body[2].value['name'], "Product 2")
+            self.assertEqual(pages[0].body[0].value, "Hello")
+
+    def test_prefetch_stream_blocks_with_specific(self):
+        pages = self.homepage.get_children().order_by('path').specific()
+        with CaptureQueriesContext(connection) as specific_queries:
+            list(pages)
+
+        # One more query is made to fetch the images of all pages
+        with self.assertNumQueries(len(specific_queries) + 1):
+            pages = list(pages.prefetch_stream_blocks('body'))
+
+        # Pages of other types are ignored
+        stream_pages = [page for page in pages if isinstance(page, StreamPage)]
+        self.assertEqual(len(stream_pages), 3)
+        self.assertGreater(len(pages), 3)
+
+        with self.assertNumQueries(0):
+            self.assertEqual([page.body[1].value for page in stream_pages], self.images)
+
+    def test_prefetch_stream_blocks_doesnt_fetch_deferred_fields(self):
+        with self.assertNumQueries(1):
+            pages = list(StreamPage.objects.defer('body').prefetch_stream_blocks('body'))
+
+        self.assertEqual(len(pages), 3)
+
+    def test_prefetch_stream_blocks_with_values(self):
+        self.assertEqual(
+            list(StreamPage.objects.order_by('id').prefetch_stream_blocks('body').values_list('title', flat=True)),
+            ["Stream page 0", "Stream page 1", "Stream page 2"]
+        )
+
 
 class TestFirstCommonAncestor(TestCase):
     """
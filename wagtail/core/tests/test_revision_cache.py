@@ -0,0 +1,116 @@
+from django.test import TestCase, override_settings
+
+from wagtail.core import revision_cache
+from wagtail.core.models import Page, PageRevision
+from wagtail.core.revision_cache import clear_revision_cache, page_from_json
+from wagtail.tests.testapp.models import EventPage, EventPageSpeaker, StreamPage
+
+
+class TestRevisionCache(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        clear_revision_cache()
+        self.christmas_event = EventPage.objects.get(url_path='/home/events/christmas/')
+        self.revision = self.christmas_event.save_revision()
+
+    def tearDown(self):
+        clear_revision_cache()
+
+    def get_revision_page(self):
+        return PageRevision.objects.get(id=self.revision.id).as_page_object()
+
+    def test_disabled_by_default(self):
+        page_from_json(EventPage, self.revision.content_json)
+        self.assertFalse(revision_cache._cache)
+
+    @override_settings(WAGTAIL_REVISION_CACHE_SIZE=10)
+    def test_as_page_object_uses_cache(self):
+        revision = PageRevision.objects.select_related('page').get(id=self.revision.id)
+        page = revision.page.specific
+
+        page.with_content_json(revision.content_json)
+
+        # The page object is built from the cached page, without fetching anything
+        with self.assertNumQueries(0):
+            revision_page = page.with_content_json(revision.content_json)
+
+        self.assertEqual(revision_page.title, "Christmas")
+        self.assertEqual(revision_page.url_path, '/home/events/christmas/')
+        self.assertEqual(revision_page.speakers.get().last_name, "Christmas")
+
+    @override_settings(WAGTAIL_REVISION_CACHE_SIZE=10)
+    def test_cached_pages_are_copied(self):
+        revision_page = self.get_revision_page()
+        revision_page.title = "Changed"
+        revision_page.speakers.add(EventPageSpeaker(first_name="Father", last_name="Christmas"))
+
+        revision_page = self.get_revision_page()
+        self.assertEqual(revision_page.title, "Christmas")
+        self.assertEqual(revision_page.speakers.count(), 1)
+
+    @override_settings(WAGTAIL_REVISION_CACHE_SIZE=10)
+    def test_stream_block_definitions_are_not_copied(self):
+        stream_page = StreamPage(title="Stream page", body=[('text', "Hello")])
+        Page.objects.get(url_path='/home/').add_child(instance=stream_page)
+        revision = stream_page.save_revision()
+
+        revision_pages = [PageRevision.objects.get(id=revision.id).as_page_object() for i in range(2)]
+
+        self.assertIsNot(revision_pages[0].body, revision_pages[1].body)
+        for revision_page in revision_pages:
+            self.assertIs(revision_page.body.stream_block, StreamPage._meta.get_field('body').stream_block)
+            self.assertEqual(revision_page.body[0].value, "Hello")
+
+    @override_settings(WAGTAIL_REVISION_CACHE_SIZE=10)
+    def test_changed_revision_content(self):
+        self.get_revision_page()
+
+        self.revision.content_json = self.revision.content_json.replace("Christmas", "Easter")
+        self.revision.save()
+
+        self.assertEqual(self.get_revision_page().title, "Easter")
+
+    @override_settings(WAGTAIL_REVISION_CACHE_SIZE=2)
+    def test_cache_size(self):
+        revisions = [self.christmas_event.save_revision() for i in range(3)]
+        for revision in revisions:
+            # Make the content of each revision different
+            self.christmas_event.title = "Christmas %d" % revision.id
+            revision.content_json = self.christmas_event.to_json()
+            revision.as_page_object()
+
+        self.assertEqual(len(revision_cache._cache), 2)
+
+        # The least recently used page is dropped first
+        self.assertEqual(
+            [page.title for page in revision_cache._cache.values()],
+            ["Christmas %d" % revision.id for revision in revisions[1:]]
+        )
+
+
+class TestWithContentJsonUrlPath(TestCase):
+    fixtures = ['test.json']
+
+    def test_url_path_from_existing_url_path(self):
+        christmas_event = EventPage.objects.get(url_path='/home/events/christmas/')
+        christmas_event.slug = 'xmas'
+        content_json = christmas_event.to_json()
+
+        christmas_event = EventPage.objects.get(id=christmas_event.id)
+        revision_page = christmas_event.with_content_json(content_json)
+
+        self.assertEqual(revision_page.url_path, '/home/events/xmas/')
+
+    def test_url_path_of_root_page(self):
+        root_page = Page.objects.get(depth=1)
+        self.assertEqual(root_page.with_content_json(root_page.to_json()).url_path, '/')
+
+    def test_url_path_from_parent(self):
+        # If the page's url_path is out of date, it's found from the parent page instead
+        christmas_event = EventPage.objects.get(url_path='/home/events/christmas/')
+        christmas_event.url_path = '/somewhere-else/'
+
+        revision_page = christmas_event.with_content_json(christmas_event.to_json())
+
+        self.assertEqual(revision_page.url_path, '/home/events/christmas/')
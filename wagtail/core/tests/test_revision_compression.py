@@ -0,0 +1,113 @@
+from io import StringIO
+
+from django.core import management
+from django.test import TestCase, override_settings
+
+from wagtail.core.fields import COMPRESSED_TEXT_PREFIX, compress_text, decompress_text
+from wagtail.core.models import Page, PageRevision
+from wagtail.tests.testapp.models import EventPage
+
+
+def is_stored_compressed(revision):
+    # Filter on the raw column value, which lookups don't decompress
+    return PageRevision.objects.filter(
+        id=revision.id, content_json__startswith=COMPRESSED_TEXT_PREFIX
+    ).exists()
+
+
+class TestCompressText(TestCase):
+    def test_round_trip(self):
+        value = '{"title": "Christmas ☃"}' * 10
+        compressed = compress_text(value)
+
+        self.assertTrue(compressed.startswith(COMPRESSED_TEXT_PREFIX))
+        self.assertLess(len(compressed), len(value))
+        self.assertEqual(decompress_text(compressed), value)
+
+    def test_decompress_uncompressed_text(self):
+        self.assertEqual(decompress_text('{"title": "Christmas"}'), '{"title": "Christmas"}')
+
+
+class TestRevisionCompression(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        self.christmas_event = EventPage.objects.get(url_path='/home/events/christmas/')
+
+    def test_revisions_uncompressed_by_default(self):
+        revision = self.christmas_event.save_revision()
+        self.assertFalse(is_stored_compressed(revision))
+
+    @override_settings(WAGTAIL_REVISION_COMPRESSION=True)
+    def test_save_compressed_revision(self):
+        self.christmas_event.title = "Christmas (draft)"
+        revision = self.christmas_event.save_revision()
+        self.assertTrue(is_stored_compressed(revision))
+
+        self.assertEqual(PageRevision.objects.get(id=revision.id).content_json, revision.content_json)
+
+        revision_page = PageRevision.objects.get(id=revision.id).as_page_object()
+        self.assertEqual(revision_page.title, "Christmas (draft)")
+        self.assertEqual(revision_page.speakers.count(), 1)
+
+    @override_settings(WAGTAIL_REVISION_COMPRESSION=True)
+    def test_publish_compressed_revision(self):
+        self.christmas_event.title = "Christmas (published)"
+        self.christmas_event.save_revision()
+
+        PageRevision.objects.get(id=self.christmas_event.get_latest_revision().id).publish()
+
+        christmas_event = EventPage.objects.get(id=self.christmas_event.id)
+        self.assertEqual(christmas_event.title, "Christmas (published)")
+        self.assertEqual(christmas_event.live_revision_id, christmas_event.get_latest_revision().id)
+
+    @override_settings(WAGTAIL_REVISION_COMPRESSION=True)
+    def test_replace_text_in_compressed_revision(self):
+        revision = self.christmas_event.save_revision()
+
+        management.call_command('replace_text', "Christmas", "Easter", stdout=StringIO())
+
+        revision = PageRevision.objects.get(id=revision.id)
+        self.assertEqual(revision.as_page_object().title, "Easter")
+        self.assertTrue(is_stored_compressed(revision))
+
+
+class TestCompressRevisionsCommand(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        for page in Page.objects.filter(depth__gt=1).specific():
+            page.save_revision()
+
+    def run_command(self, **options):
+        output = StringIO()
+        management.call_command('compress_revisions', stdout=output, **options)
+        output.seek(0)
+        return output.read()
+
+    def test_compress_revisions(self):
+        revision_count = PageRevision.objects.count()
+        original_content = dict(PageRevision.objects.values_list('id', 'content_json'))
+
+        output = self.run_command(batch_size=3)
+
+        self.assertIn("Compressed %d revisions" % revision_count, output)
+        self.assertFalse(PageRevision.objects.exclude(content_json__startswith=COMPRESSED_TEXT_PREFIX).exists())
+        self.assertEqual(dict(PageRevision.objects.values_list('id', 'content_json')), original_content)
+
+        # Running it again does nothing
+        self.assertIn("Compressed 0 revisions", self.run_command())
+
+    def test_decompress_revisions(self):
+        original_content = dict(PageRevision.objects.values_list('id', 'content_json'))
+        self.run_command()
+
+        self.run_command(decompress=True)
+
+        self.assertFalse(PageRevision.objects.filter(content_json__startswith=COMPRESSED_TEXT_PREFIX).exists())
+        self.assertEqual(dict(PageRevision.objects.values_list('id', 'content_json')), original_content)
+
+    @override_settings(WAGTAIL_REVISION_COMPRESSION=True)
+    def test_cannot_decompress_with_compression_enabled(self):
+        with self.assertRaisesMessage(management.CommandError, "WAGTAIL_REVISION_COMPRESSION must be disabled"):
+            self.run_command(decompress=True)
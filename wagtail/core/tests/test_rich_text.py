@@ -1,13 +1,15 @@
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 from django.test import TestCase, override_settings
 from django.utils import translation
 
-from wagtail.core.models import Locale, Page
-from wagtail.core.rich_text import RichText, expand_db_html
+from wagtail.core import rich_text
+from wagtail.core.models import Locale, Page, Site
+from wagtail.core.rich_text import RichText, expand_db_html, get_text_for_indexing
+from wagtail.core.rich_text.cache import clear_rich_text_cache, get_references, get_rich_text_cache
 from wagtail.core.rich_text.feature_registry import FeatureRegistry
 from wagtail.core.rich_text.pages import PageLinkHandler
-from wagtail.core.rich_text.rewriters import LinkRewriter, extract_attrs
+from wagtail.core.rich_text.rewriters import LinkRewriter, TagRewriter, extract_attrs
 from wagtail.tests.testapp.models import EventPage
 
 
@@ -26,6 +28,44 @@ class TestPageLinktypeHandler(TestCase):
         result = PageLinkHandler.expand_db_attributes({'id': 1})
         self.assertEqual(result, '<a href="None">')
 
+    def test_expand_db_attributes_many(self):
+        christmas_page = Page.objects.get(url_path='/home/events/christmas/')
+        about_us_page = Page.objects.get(url_path='/home/about-us/')
+
+        Site.get_site_root_paths()
+
+        # One query for the base pages, one for each page type, one for the active locale,
+        # and one to check that the cached site root paths are current
+        with self.assertNumQueries(5):
+            result = PageLinkHandler.expand_db_attributes_many([
+                {'id': str(christmas_page.id)},
+                {'id': '0'},
+                {'id': str(about_us_page.id)},
+                {'id': str(christmas_page.id)},
+            ])
+
+        self.assertEqual(result, [
+            '<a href="/events/christmas/">',
+            '<a>',
+            '<a href="/about-us/">',
+            '<a href="/events/christmas/">',
+        ])
+
+    def test_expand_db_html_resolves_links_together(self):
+        christmas_page = Page.objects.get(url_path='/home/events/christmas/')
+        about_us_page = Page.objects.get(url_path='/home/about-us/')
+        html = (
+            '<a linktype="page" id="%d">Christmas</a><a linktype="page" id="%d">About us</a>'
+            % (christmas_page.id, about_us_page.id)
+        ) * 10
+
+        Site.get_site_root_paths()
+
+        with self.assertNumQueries(5):
+            result = expand_db_html(html)
+
+        self.assertEqual(result, '<a href="/events/christmas/">Christmas</a><a href="/about-us/">About us</a>' * 10)
+
 
 @override_settings(
     WAGTAIL_I18N_ENABLED=True,
@@ -57,6 +97,27 @@ class TestPageLinktypeHandlerWithI18N(TestCase):
             result = PageLinkHandler.expand_db_attributes({'id': self.event_page.id})
             self.assertEqual(result, '<a href="/fr/events/noel/">')
 
+    def test_expand_db_attributes_many_autolocalizes(self):
+        about_us_page = Page.objects.get(url_path='/home/about-us/')
+
+        with translation.override("fr"):
+            result = PageLinkHandler.expand_db_attributes_many([
+                {'id': self.event_page.id}, {'id': about_us_page.id}, {'id': self.fr_event_page.id},
+            ])
+
+        self.assertEqual(result, [
+            '<a href="/fr/events/noel/">', '<a href="/en/about-us/">', '<a href="/fr/events/noel/">',
+        ])
+
+    def test_expand_db_attributes_many_doesnt_autolocalize_unpublished_page(self):
+        self.fr_event_page.unpublish()
+        self.fr_event_page.save()
+
+        with translation.override("fr"):
+            result = PageLinkHandler.expand_db_attributes_many([{'id': self.event_page.id}])
+
+        self.assertEqual(result, ['<a href="/en/events/christmas/">'])
+
     def test_expand_db_attributes_doesnt_autolocalize_unpublished_page(self):
         # We shouldn't autolocalize if the translation is unpublished
         self.fr_event_page.unpublish()
@@ -93,6 +154,157 @@ class TestExpandDbHtml(TestCase):
         result = expand_db_html(html)
         self.assertIn('test html', result)
 
+    def test_expand_db_html_with_overridden_link_handler(self):
+        # Handlers written before expand_db_attributes_many existed may override
+        # expand_db_attributes alone, which must still be used
+        class CustomPageLinkHandler(PageLinkHandler):
+            @staticmethod
+            def expand_db_attributes(attrs):
+                return '<a class="custom" data-id="%s">' % attrs['id']
+
+        self.assertFalse(rich_text._has_bulk_expansion(CustomPageLinkHandler))
+        self.assertTrue(rich_text._has_bulk_expansion(PageLinkHandler))
+
+        with patch.object(rich_text, 'FRONTEND_REWRITER', None):
+            with patch.object(rich_text.features, 'get_link_types', return_value={'page': CustomPageLinkHandler}):
+                result = expand_db_html('<a linktype="page" id="1">foo</a>')
+
+        self.assertEqual(result, '<a class="custom" data-id="1">foo</a>')
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+    'rich_text': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'wagtail-rich-text-cache-tests',
+    },
+})
+class TestRichTextCache(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        get_rich_text_cache().clear()
+
+        self.christmas_page = EventPage.objects.get(url_path='/home/events/christmas/')
+        self.html = '<p><a linktype="page" id="%d">Christmas</a></p>' % self.christmas_page.id
+
+    def expand(self, html=None):
+        with patch.object(rich_text, '_expand_db_html', wraps=rich_text._expand_db_html) as expand:
+            result = expand_db_html(html or self.html)
+
+        return result, expand.call_count
+
+    def test_disabled_without_cache(self):
+        with override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+        }):
+            self.assertIsNone(get_rich_text_cache())
+            self.expand()
+            self.assertEqual(self.expand()[1], 1)
+
+    def test_get_references(self):
+        self.assertEqual(get_references(
+            '<p><a linktype="page" id="1">a</a><a href="/">b</a><a linktype="document" id="2">c</a>'
+            '<embed embedtype="image" id="3" format="left" alt="" />'
+            '<embed embedtype="media" url="https://www.youtube.com/watch?v=123" />'
+            '<a linktype="page" id="1">d</a></p>'
+        ), [
+            'wagtail-richtext-ref-document-2',
+            'wagtail-richtext-ref-image-3',
+            'wagtail-richtext-ref-page-1',
+        ])
+
+    def test_expanded_html_is_cached(self):
+        self.assertEqual(self.expand(), ('<p><a href="/events/christmas/">Christmas</a></p>', 1))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.expand(), ('<p><a href="/events/christmas/">Christmas</a></p>', 0))
+
+    def test_varies_on_language(self):
+        self.expand()
+
+        with translation.override('fr'):
+            self.assertEqual(self.expand()[1], 1)
+            self.assertEqual(self.expand()[1], 0)
+
+    def test_publishing_linked_page_invalidates(self):
+        self.expand()
+
+        self.christmas_page.slug = 'xmas'
+        self.christmas_page.save_revision().publish()
+
+        self.assertEqual(self.expand(), ('<p><a href="/events/xmas/">Christmas</a></p>', 1))
+
+    def test_publishing_other_page_does_not_invalidate(self):
+        self.expand()
+
+        Page.objects.get(url_path='/home/about-us/').specific.save_revision().publish()
+
+        self.assertEqual(self.expand()[1], 0)
+
+    def test_moving_parent_page_invalidates(self):
+        self.expand()
+
+        events_page = Page.objects.get(url_path='/home/events/')
+        events_page.move(Page.objects.get(url_path='/home/about-us/'), pos='last-child')
+
+        self.assertEqual(self.expand(), ('<p><a href="/about-us/events/christmas/">Christmas</a></p>', 1))
+
+    def test_deleting_linked_page_invalidates(self):
+        self.expand()
+
+        self.christmas_page.delete()
+
+        self.assertEqual(self.expand(), ('<p><a>Christmas</a></p>', 1))
+
+    def test_clear_rich_text_cache(self):
+        self.expand()
+
+        clear_rich_text_cache()
+
+        self.assertEqual(self.expand()[1], 1)
+
+
+class TestGetTextForIndexing(TestCase):
+    def test_block_elements_are_separated(self):
+        self.assertEqual(
+            get_text_for_indexing(
+                '<h2>Heading</h2><p>One<br/>two</p><ul><li>three</li><li>fo<b>u</b>r</li></ul>'
+                '<blockquote>five</blockquote><hr/>six'
+            ),
+            'Heading One two three four five  six'
+        )
+
+    def test_entities_are_unescaped(self):
+        self.assertEqual(get_text_for_indexing('<p>Fish &amp; chips &lt;b&gt; &#169;</p>'), 'Fish & chips <b> \xa9')
+
+    def test_tags_are_case_insensitive(self):
+        self.assertEqual(get_text_for_indexing('<P>hello</P><P>world</P >'), 'hello world')
+
+    def test_attributes(self):
+        self.assertEqual(
+            get_text_for_indexing(
+                '<p><a linktype="page" id="1">link</a> <embed embedtype="image" id="1" alt="a > b" format="left"/>'
+                "<a title='quoted'>text</a></p>"
+            ),
+            'link text'
+        )
+
+    def test_comments_and_declarations(self):
+        self.assertEqual(get_text_for_indexing('<!DOCTYPE html><p>hello <!-- <p>comment</p> --> world'), 'hello  world')
+        self.assertEqual(get_text_for_indexing('<p>hello</p><!-- unterminated <p>comment</p>'), 'hello')
+
+    def test_text_that_is_not_a_tag(self):
+        self.assertEqual(get_text_for_indexing('1 < 2 and 3 > 2 <'), '1 < 2 and 3 > 2 <')
+
+    def test_malformed_html(self):
+        # Unterminated tags and attributes are treated as text, rather than scanning to the end
+        # of the text for every '<'
+        self.assertEqual(get_text_for_indexing('<a title="' * 10000)[:20], '<a title="<a title="')
+        self.assertEqual(get_text_for_indexing('<a <p>hello</p>'), '<a hello')
+
 
 class TestRichTextValue(TestCase):
     fixtures = ['test.json']
@@ -207,6 +419,63 @@ class TestLinkRewriterTagReplacing(TestCase):
         self.assertEqual(link_with_custom_linktype, '<a data-phone="true" href="tel:+4917640206387">')
 
 
+class TestTagRewriter(TestCase):
+    def setUp(self):
+        self.rewriter = TagRewriter(
+            {'page': lambda attrs: '<a href="/article/{}">'.format(attrs['id'])},
+            {'image': lambda attrs: '<img alt="{}">'.format(attrs['alt'])},
+        )
+
+    def test_rewrites_links_and_embeds(self):
+        html = self.rewriter(
+            '<p><a linktype="page" id="3">Article</a></p>'
+            '<embed embedtype="image" id="1" alt="A &quot;quoted&quot; image"/>'
+            '<p><a href="https://wagtail.io/">Wagtail</a><abbr title="HyperText Markup Language">HTML</abbr></p>'
+        )
+        self.assertEqual(
+            html,
+            '<p><a href="/article/3">Article</a></p>'
+            '<img alt="A "quoted" image">'
+            '<p><a href="https://wagtail.io/">Wagtail</a><abbr title="HyperText Markup Language">HTML</abbr></p>'
+        )
+
+    def test_unrecognised_types(self):
+        self.assertEqual(self.rewriter('<a linktype="custom" id="3">'), '<a>')
+        self.assertEqual(self.rewriter('<embed embedtype="custom" id="1"/>'), '')
+        self.assertEqual(self.rewriter('<embed id="1"/>'), '')
+
+    def test_bulk_rules(self):
+        bulk_link_rule = Mock(side_effect=lambda attrs_list: [
+            '<a href="/article/{}">'.format(attrs['id']) for attrs in attrs_list
+        ])
+        rewriter = TagRewriter(
+            {'page': lambda attrs: '<a href="/page/{}">'.format(attrs['id'])},
+            {'image': lambda attrs: '<img alt="{}">'.format(attrs['alt'])},
+            bulk_link_rules={'page': bulk_link_rule},
+        )
+
+        html = rewriter(
+            '<p><a linktype="page" id="3">One</a><embed embedtype="image" id="1" alt="Image"/>'
+            '<a linktype="custom" id="4">Two</a><a linktype="page" id="5">Three</a></p>'
+        )
+
+        self.assertEqual(
+            html,
+            '<p><a href="/article/3">One</a><img alt="Image">'
+            '<a>Two</a><a href="/article/5">Three</a></p>'
+        )
+        bulk_link_rule.assert_called_once_with([
+            {'linktype': 'page', 'id': '3'}, {'linktype': 'page', 'id': '5'}
+        ])
+
+    def test_rule_output_is_not_rewritten(self):
+        rewriter = TagRewriter({}, {'media': lambda attrs: '<a linktype="custom"><embed embedtype="media"/></a>'})
+        self.assertEqual(
+            rewriter('<embed embedtype="media" url="https://example.com/"/>'),
+            '<a linktype="custom"><embed embedtype="media"/></a>'
+        )
+
+
 class TestRichTextField(TestCase):
     fixtures = ['test.json']
 
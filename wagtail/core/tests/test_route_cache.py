@@ -0,0 +1,116 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from wagtail.core.models import Page, PageViewRestriction
+from wagtail.core.route_cache import RouteCacheEntry, _make_cache_key, get_route_cache
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+    'page_routes': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'wagtail-route-cache-tests',
+    },
+})
+class TestRouteCache(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        self.cache = get_route_cache()
+        self.cache.clear()
+
+    def get_entry(self, url_path):
+        return self.cache.get(_make_cache_key(self.cache, url_path))
+
+    def test_route_cache_disabled_by_default(self):
+        with override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+        }):
+            self.assertIsNone(get_route_cache())
+
+    def test_route_is_cached(self):
+        about_us = Page.objects.get(url_path='/home/about-us/')
+
+        response = self.client.get('/about-us/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.get_entry('/home/about-us/'),
+            RouteCacheEntry(about_us.id, about_us.content_type_id, True, False)
+        )
+
+        # Subsequent requests are served without traversing the tree
+        with mock.patch.object(Page, 'route', side_effect=AssertionError("Page.route should not be called")):
+            response = self.client.get('/about-us/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page'], about_us.specific)
+
+    def test_page_with_custom_route_is_not_cached(self):
+        # EventIndex overrides route, so routes through it depend on the request
+        response = self.client.get('/events/christmas/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(self.get_entry('/home/events/christmas/'))
+
+    def test_unpublish_invalidates_route(self):
+        self.client.get('/about-us/')
+
+        Page.objects.get(url_path='/home/about-us/').unpublish()
+
+        self.assertIsNone(self.get_entry('/home/about-us/'))
+        response = self.client.get('/about-us/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_cached_unpublished_route_returns_404(self):
+        about_us = Page.objects.get(url_path='/home/about-us/')
+        self.cache.set(
+            _make_cache_key(self.cache, '/home/about-us/'),
+            RouteCacheEntry(about_us.id, about_us.content_type_id, False, False)
+        )
+
+        with mock.patch.object(Page, 'route', side_effect=AssertionError("Page.route should not be called")):
+            response = self.client.get('/about-us/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_stale_entry_is_discarded(self):
+        contact_us = Page.objects.get(url_path='/home/contact-us/')
+        self.cache.set(
+            _make_cache_key(self.cache, '/home/about-us/'),
+            RouteCacheEntry(contact_us.id, contact_us.content_type_id, True, False)
+        )
+
+        response = self.client.get('/about-us/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page'].url_path, '/home/about-us/')
+        self.assertEqual(self.get_entry('/home/about-us/').page_id, response.context['page'].id)
+
+    def test_slug_change_invalidates_routes(self):
+        self.client.get('/about-us/')
+
+        about_us = Page.objects.get(url_path='/home/about-us/')
+        about_us.slug = 'about'
+        about_us.save()
+
+        self.assertIsNone(self.get_entry('/home/about-us/'))
+        self.assertEqual(self.client.get('/about-us/').status_code, 404)
+        self.assertEqual(self.client.get('/about/').status_code, 200)
+
+    def test_view_restrictions_are_enforced_for_cached_routes(self):
+        self.client.get('/secret-plans/')
+        self.assertTrue(self.get_entry('/home/secret-plans/').has_view_restrictions)
+
+        response = self.client.get('/secret-plans/')
+        self.assertContains(response, '<form action="/_util/authenticate_with_password/')
+
+    def test_adding_view_restriction_invalidates_routes(self):
+        self.client.get('/about-us/')
+
+        PageViewRestriction.objects.create(
+            page=Page.objects.get(url_path='/home/about-us/'),
+            restriction_type=PageViewRestriction.LOGIN
+        )
+
+        self.assertIsNone(self.get_entry('/home/about-us/'))
+        response = self.client.get('/about-us/')
+        self.assertEqual(response.status_code, 302)
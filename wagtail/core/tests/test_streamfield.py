@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*
 import json
 
+from unittest import mock
+
 from django.apps import apps
 from django.db import models
 from django.template import Context, Template, engines
@@ -126,6 +128,25 @@ class TestLazyStreamField(TestCase):
         with self.assertNumQueries(1):
             instance.save()
 
+    def test_json_decoded_on_first_access(self):
+        with mock.patch('wagtail.core.fields.json.loads', wraps=json.loads) as loads:
+            instances = list(StreamModel.objects.filter(pk__in=[self.with_image.pk, self.no_image.pk]))
+            loads.assert_not_called()
+
+            body = instances[0].body
+            self.assertEqual(body[1].value, 'foo')
+            self.assertEqual(body[1].block_type, 'text')
+            self.assertEqual(loads.call_count, 1)
+
+            # The value is only decoded once
+            self.assertEqual(len(body), 2)
+            self.assertEqual(loads.call_count, 1)
+
+    def test_non_json_content_decoded_on_first_access(self):
+        instance = StreamModel.objects.get(pk=self.nonjson_body.pk)
+        self.assertEqual(instance.body.raw_text, "<h1>hello world</h1>")
+        self.assertEqual(len(instance.body), 0)
+
 
 class TestSystemCheck(TestCase):
     def tearDown(self):
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*
+from unittest import mock
+
+from django.core.cache import caches
 from django.core.exceptions import ImproperlyConfigured
 from django.test import TestCase, override_settings
 from django.utils.text import slugify
@@ -8,7 +11,8 @@ from django.utils.translation import gettext_lazy as _
 from wagtail.core.models import Page
 from wagtail.core.utils import (
     accepts_kwarg, camelcase_to_underscore, cautious_slugify, find_available_slug,
-    get_content_languages, get_supported_content_language_variant, safe_snake_case, string_to_ascii)
+    get_cache_version, get_cache_versions, get_content_languages, get_optional_cache,
+    get_supported_content_language_variant, reset_cache_versions, safe_snake_case, string_to_ascii)
 
 
 class TestCamelCaseToUnderscore(TestCase):
@@ -306,3 +310,41 @@ class TestGetSupportedContentLanguageVariantWithI18nFalse(TestCase):
         # a display name for the language
         self.assertEqual(get_supported_content_language_variant('zz'), 'zz')
         self.assertEqual(get_supported_content_language_variant('zz-gb'), 'zz')
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+})
+class TestCacheVersions(TestCase):
+    def setUp(self):
+        self.cache = caches['default']
+        self.cache.clear()
+
+    def test_get_optional_cache(self):
+        self.assertIs(get_optional_cache('default'), self.cache)
+        self.assertIsNone(get_optional_cache('not-defined'))
+
+    def test_versions_are_kept(self):
+        versions = get_cache_versions(self.cache, ['a', 'b'])
+
+        self.assertEqual(set(versions), {'a', 'b'})
+        self.assertNotEqual(versions['a'], versions['b'])
+        self.assertEqual(get_cache_versions(self.cache, ['a', 'b']), versions)
+        self.assertEqual(get_cache_version(self.cache, 'a'), versions['a'])
+
+    def test_reset_cache_versions(self):
+        versions = get_cache_versions(self.cache, ['a', 'b'])
+
+        reset_cache_versions(self.cache, ['a'])
+
+        new_versions = get_cache_versions(self.cache, ['a', 'b'])
+        self.assertNotEqual(new_versions['a'], versions['a'])
+        self.assertEqual(new_versions['b'], versions['b'])
+
+    def test_version_set_by_another_process_is_used(self):
+        with mock.patch.object(self.cache, 'add', return_value=False):
+            self.cache.set('a', 'other-version', None)
+            with mock.patch.object(self.cache, 'get_many', return_value={}):
+                self.assertEqual(get_cache_version(self.cache, 'a'), 'other-version')
@@ -278,6 +278,62 @@ class TestSiteRootPathsCache(TestCase):
         # Check url
         self.assertEqual(translated_homepage.url, '/')
 
+    def test_local_copy_is_used_while_version_is_unchanged(self):
+        # Warm up the cache
+        result = Site.get_site_root_paths()
+
+        # Only the version number should be fetched from the cache
+        with self.assertNumQueries(1):
+            self.assertIs(Site.get_site_root_paths(), result)
+
+    def test_local_copy_is_discarded_when_site_saved(self):
+        # Warm up the cache
+        Site.get_site_root_paths()
+
+        site = Site.objects.get(is_default_site=True)
+        site.hostname = 'example.com'
+        site.save()
+
+        self.assertEqual(Site.get_site_root_paths(), [
+            SiteRootPath(site_id=1, root_path='/home/', root_url='http://example.com', language_code='en')
+        ])
+
+    def test_local_copy_is_discarded_when_cache_cleared(self):
+        # Warm up the cache
+        Site.get_site_root_paths()
+
+        # Change the site without sending signals, then clear the cache
+        Site.objects.update(hostname='example.com')
+        cache.clear()
+
+        self.assertEqual(Site.get_site_root_paths(), [
+            SiteRootPath(site_id=1, root_path='/home/', root_url='http://example.com', language_code='en')
+        ])
+
+    @override_settings(WAGTAIL_I18N_ENABLED=True, CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    })
+    def test_translations_of_site_roots_are_fetched_in_one_query(self):
+        homepage = Page.objects.get(url_path='/home/')
+        fr_locale = Locale.objects.create(language_code="fr")
+        fr_homepage = homepage.copy_for_translation(fr_locale)
+
+        other_homepage = SimplePage(title="Other homepage", slug="other-homepage", content="hello")
+        Page.objects.get(id=1).add_child(instance=other_homepage)
+        fr_other_homepage = other_homepage.copy_for_translation(fr_locale)
+        other_site = Site.objects.create(hostname='other.example.com', root_page=other_homepage)
+
+        # One query for the sites and one for the translations of their root pages
+        with self.assertNumQueries(2):
+            result = Site.get_site_root_paths()
+
+        self.assertEqual(result, [
+            SiteRootPath(other_site.id, '/other-homepage/', 'http://other.example.com', 'en'),
+            SiteRootPath(other_site.id, fr_other_homepage.url_path, 'http://other.example.com', 'fr'),
+            SiteRootPath(1, '/home/', 'http://localhost', 'en'),
+            SiteRootPath(1, fr_homepage.url_path, 'http://localhost', 'fr'),
+        ])
+
 
 class TestResolveModelString(TestCase):
     def test_resolve_from_string(self):
@@ -2,11 +2,13 @@ import functools
 import inspect
 import re
 import unicodedata
+import uuid
 
 from anyascii import anyascii
 from django.apps import apps
 from django.conf import settings
 from django.conf.locale import LANG_INFO
+from django.core.cache import InvalidCacheBackendError, caches
 from django.core.exceptions import ImproperlyConfigured
 from django.core.signals import setting_changed
 from django.db.models import Model
@@ -286,6 +288,53 @@ def get_supported_content_language_variant(lang_code, strict=False):
     raise LookupError(lang_code)
 
 
+def get_optional_cache(alias):
+    """
+    Return the cache backend with the given alias, or None if there is no entry for it in
+    the CACHES setting. Used for caches that are only enabled when they are defined, such as
+    'renditions'.
+    """
+    try:
+        return caches[alias]
+    except InvalidCacheBackendError:
+        return None
+
+
+def get_cache_versions(cache, keys):
+    """
+    Return a dict of the current version of each of the given keys in the cache, creating
+    versions for any that don't exist yet. Cache entries that include a version in their
+    key (or record the versions they were created with) are invalidated, in every process,
+    by replacing the version with reset_cache_versions.
+    """
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            version = uuid.uuid4().hex
+            if not cache.add(key, version, None):
+                # another process has set the version in the meantime
+                version = cache.get(key, version)
+            versions[key] = version
+
+    return versions
+
+
+def get_cache_version(cache, key):
+    """
+    Return the current version of a single key in the cache, as get_cache_versions does
+    """
+    return get_cache_versions(cache, [key])[key]
+
+
+def reset_cache_versions(cache, keys):
+    """
+    Replace the versions of the given keys in the cache, invalidating all entries that
+    depend on them
+    """
+    cache.set_many({key: uuid.uuid4().hex for key in keys}, None)
+
+
 @receiver(setting_changed)
 def reset_cache(**kwargs):
     """
@@ -23,6 +23,10 @@ def check_view_restrictions(page, request, serve_args, serve_kwargs):
     include a password / login form that will allow them to proceed). If
     there are no such restrictions, return None
     """
+    if getattr(page, '_route_cache_has_view_restrictions', True) is False:
+        # The route cache has already established that no restrictions apply to this page
+        return
+
     for restriction in page.get_view_restrictions():
         if not restriction.accept_request(request):
             if restriction.restriction_type == PageViewRestriction.PASSWORD:
@@ -1,6 +1,7 @@
 from django.db import transaction
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save
 
+from wagtail.core.rich_text.cache import invalidate_references
 from wagtail.documents import get_document_model
 
 
@@ -9,6 +10,13 @@ def post_delete_file_cleanup(instance, **kwargs):
     transaction.on_commit(lambda: instance.file.delete(False))
 
 
+# Discard any cached rich text that links to the document, as its URL may have changed
+def invalidate_rich_text_references(instance, **kwargs):
+    invalidate_references('document', [instance.id])
+
+
 def register_signal_handlers():
     Document = get_document_model()
     post_delete.connect(post_delete_file_cleanup, sender=Document)
+    post_save.connect(invalidate_rich_text_references, sender=Document)
+    post_delete.connect(invalidate_rich_text_references, sender=Document)
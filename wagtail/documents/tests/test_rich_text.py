@@ -1,6 +1,9 @@
 from bs4 import BeautifulSoup
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
+from wagtail.core.rich_text import expand_db_html
+from wagtail.core.rich_text.cache import get_rich_text_cache
+from wagtail.documents.models import Document
 from wagtail.documents.rich_text import DocumentLinkHandler as FrontendDocumentLinkHandler
 from wagtail.documents.rich_text.editor_html import \
     DocumentLinkHandler as EditorHtmlDocumentLinkHandler
@@ -57,3 +60,35 @@ class TestFrontendDocumentLinkHandler(TestCase):
     def test_expand_db_attributes_with_missing_id(self):
         result = FrontendDocumentLinkHandler.expand_db_attributes({})
         self.assertEqual(result, '<a>')
+
+    def test_expand_db_attributes_many_for_frontend(self):
+        with self.assertNumQueries(1):
+            result = FrontendDocumentLinkHandler.expand_db_attributes_many([{'id': '1'}, {'id': '0'}, {}, {'id': '1'}])
+
+        self.assertEqual(result, ['<a href="/documents/1/test.pdf">', '<a>', '<a>', '<a href="/documents/1/test.pdf">'])
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+    'rich_text': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'wagtail-documents-rich-text-cache-tests',
+    },
+})
+class TestRichTextCacheInvalidation(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        get_rich_text_cache().clear()
+
+    def test_saving_document_invalidates_cached_rich_text(self):
+        html = '<a linktype="document" id="1">test</a>'
+        self.assertEqual(expand_db_html(html), '<a href="/documents/1/test.pdf">test</a>')
+
+        document = Document.objects.get(id=1)
+        document.file.name = 'documents/renamed.pdf'
+        document.save()
+
+        self.assertEqual(expand_db_html(html), '<a href="/documents/1/renamed.pdf">test</a>')
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from wagtail.images import get_image_model
+from wagtail.images.pregeneration import get_filter_specs, process_queue, queue_images, run_worker
+
+
+class Command(BaseCommand):
+    help = "Generates the renditions of images that have been queued when WAGTAILIMAGES_PREGENERATE_RENDITIONS is enabled"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true', dest='all', default=False,
+            help="Queue all images before generating renditions.")
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help="Number of threads to generate renditions in (default: 1).")
+        parser.add_argument(
+            '--daemon', action='store_true', dest='daemon', default=False,
+            help="Keep running, and generate renditions for newly queued images as they are queued.")
+        parser.add_argument(
+            '--interval', type=int, default=10,
+            help="When running with --daemon, the number of seconds to wait between checks for newly queued images (default: 10).")
+
+    def handle(self, *args, **options):
+        if options['all']:
+            queue_images(get_image_model().objects.values_list('id', flat=True))
+
+        filter_specs = get_filter_specs()
+        if not filter_specs:
+            self.stdout.write("No filter specs found.")
+            return
+
+        self.stdout.write("Generating renditions for filter specs: %s" % ", ".join(filter_specs))
+
+        if options['daemon']:
+            run_worker(
+                filter_specs=filter_specs, workers=options['workers'], interval=options['interval'],
+                progress_callback=lambda count: self.stdout.write("Generated renditions for %d images." % count)
+            )
+        else:
+            count = process_queue(filter_specs=filter_specs, workers=options['workers'])
+            self.stdout.write("Generated renditions for %d images." % count)
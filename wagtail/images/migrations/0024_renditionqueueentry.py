@@ -0,0 +1,26 @@
+# Generated by Django 3.1.14 on 2021-03-04 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wagtailimages', '0023_add_choose_permissions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenditionQueueEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image_id', models.IntegerField(unique=True, verbose_name='image ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+            ],
+            options={
+                'verbose_name': 'rendition queue entry',
+                'verbose_name_plural': 'rendition queue entries',
+                'ordering': ['created_at', 'id'],
+            },
+        ),
+    ]
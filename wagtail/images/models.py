@@ -601,3 +601,22 @@ class UploadedImage(models.Model):
         settings.AUTH_USER_MODEL, verbose_name=_('uploaded by user'),
         null=True, blank=True, editable=False, on_delete=models.SET_NULL
     )
+
+
+class RenditionQueueEntry(models.Model):
+    """
+    An image whose renditions are to be generated in advance, recorded when
+    WAGTAILIMAGES_PREGENERATE_RENDITIONS is enabled. These are processed by the
+    pregenerate_renditions management command.
+    """
+    # Not a foreign key, as the image model is configurable
+    image_id = models.IntegerField(verbose_name=_('image ID'), unique=True)
+    created_at = models.DateTimeField(verbose_name=_('created at'), auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        verbose_name = _('rendition queue entry')
+        verbose_name_plural = _('rendition queue entries')
+
+    def __str__(self):
+        return "RenditionQueueEntry %d: image %d" % (self.pk, self.image_id)
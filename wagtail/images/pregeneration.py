@@ -0,0 +1,259 @@
+"""
+Generating image renditions in advance, so that the first request for a page after it is
+published (or after one of its images is uploaded or changed) doesn't have to generate them.
+
+When WAGTAILIMAGES_PREGENERATE_RENDITIONS is enabled, images are added to a queue when they
+are saved, and when a page that uses them is published. The pregenerate_renditions management
+command then generates the renditions of each queued image for every known filter spec.
+"""
+import logging
+import os
+import re
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import ForeignKey
+from django.template import engines
+from django.utils.text import smart_split
+from modelcluster.models import get_all_child_relations
+
+from wagtail.core import blocks
+from wagtail.core.fields import RichTextField, StreamField
+from wagtail.core.rich_text.rewriters import FIND_A_OR_EMBED_TAG, extract_attrs
+from wagtail.images import get_image_model
+from wagtail.images.exceptions import InvalidFilterSpecError
+from wagtail.images.formats import get_image_formats
+from wagtail.images.models import AbstractImage, RenditionQueueEntry, SourceImageIOError
+
+
+logger = logging.getLogger('wagtail.images')
+
+# {% image page.photo fill-200x200 class="photo" %} in Django templates
+DJANGO_IMAGE_TAG = re.compile(r'\{%-?\s*image\s+(.*?)\s*-?%\}', re.DOTALL)
+
+# {{ image(page.photo, "fill-200x200") }} in Jinja2 templates
+JINJA2_IMAGE_FUNCTION = re.compile(r'''\bimage\(\s*[^,()]+,\s*["']([A-Za-z0-9_\-\.\|]+)["']''')
+
+FILTER_SPEC_PART = re.compile(r'^[A-Za-z0-9_\-\.]+$')
+
+
+def is_enabled():
+    return getattr(settings, 'WAGTAILIMAGES_PREGENERATE_RENDITIONS', False)
+
+
+def find_filter_specs_in_template(source):
+    """
+    Return the set of filter specs used by the image tags (or Jinja2 image functions) in the
+    source of a template
+    """
+    filter_specs = set()
+
+    for match in DJANGO_IMAGE_TAG.finditer(source):
+        # Mirrors the parsing of the image tag: the bits after the image expression, up to
+        # 'as', that aren't attributes
+        filter_spec_parts = []
+        for bit in list(smart_split(match.group(1)))[1:]:
+            if bit == 'as':
+                break
+            if '=' not in bit and FILTER_SPEC_PART.match(bit):
+                filter_spec_parts.append(bit)
+
+        if filter_spec_parts:
+            filter_specs.add('|'.join(filter_spec_parts))
+
+    filter_specs.update(JINJA2_IMAGE_FUNCTION.findall(source))
+
+    return filter_specs
+
+
+@lru_cache(maxsize=None)
+def find_template_filter_specs():
+    """
+    Return the set of filter specs used by all templates in the template directories of the
+    configured template engines
+    """
+    filter_specs = set()
+
+    for engine in engines.all():
+        for template_dir in getattr(engine, 'template_dirs', []):
+            for dirpath, dirnames, filenames in os.walk(template_dir):
+                for filename in filenames:
+                    try:
+                        with open(os.path.join(dirpath, filename), encoding='utf-8') as f:
+                            source = f.read()
+                    except (OSError, UnicodeDecodeError):
+                        continue
+
+                    if 'image' in source:
+                        filter_specs.update(find_filter_specs_in_template(source))
+
+    return filter_specs
+
+
+def get_filter_specs():
+    """
+    Return the filter specs to generate renditions for: those used in templates and by the
+    registered rich text image formats, along with any listed in the
+    WAGTAILIMAGES_PREGENERATE_FILTER_SPECS setting
+    """
+    filter_specs = set(find_template_filter_specs())
+    filter_specs.update(image_format.filter_spec for image_format in get_image_formats())
+    filter_specs.update(getattr(settings, 'WAGTAILIMAGES_PREGENERATE_FILTER_SPECS', []))
+    return sorted(filter_specs)
+
+
+def queue_images(image_ids):
+    """
+    Add images to the queue of images to generate renditions for. Images that are already
+    in the queue keep their place.
+    """
+    RenditionQueueEntry.objects.bulk_create([
+        RenditionQueueEntry(image_id=image_id) for image_id in set(image_ids)
+    ], ignore_conflicts=True)
+
+
+def find_image_ids_in_rich_text(html):
+    image_ids = set()
+    for match in FIND_A_OR_EMBED_TAG.finditer(html):
+        embed_attr_string = match.group(2)
+        if embed_attr_string is not None and 'image' in embed_attr_string:
+            attrs = extract_attrs(embed_attr_string)
+            if attrs.get('embedtype') == 'image' and attrs.get('id', '').isdigit():
+                image_ids.add(int(attrs['id']))
+
+    return image_ids
+
+
+def find_image_ids_in_block(block, value):
+    if value is None:
+        return set()
+
+    if isinstance(block, blocks.ChooserBlock):
+        if issubclass(block.target_model, AbstractImage):
+            return {value.pk}
+    elif isinstance(block, blocks.RichTextBlock):
+        return find_image_ids_in_rich_text(value.source)
+    elif isinstance(block, blocks.StreamBlock):
+        return set().union(*(find_image_ids_in_block(child.block, child.value) for child in value))
+    elif isinstance(block, blocks.StructBlock):
+        return set().union(*(
+            find_image_ids_in_block(child_block, value.get(name))
+            for name, child_block in block.child_blocks.items()
+        ))
+    elif isinstance(block, blocks.ListBlock):
+        return set().union(*(find_image_ids_in_block(block.child_block, item) for item in value))
+
+    return set()
+
+
+def get_page_image_ids(page):
+    """
+    Return the IDs of the images used by a page: through foreign keys on the page or its
+    child objects (such as carousel items), and in its StreamFields and rich text
+    """
+    objects = [page]
+    for relation in get_all_child_relations(page):
+        objects.extend(getattr(page, relation.get_accessor_name()).all())
+
+    image_ids = set()
+    for obj in objects:
+        for field in obj._meta.get_fields():
+            if isinstance(field, ForeignKey) and issubclass(field.related_model, AbstractImage):
+                image_id = getattr(obj, field.attname)
+                if image_id is not None:
+                    image_ids.add(image_id)
+            elif isinstance(field, StreamField):
+                image_ids.update(find_image_ids_in_block(field.stream_block, getattr(obj, field.attname)))
+            elif isinstance(field, RichTextField):
+                image_ids.update(find_image_ids_in_rich_text(getattr(obj, field.attname) or ''))
+
+    return image_ids
+
+
+def generate_renditions(image, filter_specs):
+    """
+    Generate the renditions of an image for the given filter specs, if they don't exist yet.
+    Errors are logged rather than raised, so that one broken image doesn't stop the renditions
+    of the other queued images from being generated.
+    """
+    for filter_spec in filter_specs:
+        try:
+            image.get_rendition(filter_spec)
+        except SourceImageIOError:
+            logger.warning("Image file for image %d is missing, so its renditions can't be generated", image.pk)
+            return
+        except InvalidFilterSpecError:
+            logger.warning("Invalid filter spec '%s' found when generating renditions", filter_spec)
+        except Exception:
+            logger.exception("Failed to generate the '%s' rendition of image %d", filter_spec, image.pk)
+            return
+
+
+def _generate_renditions_in_thread(image, filter_specs):
+    try:
+        generate_renditions(image, filter_specs)
+    finally:
+        # Each thread has its own database connections, which would otherwise be left open
+        connections.close_all()
+
+
+def process_queue(filter_specs=None, workers=1, batch_size=100):
+    """
+    Generate the renditions of every image in the queue, using a pool of worker threads if
+    workers is more than 1, and return the number of images processed. Each image is removed
+    from the queue before its renditions are generated, so that an image that is changed (and
+    queued again) in the meantime is processed again later.
+    """
+    if filter_specs is None:
+        filter_specs = get_filter_specs()
+
+    Image = get_image_model()
+    processed_count = 0
+
+    while True:
+        entries = list(RenditionQueueEntry.objects.all()[:batch_size])
+        if not entries:
+            return processed_count
+
+        images = Image.objects.in_bulk([entry.image_id for entry in entries])
+
+        claimed_images = []
+        for entry in entries:
+            # Another worker process may have claimed this entry already
+            deleted_count, _ = RenditionQueueEntry.objects.filter(id=entry.id).delete()
+            if deleted_count and entry.image_id in images:
+                claimed_images.append(images[entry.image_id])
+
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(_generate_renditions_in_thread, image, filter_specs): image
+                    for image in claimed_images
+                }
+
+            for future, image in futures.items():
+                exception = future.exception()
+                if exception is not None:
+                    logger.error(
+                        "Failed to generate the renditions of image %d", image.pk, exc_info=exception
+                    )
+        else:
+            for image in claimed_images:
+                generate_renditions(image, filter_specs)
+
+        processed_count += len(claimed_images)
+
+
+def run_worker(filter_specs=None, workers=1, interval=10, progress_callback=None):
+    """
+    Process the queue continually, checking for newly queued images every `interval` seconds
+    """
+    while True:
+        processed_count = process_queue(filter_specs=filter_specs, workers=workers)
+        if processed_count and progress_callback:
+            progress_callback(processed_count)
+        time.sleep(interval)
@@ -27,3 +27,18 @@ class ImageEmbedHandler(EmbedHandler):
 
         image_format = get_image_format(attrs['format'])
         return image_format.image_to_html(image, attrs.get('alt', ''))
+
+    @classmethod
+    def expand_db_attributes_many(cls, attrs_list):
+        """
+        As expand_db_attributes, but fetches the images for all the <embed> tags in a single query
+        """
+        html = []
+        for image, attrs in zip(cls.get_many(attrs_list), attrs_list):
+            if image is None:
+                html.append('<img alt="">')
+            else:
+                image_format = get_image_format(attrs['format'])
+                html.append(image_format.image_to_html(image, attrs.get('alt', '')))
+
+        return html
@@ -1,8 +1,10 @@
 from django.conf import settings
 from django.db import transaction
-from django.db.models.signals import post_delete, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 
-from wagtail.images import get_image_model
+from wagtail.core.rich_text.cache import invalidate_references
+from wagtail.core.signals import page_published
+from wagtail.images import get_image_model, pregeneration
 
 
 def post_delete_file_cleanup(instance, **kwargs):
@@ -14,6 +16,11 @@ def post_delete_purge_rendition_cache(instance, **kwargs):
     instance.purge_from_cache()
 
 
+# Discard any cached rich text that embeds the image, as its file or alt text may have changed
+def invalidate_rich_text_references(instance, **kwargs):
+    invalidate_references('image', [instance.id])
+
+
 def pre_save_image_feature_detection(instance, **kwargs):
     if getattr(settings, 'WAGTAILIMAGES_FEATURE_DETECTION_ENABLED', False):
         # Make sure the image doesn't already have a focal point
@@ -22,11 +29,27 @@ def pre_save_image_feature_detection(instance, **kwargs):
             instance.set_focal_point(instance.get_suggested_focal_point())
 
 
+# Queue images for their renditions to be generated in advance, when
+# WAGTAILIMAGES_PREGENERATE_RENDITIONS is enabled
+def post_save_queue_image_renditions(instance, **kwargs):
+    if pregeneration.is_enabled():
+        pregeneration.queue_images([instance.id])
+
+
+def page_published_queue_image_renditions(instance, **kwargs):
+    if pregeneration.is_enabled():
+        pregeneration.queue_images(pregeneration.get_page_image_ids(instance))
+
+
 def register_signal_handlers():
     Image = get_image_model()
     Rendition = Image.get_rendition_model()
 
     pre_save.connect(pre_save_image_feature_detection, sender=Image)
     post_delete.connect(post_delete_file_cleanup, sender=Image)
+    post_save.connect(invalidate_rich_text_references, sender=Image)
+    post_delete.connect(invalidate_rich_text_references, sender=Image)
+    post_save.connect(post_save_queue_image_renditions, sender=Image)
+    page_published.connect(page_published_queue_image_renditions)
     post_delete.connect(post_delete_file_cleanup, sender=Rendition)
     post_delete.connect(post_delete_purge_rendition_cache, sender=Rendition)
@@ -0,0 +1,201 @@
+import json
+
+from io import StringIO
+from unittest import mock
+
+from django.core import management
+from django.test import TestCase, override_settings
+
+from wagtail.core.models import Page
+from wagtail.images import get_image_model
+from wagtail.images.models import RenditionQueueEntry
+from wagtail.images.pregeneration import (
+    find_filter_specs_in_template, get_filter_specs, get_page_image_ids, process_queue,
+    queue_images)
+from wagtail.images.tests.utils import get_test_image_file
+from wagtail.tests.testapp.models import EventPage, StreamPage
+
+
+Image = get_image_model()
+
+
+class TestFindFilterSpecsInTemplate(TestCase):
+    def test_django_image_tag(self):
+        source = """
+            {% load wagtailimages_tags %}
+            {% image page.photo fill-200x200 %}
+            {% image page.photo width-400 class="photo" alt='A "photo"' %}
+            {% image page.photo fill-80x80 format-jpeg as thumbnail %}
+            {% image self.photo|default:None max-100x100 %}
+        """
+        self.assertEqual(find_filter_specs_in_template(source), {
+            'fill-200x200', 'width-400', 'fill-80x80|format-jpeg', 'max-100x100',
+        })
+
+    def test_jinja2_image_function(self):
+        source = """
+            {{ image(page.photo, "fill-200x200") }}
+            {{ image(page.photo, 'width-400|format-webp', class="photo") }}
+        """
+        self.assertEqual(find_filter_specs_in_template(source), {'fill-200x200', 'width-400|format-webp'})
+
+    def test_no_image_tags(self):
+        self.assertEqual(find_filter_specs_in_template("{% if image %}{{ image.title }}{% endif %}"), set())
+
+
+class TestGetFilterSpecs(TestCase):
+    @override_settings(WAGTAILIMAGES_PREGENERATE_FILTER_SPECS=['fill-123x456'])
+    def test_get_filter_specs(self):
+        filter_specs = get_filter_specs()
+
+        # From the setting
+        self.assertIn('fill-123x456', filter_specs)
+
+        # From the default image formats
+        self.assertIn('width-500', filter_specs)
+
+        # From the admin templates
+        self.assertIn('max-165x165', filter_specs)
+
+
+class TestQueueing(TestCase):
+    fixtures = ['test.json']
+
+    def test_image_not_queued_by_default(self):
+        Image.objects.create(title="Test image", file=get_test_image_file())
+        self.assertFalse(RenditionQueueEntry.objects.exists())
+
+    @override_settings(WAGTAILIMAGES_PREGENERATE_RENDITIONS=True)
+    def test_image_queued_on_save(self):
+        image = Image.objects.create(title="Test image", file=get_test_image_file())
+        self.assertEqual(list(RenditionQueueEntry.objects.values_list('image_id', flat=True)), [image.id])
+
+        # Saving the image again doesn't queue it twice
+        image.save()
+        self.assertEqual(RenditionQueueEntry.objects.count(), 1)
+
+    def test_queue_images(self):
+        queue_images([1, 2, 2])
+        queue_images([2, 3])
+        self.assertEqual(
+            sorted(RenditionQueueEntry.objects.values_list('image_id', flat=True)), [1, 2, 3]
+        )
+
+    def test_get_page_image_ids(self):
+        image = Image.objects.create(title="Test image", file=get_test_image_file())
+        page = EventPage.objects.get(url_path='/home/events/christmas/')
+        page.feed_image = image
+        page.body = '<p>Image <embed embedtype="image" id="123" format="left" alt="" /></p>'
+        page.carousel_items.create(image_id=456, embed_url='')
+
+        self.assertEqual(get_page_image_ids(page), {image.id, 123, 456})
+
+    def test_get_stream_page_image_ids(self):
+        page = StreamPage(title="Stream page", body=json.dumps([
+            {'type': 'image', 'value': 789},
+            {'type': 'rich_text', 'value': '<p><embed embedtype="image" id="123" format="left" alt="" /></p>'},
+            {'type': 'text', 'value': "Not an image"},
+        ]))
+
+        with mock.patch.object(Image.objects, 'in_bulk', return_value={789: Image(id=789)}):
+            self.assertEqual(get_page_image_ids(page), {789, 123})
+
+    @override_settings(WAGTAILIMAGES_PREGENERATE_RENDITIONS=True)
+    def test_images_queued_on_publish(self):
+        image = Image.objects.create(title="Test image", file=get_test_image_file())
+        RenditionQueueEntry.objects.all().delete()
+
+        page = EventPage.objects.get(url_path='/home/events/christmas/')
+        page.feed_image = image
+        page.save_revision().publish()
+
+        self.assertEqual(list(RenditionQueueEntry.objects.values_list('image_id', flat=True)), [image.id])
+
+    def test_images_not_queued_on_publish_by_default(self):
+        image = Image.objects.create(title="Test image", file=get_test_image_file())
+
+        page = Page.objects.get(url_path='/home/events/christmas/').specific
+        page.feed_image = image
+        page.save_revision().publish()
+
+        self.assertFalse(RenditionQueueEntry.objects.exists())
+
+
+class TestProcessQueue(TestCase):
+    def setUp(self):
+        self.image = Image.objects.create(title="Test image", file=get_test_image_file())
+        queue_images([self.image.id])
+
+    def test_process_queue(self):
+        self.assertEqual(process_queue(filter_specs=['fill-100x100', 'width-400', 'not-a-filter']), 1)
+
+        self.assertEqual(
+            sorted(self.image.renditions.values_list('filter_spec', flat=True)), ['fill-100x100', 'width-400']
+        )
+        self.assertFalse(RenditionQueueEntry.objects.exists())
+
+    def test_process_queue_with_deleted_image(self):
+        queue_images([self.image.id + 1])
+        self.assertEqual(process_queue(filter_specs=['width-400']), 1)
+        self.assertFalse(RenditionQueueEntry.objects.exists())
+
+    def test_process_queue_with_workers(self):
+        other_image = Image.objects.create(title="Other image", file=get_test_image_file())
+        queue_images([other_image.id])
+
+        with mock.patch('wagtail.images.pregeneration.generate_renditions') as generate_renditions:
+            self.assertEqual(process_queue(filter_specs=['width-400'], workers=2), 2)
+
+        self.assertEqual(
+            sorted(call[0][0].id for call in generate_renditions.call_args_list), [self.image.id, other_image.id]
+        )
+
+    def test_process_queue_with_broken_image(self):
+        broken_image = Image.objects.create(title="Broken image", file=get_test_image_file())
+        queue_images([broken_image.id])
+        original_get_rendition = Image.get_rendition
+
+        def get_rendition(image, filter):
+            if image.id == broken_image.id:
+                raise ValueError("cannot decode image")
+            return original_get_rendition(image, filter)
+
+        with mock.patch.object(Image, 'get_rendition', get_rendition):
+            with self.assertLogs('wagtail.images', level='ERROR') as logs:
+                self.assertEqual(process_queue(filter_specs=['width-400']), 2)
+
+        self.assertIn("Failed to generate the 'width-400' rendition of image %d" % broken_image.id, logs.output[0])
+
+        # The renditions of the other image are still generated
+        self.assertTrue(self.image.renditions.filter(filter_spec='width-400').exists())
+        self.assertFalse(RenditionQueueEntry.objects.exists())
+
+    def test_process_queue_with_workers_logs_errors(self):
+        with mock.patch(
+            'wagtail.images.pregeneration._generate_renditions_in_thread', side_effect=ValueError("oops")
+        ):
+            with self.assertLogs('wagtail.images', level='ERROR') as logs:
+                self.assertEqual(process_queue(filter_specs=['width-400'], workers=2), 1)
+
+        self.assertIn("Failed to generate the renditions of image %d" % self.image.id, logs.output[0])
+
+    def run_command(self, **options):
+        output = StringIO()
+        with mock.patch('wagtail.images.management.commands.pregenerate_renditions.get_filter_specs', return_value=['width-400']):
+            management.call_command('pregenerate_renditions', stdout=output, **options)
+        output.seek(0)
+        return output.read()
+
+    def test_command(self):
+        output = self.run_command()
+
+        self.assertIn("Generated renditions for 1 images.", output)
+        self.assertTrue(self.image.renditions.filter(filter_spec='width-400').exists())
+
+    def test_command_all(self):
+        other_image = Image.objects.create(title="Other image", file=get_test_image_file())
+
+        output = self.run_command(all=True)
+
+        self.assertIn("Generated renditions for 2 images.", output)
+        self.assertTrue(other_image.renditions.filter(filter_spec='width-400').exists())
@@ -114,3 +114,18 @@ class TestFrontendImageEmbedHandler(TestCase, WagtailTestUtils):
             'format': 'left',
         })
         self.assertTagInHTML('<img class="richtext-image left" alt="" />', result, allow_extra_attrs=True)
+
+    def test_expand_db_attributes_many_for_frontend(self):
+        Image.objects.create(id=1, title='Test', file=get_test_image_file())
+        Image.objects.create(id=2, title='Test 2', file=get_test_image_file())
+
+        result = FrontendImageEmbedHandler.expand_db_attributes_many([
+            {'id': '1', 'alt': 'first', 'format': 'left'},
+            {'id': '0', 'alt': 'missing', 'format': 'left'},
+            {'id': '2', 'alt': 'second', 'format': 'right'},
+        ])
+
+        self.assertEqual(len(result), 3)
+        self.assertTagInHTML('<img class="richtext-image left" alt="first" />', result[0], allow_extra_attrs=True)
+        self.assertEqual(result[1], '<img alt="">')
+        self.assertTagInHTML('<img class="richtext-image right" alt="second" />', result[2], allow_extra_attrs=True)
@@ -168,6 +168,39 @@ def insert_or_update_object(instance):
                     raise
 
 
+def insert_or_update_objects(instances):
+    """
+    Add or update multiple instances in the search backends, making a single request to each
+    backend per model (rather than one per instance, as insert_or_update_object does)
+    """
+    instances_by_model = {}
+    for instance in instances:
+        indexed_instance = instance.get_indexed_instance()
+        if indexed_instance is not None:
+            instances_by_model.setdefault(type(indexed_instance), []).append(indexed_instance)
+
+    # Make sure that the instances are in their class's indexed objects
+    for model, model_instances in list(instances_by_model.items()):
+        indexed_pks = set(model.get_indexed_objects().filter(pk__in=[obj.pk for obj in model_instances]).values_list('pk', flat=True))
+        instances_by_model[model] = [obj for obj in model_instances if obj.pk in indexed_pks]
+
+    for backend_name, backend in get_search_backends_with_name(with_auto_update=True):
+        for model, model_instances in instances_by_model.items():
+            if not model_instances:
+                continue
+
+            try:
+                backend.add_bulk(model, model_instances)
+            except Exception:
+                # Log all errors
+                logger.exception("Exception raised while adding %d %r objects into the '%s' search backend", len(model_instances), model, backend_name)
+
+                # Only catch the exception if the backend requires this
+                # See the comments in insert_or_update_object for an explanation
+                if not backend.catch_indexing_errors:
+                    raise
+
+
 def remove_object(instance):
     indexed_instance = get_indexed_instance(instance, check_exists=False)
 
@@ -93,6 +93,50 @@ class TestInsertOrUpdateObject(TestCase, WagtailTestUtils):
         self.assertIn("ValueError: Test", cm.output[0])
 
 
+@mock.patch('wagtail.search.tests.DummySearchBackend', create=True)
+@override_settings(WAGTAILSEARCH_BACKENDS={
+    'default': {
+        'BACKEND': 'wagtail.search.tests.DummySearchBackend'
+    }
+})
+class TestInsertOrUpdateObjects(TestCase, WagtailTestUtils):
+    def test_inserts_objects_by_model(self, backend):
+        book = models.Book.objects.create(title="Test", publication_date=date(2017, 10, 18), number_of_pages=100)
+        novel = models.Novel.objects.create(title="Test novel", publication_date=date(2017, 10, 18), number_of_pages=100)
+        other_book = models.Book.objects.create(title="Test 2", publication_date=date(2017, 10, 18), number_of_pages=100)
+        backend().reset_mock()
+
+        index.insert_or_update_objects([book, novel.book_ptr, other_book])
+
+        backend().add_bulk.assert_has_calls([
+            mock.call(models.Book, [book, other_book]),
+            mock.call(models.Novel, [novel]),
+        ])
+        self.assertEqual(len(backend().add_bulk.mock_calls), 2)
+
+    def test_doesnt_insert_objects_not_in_indexed_objects(self, backend):
+        book = models.Novel.objects.create(title="Test", publication_date=date(2017, 10, 18), number_of_pages=100)
+        blocked_book = models.Novel.objects.create(title="Don't index me!", publication_date=date(2017, 10, 18), number_of_pages=100)
+        backend().reset_mock()
+
+        index.insert_or_update_objects([book, blocked_book])
+
+        backend().add_bulk.assert_called_once_with(models.Novel, [book])
+
+    def test_catches_index_error(self, backend):
+        obj = models.Book.objects.create(title="Test", publication_date=date(2017, 10, 18), number_of_pages=100)
+
+        backend().add_bulk.side_effect = ValueError("Test")
+        backend().reset_mock()
+
+        with self.assertLogs('wagtail.search.index', level='ERROR') as cm:
+            index.insert_or_update_objects([obj])
+
+        self.assertEqual(len(cm.output), 1)
+        self.assertIn("Exception raised while adding 1 <class 'wagtail.tests.search.models.Book'> objects into the 'default' search backend", cm.output[0])
+        self.assertIn("ValueError: Test", cm.output[0])
+
+
 @mock.patch('wagtail.search.tests.DummySearchBackend', create=True)
 @override_settings(WAGTAILSEARCH_BACKENDS={
     'default': {